@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+
+from app.configs.settings import AGENT_TYPE, LLM_WARMUP
+from app.llm.llm_provider import get_llm
+from app.utils.logger import logger
+
+WARMUP_PROMPT = "Reply with OK."
+
+
+def _build_langgraph_agent():
+    from app.agents.langgraph_code_assistant import build_code_assistant_agent
+    return build_code_assistant_agent()
+
+
+def _build_normal_agent():
+    from app.agents.langchain_code_assistant_agent import get_agent
+    return get_agent()
+
+
+AGENT_BUILDERS = {
+    "langgraph": _build_langgraph_agent,
+    "normal": _build_normal_agent,
+}
+
+
+class AgentRegistry:
+    """
+    Builds each agent type once and hands out the same instance afterwards.
+
+    `startup()` is called from the FastAPI lifespan: it builds the configured
+    agent and warms up the LLM, and only then marks the registry ready.
+    """
+
+    def __init__(self):
+        self._agents = {}
+        self._lock = threading.Lock()
+        self.ready = False
+        self.warmup_seconds = None
+
+    def get(self, agent_type: str = AGENT_TYPE):
+        if agent_type not in AGENT_BUILDERS:
+            raise ValueError(f"Unsupported AGENT_TYPE configured: {agent_type}")
+
+        agent = self._agents.get(agent_type)
+        if agent is None:
+            with self._lock:
+                agent = self._agents.get(agent_type)
+                if agent is None:
+                    logger.info(f"Building '{agent_type}' agent...")
+                    agent = AGENT_BUILDERS[agent_type]()
+                    self._agents[agent_type] = agent
+
+        return agent
+
+    async def warm_up(self):
+        """
+        Sends one tiny prompt so connections are open and the model is loaded.
+        A failing warm-up is logged, not fatal: the first request retries for real.
+        """
+        started = time.perf_counter()
+        try:
+            await get_llm().ainvoke(WARMUP_PROMPT)
+        except Exception:
+            logger.exception("LLM warm-up failed.")
+            return
+
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info(f"LLM warm-up finished in {self.warmup_seconds:.2f}s")
+
+    async def startup(self, agent_type: str = AGENT_TYPE):
+        await asyncio.to_thread(self.get, agent_type)
+
+        if LLM_WARMUP:
+            await self.warm_up()
+
+        self.ready = True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "agents": sorted(self._agents),
+            "warmup_seconds": self.warmup_seconds,
+        }
+
+
+agent_registry = AgentRegistry()
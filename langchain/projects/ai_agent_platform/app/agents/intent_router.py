@@ -0,0 +1,224 @@
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+
+from app.chains.handoff import CODE_BLOCK_RE
+from app.chains.static_analysis import CODE_START_RE
+from app.configs.settings import ROUTER_CACHE_SIZE, ROUTER_FULL_EVIDENCE, ROUTER_HISTORY_SIZE, ROUTER_MIN_CONFIDENCE
+
+# Tool name -> (pattern, weight). Only the instruction part of the input is
+# scored, so identifiers inside the code (`def test_...`) do not vote.
+ROUTING_RULES = {
+    "code_reviewer": [
+        (r"\breview(ed|ing|er)?\b", 2.0),
+        (r"\b(feedback|critique|audit)\b", 1.5),
+        (r"\b(best practices?|code smells?|anti-?patterns?|readab\w*|maintainab\w*|naming|lint\w*)\b", 1.0),
+        (r"\b(security|vulnerab\w*|injection|secrets?)\b", 1.0),
+        (r"\b(bugs?|issues?|problems?|mistakes?|wrong)\b", 0.5),
+        (r"\bcheck (this|my|the|following)\b", 1.0),
+    ],
+    "performance_optimizer": [
+        (r"\boptimi[sz](e|ed|ing|ation)\b", 2.0),
+        (r"\b(performance|perf|efficien\w*|throughput|latency|bottlenecks?)\b", 1.5),
+        (r"\b(faster|speed( it)? up|slow(er|ly)?|quicker)\b", 1.5),
+        (r"\b(memory usage|time complexity|big[- ]o|cach(e|ing)|profil(e|ing))\b", 1.0),
+    ],
+    "unit_test_generator": [
+        (r"\bunit[- ]?tests?\b", 2.5),
+        (r"\b(test cases?|tests? for|write tests?|generate tests?|add tests?)\b", 2.0),
+        (r"\b(pytest|unittest|jest|junit|test suite|coverage|mock(s|ing)?)\b", 1.5),
+        (r"\btest(s|ing)?\b", 0.5),
+    ],
+    "code_generator": [
+        (r"\b(generate|write|create|build|implement|scaffold)\b (an? |the |some )?(\w+ ){0,2}"
+         r"(function|class|script|program|module|api|endpoint|service|cli|app|code)\b", 2.0),
+        (r"\b(from scratch|boilerplate|in (python|typescript|javascript|java|go|golang|rust|kotlin|c#|c\+\+))\b", 1.0),
+        (r"\b(port|translate|convert) (it|this|the code)? ?(to|into)\b", 1.0),
+        (r"\brequirements?\b", 0.5),
+    ],
+}
+
+# A request line: plain words, no code punctuation, not a statement keyword
+REQUEST_LINE_RE = re.compile(r"^(?!(for|while|if|elif|else|return|print|with|try|except|raise|yield)\b)[A-Za-z][^=(){}\[\];<>#]*$")
+
+COMPILED_RULES = {
+    tool: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in rules]
+    for tool, rules in ROUTING_RULES.items()
+}
+
+
+@dataclass
+class RouteDecision:
+    tool: str | None
+    confidence: float
+    source: str  # "local", "llm", "cache" or "diff" (a diff is always a code review)
+    scores: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def instruction_text(text: str) -> str:
+    """
+    The prose part of an agent input: fenced code blocks are dropped and the
+    text is cut at the first line that starts Python code.
+    """
+    lines = []
+    for line in CODE_BLOCK_RE.sub("", text).splitlines():
+        if CODE_START_RE.match(line):
+            break
+        lines.append(line)
+    return " ".join(" ".join(lines).split())
+
+
+def split_requests(text: str) -> list:
+    """
+    Splits a multi-part input ("Review this: <code> Also, optimize this: <code>")
+    into segments, each starting with the request line(s) in front of its code.
+    Input without prose after code comes back as a single segment. A trailing
+    request without code of its own ("... Also, add tests for it.") works on
+    the code of the segment before it.
+    """
+    segments, current = [], []
+    code_start = None  # index in `current` of the segment's first code line
+    previous_code = []
+    in_fence = False
+
+    for line in text.strip("\n").splitlines():
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            if code_start is None:
+                code_start = len(current)
+        elif stripped and not in_fence and line == line.lstrip() and REQUEST_LINE_RE.match(stripped) \
+                and len(stripped.split()) >= 3 and not CODE_START_RE.match(line):
+            if code_start is not None:
+                segments.append("\n".join(current).strip("\n"))
+                previous_code = current[code_start:]
+                current, code_start = [], None
+        elif stripped and code_start is None:
+            code_start = len(current)
+        current.append(line)
+
+    if code_start is None and segments:
+        current += [""] + previous_code
+    segments.append("\n".join(current).strip("\n"))
+    return [segment for segment in segments if segment.strip()]
+
+
+def score(text: str, tools: list) -> dict:
+    """Summed rule weights per tool for the instruction part of `text`."""
+    instruction = instruction_text(text)
+    return {
+        tool: sum(weight for pattern, weight in COMPILED_RULES.get(tool, []) if pattern.search(instruction))
+        for tool in tools
+    }
+
+
+def confidence(scores: dict) -> float:
+    """
+    How clearly the best tool wins: its margin over the runner-up, scaled down
+    while the total evidence is below ROUTER_FULL_EVIDENCE. 0.0 without any match.
+    """
+    ranked = sorted(scores.values(), reverse=True) + [0.0, 0.0]
+    top, runner_up = ranked[0], ranked[1]
+    if top <= 0:
+        return 0.0
+    return round((top - runner_up) / top * min(1.0, top / ROUTER_FULL_EVIDENCE), 3)
+
+
+class IntentRouter:
+    """
+    Picks a tool locally from keyword features before the LLM planner runs.
+
+    `route()` returns a decision when the local scores (or an earlier decision
+    for the same input) are confident enough, otherwise None, and the caller
+    asks the LLM and records its answer with `remember()`.
+    """
+
+    def __init__(self, min_confidence: float = ROUTER_MIN_CONFIDENCE, cache_size: int = ROUTER_CACHE_SIZE):
+        self.min_confidence = min_confidence
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._recent = deque(maxlen=ROUTER_HISTORY_SIZE)  # tools of the latest decisions
+        self._lock = threading.Lock()
+        self._stats = {"cache_hits": 0, "local": 0, "llm": 0, "unresolved": 0}
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.sha256(" ".join(text.split()).lower().encode("utf-8")).hexdigest()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _cached(self, key: str) -> RouteDecision | None:
+        with self._lock:
+            decision = self._cache.get(key)
+            if decision is not None:
+                self._cache.move_to_end(key)
+                self._recent.append(decision.tool)
+                self._stats["cache_hits"] += 1
+        return decision
+
+    def _store(self, key: str, decision: RouteDecision):
+        with self._lock:
+            self._recent.append(decision.tool)
+            self._cache[key] = decision
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def route(self, text: str, tools: list) -> RouteDecision | None:
+        key = self._key(text)
+        cached = self._cached(key)
+        if cached is not None and cached.tool in tools:
+            return RouteDecision(cached.tool, cached.confidence, "cache", cached.scores)
+
+        scores = score(text, tools)
+        certainty = confidence(scores)
+        if certainty < self.min_confidence:
+            return None
+
+        decision = RouteDecision(max(scores, key=scores.get), certainty, "local", scores)
+        self._store(key, decision)
+        self._count("local")
+        return decision
+
+    def guess(self, text: str, tools: list) -> str | None:
+        """
+        Cheap guess for an input `route()` was unsure about: the best local
+        score if there is a single best one, else the most frequent recent tool.
+        """
+        scores = score(text, tools)
+        if confidence(scores) > 0:
+            return max(scores, key=scores.get)
+
+        with self._lock:
+            recent = Counter(tool for tool in self._recent if tool in tools)
+        return recent.most_common(1)[0][0] if recent else None
+
+    def remember(self, text: str, tool: str | None) -> RouteDecision:
+        """Records the LLM planner's answer; unresolved answers are not cached."""
+        decision = RouteDecision(tool, 1.0 if tool else 0.0, "llm")
+        if tool is None:
+            self._count("unresolved")
+            return decision
+
+        self._store(self._key(text), decision)
+        self._count("llm")
+        return decision
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["cache_entries"] = len(self._cache)
+
+        decisions = stats["cache_hits"] + stats["local"] + stats["llm"] + stats["unresolved"]
+        stats["llm_call_rate"] = (stats["llm"] + stats["unresolved"]) / decisions if decisions else 0.0
+        return stats
+
+
+intent_router = IntentRouter()
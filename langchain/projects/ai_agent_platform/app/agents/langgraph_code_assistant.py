@@ -1,8 +1,13 @@
-from typing import TypedDict
-from langchain_core.prompts import ChatPromptTemplate
-from langgraph.graph import StateGraph, END
-from app.tools import all_tools
+import asyncio
+import operator
+from typing import Annotated, TypedDict
+from app.agents.intent_router import RouteDecision, intent_router, split_requests
+from app.agents.session_memory import load_context, record_turn, with_session_context
+from app.agents.speculation import speculator
+from app.configs.settings import ROUTER_ENABLED
+from app.tools import tool_names, get_tool, get_tool_stream
 from app.llm.llm_provider import get_llm
+from app.utils.lazy import Lazy
 from app.utils.markdown_logger import save_tool_output
 
 
@@ -14,91 +19,396 @@ class AgentState(TypedDict, total=False):
     input: str
     tool_to_use: str
     output: str
+    profile: str  # "detailed" (default) or "fast"
+    routing: dict  # RouteDecision: tool, confidence, source ("local", "cache" or "llm"), scores
+    tasks: list  # planned [{"tool", "code", "routing"}, ...], one parallel branch each
+    index: int  # position of the task a tool_executor branch runs
+    results: Annotated[list, operator.add]  # [{"index", "tool", "output"}, ...] from the branches
+    session_id: str  # optional; the run sees and extends the session's context
+    session: dict  # loaded session context: {"text", "code", "code_id", "turns"}
+    diff: str  # optional unified diff against `input` (the original file): reviews the changed regions
 
 
 # ---------------------------
-# Load tools and LLM
+# Recall Node: loads the session context of a follow-up request
 # ---------------------------
 
-tools = all_tools()
-tool_map = {tool.name: tool for tool in tools}
+def recall_node(state: AgentState) -> AgentState:
+    session_id = state.get("session_id")
+    return {"session": load_context(session_id) or {}} if session_id else {}
+
+
+async def arecall_node(state: AgentState) -> AgentState:
+    session_id = state.get("session_id")
+    return {"session": await asyncio.to_thread(load_context, session_id) or {}} if session_id else {}
 
-llm = get_llm()
 
 # ---------------------------
-# Planner Node
+# Planner Node (tools, LLM and graph are loaded on first use). The local
+# intent router answers first; the LLM planner only runs when it is unsure.
 # ---------------------------
 
-planner_prompt = ChatPromptTemplate.from_messages([
+PLANNER_MESSAGES = [
     ("system", "You are a planner. Decide which tool to use based on user input. Available tools: {tool_names}. Respond ONLY with tool name."),
     ("human", "{input}")
-])
+]
 
-planner_chain = planner_prompt | llm
 
-def planner_node(state: AgentState) -> AgentState:
-    user_input = state["input"]
-    tool_names = ", ".join(tool_map.keys())
+def _build_planner_chain():
+    from langchain_core.prompts import ChatPromptTemplate
 
-    response = planner_chain.invoke({
-        "input": user_input,
-        "tool_names": tool_names
-    })
+    return ChatPromptTemplate.from_messages(PLANNER_MESSAGES) | get_llm()
+
+
+planner_chain = Lazy(_build_planner_chain)
+
+
+def _resolve_tool_name(response) -> str | None:
+    # Chat models answer with a message, and replies like "Tool: `code_reviewer`."
+    # are common: take the exact name, else the first tool name mentioned
+    text = str(getattr(response, "content", response)).strip().strip("`'\".").lower()
+    names = tool_names()
+    if text in names:
+        return text
+
+    mentioned = [(text.find(name), name) for name in names if name in text]
+    return min(mentioned)[1] if mentioned else None
+
+
+def _local_route(user_input: str):
+    # Confident keyword match or cached decision; None means "ask the LLM"
+    return intent_router.route(user_input, tool_names()) if ROUTER_ENABLED else None
 
-    # FIXED → make sure response is safely treated as string
-    tool_name = str(response).strip()
 
-    if tool_name not in tool_map:
-        tool_name = None
+def _segment(user_input: str) -> list:
+    """
+    [[code segment, local decision or None], ...]. A later request in the input
+    ("... Also, optimize this: <code>") becomes its own task only when the router
+    is confident about it; otherwise it stays with the segment before it.
+    """
+    segments = split_requests(user_input) if ROUTER_ENABLED else []
+    planned = []
 
+    for segment in segments:
+        decision = _local_route(segment)
+        if planned and decision is None:
+            planned[-1][0] += "\n\n" + segment
+        else:
+            planned.append([segment, decision])
+
+    if len(planned) <= 1:
+        # A single request keeps the input exactly as the user sent it
+        return [[user_input, planned[0][1] if planned else _local_route(user_input)]]
+    return planned
+
+
+def _plan(user_input: str, planned: list) -> AgentState:
+    # A request no tool matched stays in the plan (tool None) and gets the
+    # fallback answer in the merged output instead of vanishing from it
+    tasks = [
+        {"tool": decision.tool, "code": code, "routing": decision.to_dict()}
+        for code, decision in planned
+    ]
+    routed = [task for task in tasks if task["tool"]]
     return {
         "input": user_input,
-        "tool_to_use": tool_name
+        "tool_to_use": routed[0]["tool"] if routed else None,
+        "routing": routed[0]["routing"] if routed else planned[0][1].to_dict(),
+        "tasks": tasks if routed else []
     }
 
 
+def _diff_plan(user_input: str) -> AgentState:
+    # The input is the file the diff applies to: one review, no routing needed
+    return _plan(user_input, [[user_input, RouteDecision("code_reviewer", 1.0, "diff")]])
+
+
+def planner_node(state: AgentState) -> AgentState:
+    user_input = state["input"]
+    if state.get("diff"):
+        return _diff_plan(user_input)
+
+    planned = _segment(user_input)
+
+    for task in planned:
+        if task[1] is None:
+            response = planner_chain().invoke({
+                "input": task[0],
+                "tool_names": ", ".join(tool_names())
+            })
+            task[1] = intent_router.remember(task[0], _resolve_tool_name(response))
+
+    return _plan(user_input, planned)
+
+
+async def aplanner_node(state: AgentState) -> AgentState:
+    user_input = state["input"]
+    if state.get("diff"):
+        return _diff_plan(user_input)
+
+    planned = _segment(user_input)
+
+    async def ask_llm(task):
+        # Speculative mode: the likely tool's first step runs while the LLM decides,
+        # on the input dispatch_tasks will give the tool
+        tool_input = with_session_context(task[0], state.get("session"))
+        speculation = speculator.start(task[0], tool_names(), state.get("profile"), tool_input)
+        try:
+            response = await planner_chain().ainvoke({
+                "input": task[0],
+                "tool_names": ", ".join(tool_names())
+            })
+            task[1] = intent_router.remember(task[0], _resolve_tool_name(response))
+        finally:
+            await speculator.settle(speculation, task[1].tool if task[1] else None)
+
+    await asyncio.gather(*(ask_llm(task) for task in planned if task[1] is None))
+
+    return _plan(user_input, planned)
+
+
 # ---------------------------
-# Tool Executor Node
+# Tool Executor Node (one branch per planned task) and Merge Node
 # ---------------------------
 
+def _no_tool_result(user_input: str) -> AgentState:
+    return {
+        "input": user_input,
+        "tool_to_use": "none",
+        "output": f"No valid tool found for input. User said:\n\n{user_input}"
+    }
+
+
+def _task_result(state: AgentState, tool_name: str, output: str) -> AgentState:
+    return {"results": [{"index": state.get("index", 0), "tool": tool_name, "output": output}]}
+
+
+def _tool_inputs(state: AgentState) -> dict:
+    inputs = {"code": state["input"], "profile": state.get("profile")}
+    if state.get("diff"):
+        inputs["diff"] = state["diff"]  # only planned with code_reviewer
+    return inputs
+
+
 def tool_node(state: AgentState) -> AgentState:
     user_input = state["input"]
     tool_name = state["tool_to_use"]
 
     if tool_name:
-        tool = tool_map[tool_name]
-        result = tool.invoke({"code": user_input})
-        save_tool_output(tool_name, user_input, result)
+        tool = get_tool(tool_name)
+        result = tool.invoke(_tool_inputs(state))
 
-        return {
-            "input": user_input,
-            "tool_to_use": tool_name,
-            "output": result
-        }
+        return _task_result(state, tool_name, result)
 
     else:
-        output = f"No valid tool found for input. User said:\n\n{user_input}"
-        save_tool_output("agent_response", user_input, output)
+        fallback = _no_tool_result(user_input)
+        save_tool_output("agent_response", user_input, fallback["output"])
 
-        return {
-            "input": user_input,
-            "tool_to_use": "none",
-            "output": output
-        }
+        return _task_result(state, "none", fallback["output"])
+
+
+async def atool_node(state: AgentState) -> AgentState:
+    user_input = state["input"]
+    tool_name = state["tool_to_use"]
+
+    if tool_name:
+        tool = get_tool(tool_name)
+        result = await tool.ainvoke(_tool_inputs(state))
+
+        return _task_result(state, tool_name, result)
+
+    else:
+        fallback = _no_tool_result(user_input)
+        save_tool_output("agent_response", user_input, fallback["output"])
+
+        return _task_result(state, "none", fallback["output"])
+
+
+def dispatch_tasks(state: AgentState) -> list:
+    """
+    Sends every planned task to its own tool_executor branch; LangGraph runs
+    them in parallel. Without a task, one branch produces the fallback answer.
+    In a session, every task's input carries the session context, except a diff
+    review: the diff must apply to its input unchanged.
+    """
+    from langgraph.types import Send
+
+    tasks = state.get("tasks") or [{"tool": None, "code": state["input"]}]
+    diff = state.get("diff")
+    return [
+        Send("tool_executor", {
+            "input": with_session_context(task["code"], state.get("session")) if task["tool"] and not diff else task["code"],
+            "tool_to_use": task["tool"],
+            "profile": state.get("profile"),
+            "index": index,
+            **({"diff": diff} if diff else {}),
+        })
+        for index, task in enumerate(tasks)
+    ]
+
+
+def merge_outputs(results: list) -> str:
+    """One report per task, in request order; a single task's report is returned as is."""
+    results = sorted(results, key=lambda result: result["index"])
+    if len(results) == 1:
+        return results[0]["output"]
+
+    return "\n\n".join(
+        f"# === Task {position}: {result['tool']} ===\n\n{result['output']}"
+        for position, result in enumerate(results, start=1)
+    )
+
+
+def _merge(state: AgentState) -> AgentState:
+    results = sorted(state["results"], key=lambda result: result["index"])
+
+    return {
+        "tool_to_use": ", ".join(result["tool"] for result in results),
+        "output": merge_outputs(results)
+    }
+
+
+def merge_node(state: AgentState) -> AgentState:
+    merged = _merge(state)
+    if state.get("session_id"):
+        record_turn(state["session_id"], state["input"], merged["tool_to_use"], merged["output"], state.get("session"))
+
+    return merged
+
+
+async def amerge_node(state: AgentState) -> AgentState:
+    merged = _merge(state)
+    if state.get("session_id"):
+        await asyncio.to_thread(
+            record_turn, state["session_id"], state["input"], merged["tool_to_use"], merged["output"], state.get("session")
+        )
+
+    return merged
+
+
+# ---------------------------
+# Streaming run (planner + tool events)
+# ---------------------------
+
+async def _astream_tasks(tasks: list, profile: str = None):
+    # Streams every task's tool concurrently; events interleave and carry their "task" index
+    queue = asyncio.Queue()
+    done = object()
+
+    async def pump(index, task):
+        try:
+            if task["tool"] is None:
+                fallback = _no_tool_result(task["code"])
+                save_tool_output("agent_response", task["code"], fallback["output"])
+                await queue.put({"event": "tool_end", "tool": "none", "output": fallback["output"], "task": index})
+                return
+            async for event in get_tool_stream(task["tool"])(task["code"], profile=profile):
+                await queue.put({**event, "task": index})
+        finally:
+            await queue.put(done)
+
+    pumps = [asyncio.create_task(pump(index, task)) for index, task in enumerate(tasks)]
+    remaining = len(pumps)
+    try:
+        while remaining:
+            event = await queue.get()
+            if event is done:
+                remaining -= 1
+                continue
+            yield event
+
+        # Surface a failed tool instead of merging partial output
+        for task in pumps:
+            task.result()
+    finally:
+        for task in pumps:
+            task.cancel()
+
+
+async def astream_agent_events(user_input: str, profile: str = None, session_id: str = None):
+    """
+    Streams a full agent run as events, for the /agent/stream endpoint.
+
+    Emits the planner decision first, then the step, token and report events of
+    every planned tool (tagged with their "task" index), and finally a "done"
+    event with the merged output. With a session_id the tools see the session
+    context and the run is recorded as the session's next turn.
+    """
+    session = await asyncio.to_thread(load_context, session_id) if session_id else None
+    plan = await aplanner_node({"input": user_input, "profile": profile, "session": session})
+    tool_name = plan["tool_to_use"]
+    tasks = plan["tasks"]
+
+    routing = plan["routing"]
+    yield {
+        "event": "planner",
+        "tool": tool_name or "none",
+        "source": routing["source"],
+        "confidence": routing["confidence"],
+        "tasks": [task["tool"] or "none" for task in tasks],
+    }
+
+    if not tool_name:
+        fallback = _no_tool_result(user_input)
+        save_tool_output("agent_response", user_input, fallback["output"])
+        if session_id:
+            await asyncio.to_thread(record_turn, session_id, user_input, "none", fallback["output"], session)
+        yield {"event": "done", "tool": "none", "output": fallback["output"]}
+        return
+
+    if session:
+        tasks = [{**task, "code": with_session_context(task["code"], session)} if task["tool"] else task for task in tasks]
+
+    results = []
+    async for event in _astream_tasks(tasks, profile=profile):
+        if event["event"] == "tool_end":
+            results.append({"index": event["task"], "tool": event["tool"], "output": event["output"]})
+            continue
+        yield event
+
+    tool_names_used = ", ".join(task["tool"] or "none" for task in tasks)
+    output = merge_outputs(results)
+    if session_id:
+        await asyncio.to_thread(record_turn, session_id, user_input, tool_names_used, output, session)
+
+    yield {"event": "done", "tool": tool_names_used, "output": output}
 
 
 # ---------------------------
 # Define Graph and Compile
 # ---------------------------
 
-graph = StateGraph(AgentState)
+def build_code_assistant_agent():
+    """
+    Compiles the recall -> planner -> tool executor branches -> merge graph.
+    Called once by the agent registry.
+    """
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import StateGraph, END
+
+    graph = StateGraph(AgentState)
+
+    # Each node carries a sync and an async implementation, so the compiled graph
+    # serves both `invoke` (scripts) and `ainvoke` (FastAPI) without blocking the loop.
+    graph.add_node("recall", RunnableLambda(recall_node, afunc=arecall_node))
+    graph.add_node("planner", RunnableLambda(planner_node, afunc=aplanner_node))
+    graph.add_node("tool_executor", RunnableLambda(tool_node, afunc=atool_node))
+    graph.add_node("merge", RunnableLambda(merge_node, afunc=amerge_node))
+
+    graph.add_edge("recall", "planner")
+    graph.add_conditional_edges("planner", dispatch_tasks, ["tool_executor"])
+    graph.add_edge("tool_executor", "merge")
+    graph.add_edge("merge", END)
+
+    graph.set_entry_point("recall")
 
-graph.add_node("planner", planner_node)
-graph.add_node("tool_executor", tool_node)
+    return graph.compile()
 
-graph.add_edge("planner", "tool_executor")
-graph.add_edge("tool_executor", END)
 
-graph.set_entry_point("planner")
+def __getattr__(name):
+    # `code_assistant_agent` is compiled on first access and shared with the registry
+    if name == "code_assistant_agent":
+        from app.agents.agent_registry import agent_registry
+        return agent_registry.get("langgraph")
 
-code_assistant_agent = graph.compile()
\ No newline at end of file
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,198 @@
+import re
+
+from app.agents.intent_router import REQUEST_LINE_RE
+from app.agents.session_store import get_session_store
+from app.chains.handoff import CODE_BLOCK_RE, extract_code_blocks, extract_findings
+from app.chains.static_analysis import CODE_START_RE
+from app.configs.settings import (
+    SESSION_RECENT_TURNS,
+    SESSION_SUMMARY_FINDINGS,
+    SESSION_SUMMARY_MAX_TOKENS,
+    SESSION_TURN_MAX_TOKENS,
+)
+from app.utils.token_counter import count_tokens
+
+# Report sections holding a new version of the code the tool was given; a
+# follow-up without code works on the latest of them (else on the input code)
+REVISED_CODE_SECTIONS = ("## === FINAL REVIEWED CODE ===", "## === FINAL OPTIMIZED CODE ===", "## === GENERATED CODE ===")
+SECTION_RE = re.compile(r"^#{1,2} === .* ===\s*$", re.MULTILINE)
+
+MAX_REQUEST_CHARS = 200
+TRUNCATED = "[... truncated]"
+
+
+def split_input(text: str) -> tuple:
+    """
+    (prose, code) of an agent input. The code is its fenced blocks, else
+    everything from the first line that is indented or not plain words;
+    None when the input is prose only ("now add tests for it").
+    """
+    blocks = extract_code_blocks(text)
+    if blocks:
+        return " ".join(CODE_BLOCK_RE.sub(" ", text).split()), "\n\n".join(blocks)
+
+    lines = text.strip("\n").splitlines()
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped and (line != line.lstrip() or CODE_START_RE.match(line) or not REQUEST_LINE_RE.match(stripped)):
+            return " ".join(" ".join(lines[:index]).split()), "\n".join(lines[index:])
+
+    return " ".join(text.split()), None
+
+
+def revised_code(output: str) -> str | None:
+    """The code blocks of the last revised-code section of a (merged) tool report."""
+    starts = [output.rfind(title) for title in REVISED_CODE_SECTIONS]
+    start = max(starts)
+    if start < 0:
+        return None
+
+    section = output[start:].split("\n", 1)[-1]
+    following = SECTION_RE.search(section)
+    if following:
+        section = section[:following.start()]
+
+    blocks = extract_code_blocks(section)
+    return "\n\n".join(blocks) if blocks else None
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+
+    while text and tokens > max_tokens:
+        text = text[:int(len(text) * max_tokens / tokens * 0.95)]
+        tokens = count_tokens(text)
+    return f"{text.rstrip()}\n{TRUNCATED}"
+
+
+def _ref(artifact: str) -> str:
+    return f"[code {artifact}]"
+
+
+def _with_refs(markdown: str, store) -> str:
+    # Fenced code blocks are stored once and referenced by hash
+    return CODE_BLOCK_RE.sub(lambda match: _ref(store.put_artifact(match.group(1))) if match.group(1).strip() else "", markdown)
+
+
+# --- summary of older turns ------------------------------------------------
+
+def render_summary(summary: dict) -> str:
+    lines = []
+    if summary.get("omitted"):
+        lines.append(f"- ({summary['omitted']} earlier turns omitted)")
+    for entry in summary.get("entries", []):
+        findings = f": {'; '.join(entry['findings'])}" if entry["findings"] else ""
+        lines.append(f"- Turn {entry['turn']} [{entry['tool'] or 'none'}] {entry['request']}{findings}")
+    return "\n".join(lines)
+
+
+def compact_summary(summary: dict, evicted: list, max_tokens: int = SESSION_SUMMARY_MAX_TOKENS) -> dict:
+    """
+    Folds turns leaving the recent window into the summary: each becomes one
+    line (request plus its first findings). Earlier lines are left as they
+    are, so the summary is updated, not rewritten. Over max_tokens, the oldest
+    lines lose their findings first and are then dropped.
+    """
+    entries = [dict(entry) for entry in summary.get("entries", [])]
+    omitted = summary.get("omitted", 0)
+
+    for turn in evicted:
+        request = turn["request"]
+        if len(request) > MAX_REQUEST_CHARS:
+            request = request[:MAX_REQUEST_CHARS - 3].rstrip() + "..."
+        entries.append({
+            "turn": turn["position"],
+            "tool": turn["tool"],
+            "request": request,
+            "findings": extract_findings(turn["output"], SESSION_SUMMARY_FINDINGS),
+        })
+
+    while entries and count_tokens(render_summary({"omitted": omitted, "entries": entries})) > max_tokens:
+        detailed = next((entry for entry in entries if entry["findings"]), None)
+        if detailed is not None:
+            detailed["findings"] = []
+        else:
+            entries.pop(0)
+            omitted += 1
+
+    return {"omitted": omitted, "entries": entries}
+
+
+# --- context of a follow-up request -----------------------------------------
+
+def render_context(session: dict) -> str:
+    parts = []
+
+    summary = render_summary(session["summary"])
+    if summary:
+        parts.append(f"EARLIER TURNS (SUMMARY):\n{summary}")
+    for turn in session["recent"]:
+        parts.append(f"TURN {turn['position']} [{turn['tool'] or 'none'}]\nRequest: {turn['request']}\nOutput:\n{turn['output']}")
+
+    return "SESSION CONTEXT:\n\n" + "\n\n".join(parts) if parts else ""
+
+
+def load_context(session_id: str) -> dict | None:
+    """
+    {"text", "code", "code_id", "turns"} for a session: its summary and recent
+    turns rendered for the prompt, plus the latest code artifact. None for an
+    unknown session.
+    """
+    store = get_session_store()
+    session = store.load(session_id)
+    if session is None:
+        return None
+
+    code_id = session["latest_code"]
+    return {
+        "text": render_context(session),
+        "code": store.get_artifact(code_id) if code_id else None,
+        "code_id": code_id,
+        "turns": session["turns"],
+    }
+
+
+def with_session_context(task_input: str, context: dict | None) -> str:
+    """
+    A task's input with the session context appended. Input without code of its
+    own works on the session's latest code artifact. The prompt grows by at most
+    the summary cap plus SESSION_RECENT_TURNS capped turns, however long the session.
+    """
+    if not context:
+        return task_input
+
+    parts = [task_input]
+    if context.get("code") and split_input(task_input)[1] is None:
+        parts.append(f"CODE (session artifact {context['code_id']}):\n```\n{context['code']}\n```")
+    if context.get("text"):
+        parts.append(context["text"])
+
+    return "\n\n".join(parts)
+
+
+def record_turn(session_id: str, user_input: str, tool_name: str, output: str, context: dict | None = None) -> int:
+    """
+    Stores a finished request as the session's latest turn: code in the request
+    and output is replaced by artifact references, the output is capped at
+    SESSION_TURN_MAX_TOKENS, and turns beyond the recent window are folded into
+    the summary. Returns the turn number.
+    """
+    store = get_session_store()
+    prose, code = split_input(user_input)
+
+    request = prose
+    if code is not None:
+        request = f"{prose} {_ref(store.put_artifact(code))}".strip()
+
+    # The session's code after this turn: revised by the tool, else the one it worked on
+    latest = revised_code(output) or code or (context or {}).get("code")
+    turn = {
+        "request": request,
+        "tool": tool_name,
+        "output": truncate_tokens(_with_refs(output, store), SESSION_TURN_MAX_TOKENS),
+        "code": store.put_artifact(latest) if latest else None,
+    }
+
+    return store.append_turn(session_id, turn, SESSION_RECENT_TURNS, compact_summary)
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.configs.settings import SESSION_DB_PATH, SESSION_EXPIRE_INTERVAL, SESSION_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL DEFAULT '{}',
+    turns INTEGER NOT NULL DEFAULT 0,
+    latest_code TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_turns (
+    session_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    request TEXT NOT NULL,
+    tool TEXT,
+    output TEXT NOT NULL,
+    code TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, position)
+);
+CREATE TABLE IF NOT EXISTS session_artifacts (
+    id TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_updated ON sessions (updated_at);
+CREATE INDEX IF NOT EXISTS idx_session_artifacts_created ON session_artifacts (created_at);
+"""
+
+
+def artifact_id(content: str) -> str:
+    """Content address of a code artifact (16 hex chars of its sha256)."""
+    return hashlib.sha256(content.strip().encode("utf-8")).hexdigest()[:16]
+
+
+class SessionStore:
+    """
+    SQLite tables behind agent sessions: the session's summary of older turns,
+    its recent turns verbatim and the code artifacts they reference by hash.
+
+    Like the job store, every call opens its own connection so the store is safe
+    to share between threads and processes. Sessions idle for longer than
+    ttl_seconds read as unknown; writes purge them, together with artifacts no
+    session references, at most every expire_interval seconds.
+    """
+
+    def __init__(
+        self,
+        db_path: str = SESSION_DB_PATH,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        expire_interval: float = SESSION_EXPIRE_INTERVAL,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.expire_interval = expire_interval
+        self._last_expired = time.monotonic()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._expire(conn)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _expire(self, conn):
+        cutoff = time.time() - self.ttl_seconds
+        conn.execute("DELETE FROM session_turns WHERE session_id IN (SELECT id FROM sessions WHERE updated_at < ?)", (cutoff,))
+        conn.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+        conn.execute(
+            "DELETE FROM session_artifacts WHERE created_at < ? "
+            "AND id NOT IN (SELECT latest_code FROM sessions WHERE latest_code IS NOT NULL) "
+            "AND id NOT IN (SELECT code FROM session_turns WHERE code IS NOT NULL)",
+            (cutoff,),
+        )
+
+    def _expire_if_due(self, conn):
+        if time.monotonic() - self._last_expired >= self.expire_interval:
+            self._last_expired = time.monotonic()
+            self._expire(conn)
+
+    def create(self) -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._connect() as conn:
+            self._expire_if_due(conn)
+            conn.execute("INSERT INTO sessions (id, created_at, updated_at) VALUES (?, ?, ?)", (session_id, now, now))
+
+        return session_id
+
+    def load(self, session_id: str) -> dict | None:
+        """
+        Returns {"id", "summary", "turns", "latest_code", "recent": [turn, ...]}
+        with the recent turns oldest first, or None for an unknown or expired session.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM sessions WHERE id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+            if row is None:
+                return None
+            recent = conn.execute(
+                "SELECT position, request, tool, output, code FROM session_turns WHERE session_id = ? ORDER BY position",
+                (session_id,),
+            ).fetchall()
+
+        return {
+            "id": row["id"],
+            "summary": json.loads(row["summary"]),
+            "turns": row["turns"],
+            "latest_code": row["latest_code"],
+            "recent": [dict(turn) for turn in recent],
+        }
+
+    def delete(self, session_id: str) -> bool:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session_turns WHERE session_id = ?", (session_id,))
+            deleted = conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+
+        return deleted > 0
+
+    def put_artifact(self, content: str) -> str:
+        key = artifact_id(content)
+        with self._connect() as conn:
+            # Re-saving refreshes the timestamp, so code still in use does not expire
+            conn.execute(
+                "INSERT OR REPLACE INTO session_artifacts (id, content, created_at) VALUES (?, ?, ?)",
+                (key, content.strip("\n"), time.time()),
+            )
+        return key
+
+    def get_artifact(self, key: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT content FROM session_artifacts WHERE id = ?", (key,)).fetchone()
+
+        return row["content"] if row else None
+
+    def append_turn(self, session_id: str, turn: dict, keep_recent: int, compact) -> int:
+        """
+        Adds {"request", "tool", "output", "code"} as the session's next turn
+        (creating the session if needed, starting an expired one over) and folds
+        turns older than the last `keep_recent` into the summary with
+        `compact(summary, evicted_turns)`. Runs in one write transaction, so
+        concurrent requests of a session cannot lose turns. Returns the turn's position (1-based).
+        """
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._expire_if_due(conn)
+                # Not purged yet, but load() already reports it gone
+                conn.execute(
+                    "DELETE FROM session_turns WHERE session_id IN (SELECT id FROM sessions WHERE id = ? AND updated_at < ?)",
+                    (session_id, now - self.ttl_seconds),
+                )
+                conn.execute("DELETE FROM sessions WHERE id = ? AND updated_at < ?", (session_id, now - self.ttl_seconds))
+
+                conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, created_at, updated_at) VALUES (?, ?, ?)",
+                    (session_id, now, now),
+                )
+                row = conn.execute("SELECT summary, turns, latest_code FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                position = row["turns"] + 1
+
+                conn.execute(
+                    "INSERT INTO session_turns (session_id, position, request, tool, output, code, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, position, turn["request"], turn.get("tool"), turn["output"], turn.get("code"), now),
+                )
+
+                summary = json.loads(row["summary"])
+                evicted = conn.execute(
+                    "SELECT position, request, tool, output, code FROM session_turns "
+                    "WHERE session_id = ? AND position <= ? ORDER BY position",
+                    (session_id, position - keep_recent),
+                ).fetchall()
+                if evicted:
+                    summary = compact(summary, [dict(item) for item in evicted])
+                    conn.execute(
+                        "DELETE FROM session_turns WHERE session_id = ? AND position <= ?",
+                        (session_id, position - keep_recent),
+                    )
+
+                conn.execute(
+                    "UPDATE sessions SET summary = ?, turns = ?, latest_code = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(summary), position, turn.get("code") or row["latest_code"], now, session_id),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        return position
+
+
+_session_store = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Returns the process-wide session store.
+    """
+    global _session_store
+
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                _session_store = SessionStore()
+
+    return _session_store
@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from dataclasses import dataclass
+from importlib import import_module
+
+from app.agents.intent_router import intent_router
+from app.configs.settings import SPECULATION_ENABLED, SPECULATION_MAX_PER_MINUTE
+from app.llm.rate_limiter import TokenBucket
+from app.utils.logger import logger
+
+# Tool name -> (module, attribute) of the work a speculative run does ahead of
+# the tool: a Pipeline (its `aprefetch` runs the first step into the checkpoint
+# store) or an async function of the input. Modules are imported on first use.
+SPECULATION_TARGETS = {
+    "code_reviewer": ("app.chains.code_review_chain", "review_pipeline"),
+    "performance_optimizer": ("app.chains.performance_optimization_chain", "optimization_pipeline"),
+    "unit_test_generator": ("app.chains.unit_test_generation_chain", "test_generation_pipeline"),
+    "code_generator": ("app.chains.code_generation_chain", "aprefetch_analysis"),
+}
+
+PIPELINE_TOOLS = ("code_reviewer", "performance_optimizer", "unit_test_generator")
+
+
+def _prefetch(tool_name: str):
+    module_name, attribute = SPECULATION_TARGETS[tool_name]
+    target = getattr(import_module(module_name), attribute)
+    return getattr(target, "aprefetch", target)
+
+
+@dataclass
+class Speculation:
+    tool: str
+    task: asyncio.Task
+
+
+class Speculator:
+    """
+    Starts the likely tool's first LLM step while the planner LLM call is in
+    flight. The work lands where the tool run picks it up (pipeline checkpoint
+    or code generation cache), so when the planner agrees the step is not paid for twice;
+    otherwise it is cancelled. Speculative runs are limited by a token bucket
+    of `max_per_minute` (0 = no limit).
+    """
+
+    def __init__(self, enabled: bool = SPECULATION_ENABLED, max_per_minute: float = SPECULATION_MAX_PER_MINUTE):
+        self.enabled = enabled
+        self.budget = TokenBucket(max_per_minute) if max_per_minute > 0 else None
+        self._lock = threading.Lock()
+        self._stats = {"started": 0, "kept": 0, "cancelled": 0, "failed": 0, "skipped": 0, "over_budget": 0}
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _worthwhile(self, tool_name: str, profile: str = None) -> bool:
+        # The fast profile and fan-out mode never resume from a checkpointed step
+        if tool_name not in PIPELINE_TOOLS:
+            return True
+
+        from app.chains.fan_out import resolve_mode
+        from app.chains.fast_profile import resolve_profile
+
+        return resolve_profile(profile) == "detailed" and resolve_mode() == "sequential"
+
+    def start(self, text: str, tools: list, profile: str = None, tool_input: str = None) -> Speculation | None:
+        """
+        Guesses the tool for `text` and starts its first step on `tool_input`
+        (default `text`), the exact input the tool will run on, so the run
+        finds the work; None if not speculating.
+        """
+        if not self.enabled:
+            return None
+
+        tool_name = intent_router.guess(text, tools)
+        if tool_name not in SPECULATION_TARGETS or not self._worthwhile(tool_name, profile):
+            self._count("skipped")
+            return None
+
+        if self.budget is not None and not self.budget.try_take():
+            self._count("over_budget")
+            return None
+
+        logger.info(f"Speculatively starting {tool_name} while the planner decides.")
+        self._count("started")
+        return Speculation(tool_name, asyncio.create_task(_prefetch(tool_name)(tool_input or text)))
+
+    async def settle(self, speculation: Speculation | None, chosen_tool: str | None):
+        """
+        Keeps the speculative work when the planner chose the same tool (waiting
+        for it to finish, so the tool run resumes after it), cancels it otherwise.
+        """
+        if speculation is None:
+            return
+
+        if speculation.tool != chosen_tool:
+            speculation.task.cancel()
+            self._count("cancelled")
+            await asyncio.gather(speculation.task, return_exceptions=True)
+            return
+
+        try:
+            await speculation.task
+            self._count("kept")
+        except Exception:
+            # The tool run simply does the step itself
+            logger.exception(f"Speculative {speculation.tool} step failed.")
+            self._count("failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+
+        # A failed speculative step was still the right guess
+        settled = stats["kept"] + stats["cancelled"] + stats["failed"]
+        stats["hit_rate"] = (stats["kept"] + stats["failed"]) / settled if settled else 0.0
+        return stats
+
+
+speculator = Speculator()
@@ -1,13 +1,57 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
 from app.agents.agent_factory import get_selected_agent
+from app.agents.agent_registry import agent_registry
+from app.agents.intent_router import intent_router
+from app.agents.speculation import speculator
+from app.agents.langgraph_code_assistant import astream_agent_events
+from app.agents.session_memory import render_summary
+from app.agents.session_store import get_session_store
+from app.chains.pipeline_engine import step_thread_stats
+from app.tools import arun_tool_batch, tool_names
+from app.configs.settings import CODE_GENERATION_MAX_LANGUAGES, JOB_WORKERS, LLM_CACHE_ENABLED
+from app.llm.rate_limiter import limiter_stats
+from app.jobs.job_store import JobStore
+from app.jobs.job_worker import JobWorkerPool
+from app.utils.lazy import Lazy
 from app.utils.logger import logger
+from app.utils.markdown_logger import tool_log_writer
 from fastapi.middleware.cors import CORSMiddleware
 
+# Opened on first use, so importing the app does not create the job database
+job_store = Lazy(JobStore)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build agents and warm up the LLM before the server starts accepting requests
+    await agent_registry.startup()
+
+    worker_pool = None
+    if JOB_WORKERS > 0:
+        worker_pool = JobWorkerPool(job_store(), workers=JOB_WORKERS)
+        await worker_pool.start()
+
+    yield
+
+    if worker_pool is not None:
+        await worker_pool.stop()
+    # Write the tool log entries still queued
+    await asyncio.to_thread(tool_log_writer.close)
+
+
 app = FastAPI(
     title="AI Agent Platform",
     description="AI Code Assistant Agent API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,13 +64,108 @@ app.add_middleware(
 
 class AgentRequest(BaseModel):
     input: str
+    # "fast" answers in one LLM call; "detailed" runs the multi-step pipelines
+    profile: Optional[Literal["detailed", "fast"]] = None
+    # Follow-up requests of one conversation share a session (langgraph agent);
+    # an unknown id starts a new session
+    session_id: Optional[str] = None
+    # Unified diff against `input`, which is then the original file: the langgraph
+    # agent reviews only the changed regions (code_reviewer). Not streamed.
+    diff: Optional[str] = None
 
 class AgentResponse(BaseModel):
     result: str
+    session_id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    inputs: List[str] = Field(..., min_length=1)
+    tool: Optional[str] = None
+    max_concurrency: Optional[int] = Field(None, ge=1)
+
+class BatchItemResult(BaseModel):
+    index: int
+    tool: Optional[str]
+    status: str
+    output: Optional[str]
+    error: Optional[str]
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
+
+class GenerateRequest(BaseModel):
+    requirement: str
+    # Defaults to the languages named in the requirement, else CODE_GENERATION_DEFAULT_LANGUAGES;
+    # names outside KNOWN_LANGUAGES are rejected
+    languages: Optional[List[str]] = Field(None, max_length=CODE_GENERATION_MAX_LANGUAGES)
+
+class GeneratedCode(BaseModel):
+    language: str
+    code: str
+    cached: bool
+
+class GenerateResponse(BaseModel):
+    requirement_hash: str
+    analysis: str
+    results: List[GeneratedCode]
+
+class JobRequest(BaseModel):
+    input: str
+    tool: Optional[str] = None
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+
+class JobStep(BaseModel):
+    step: str
+    output: str
+
+class JobStatus(BaseModel):
+    job_id: str
+    tool: Optional[str]
+    status: str
+    steps: List[JobStep]
+    result: Optional[str]
+    error: Optional[str]
+
+class SessionCreated(BaseModel):
+    session_id: str
+
+class SessionTurn(BaseModel):
+    position: int
+    request: str
+    tool: Optional[str]
+    output: str
+    code: Optional[str]
+
+class SessionStatus(BaseModel):
+    session_id: str
+    turns: int
+    summary: str
+    recent: List[SessionTurn]
+    latest_code: Optional[str]
+
+class Artifact(BaseModel):
+    artifact_id: str
+    content: str
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    status = agent_registry.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", **status})
+
+    if LLM_CACHE_ENABLED:
+        # Imported here: LangChain's cache base class is slow to import
+        from app.llm.llm_cache import get_llm_cache
+        status["llm_cache"] = get_llm_cache().stats()
+    status["llm_limits"] = limiter_stats()
+    status["pipeline_steps"] = step_thread_stats()
+    status["router"] = intent_router.stats()
+    status["speculation"] = speculator.stats()
+    status["tool_log"] = tool_log_writer.stats()
+
+    return {"status": "ok", **status}
 
 @app.post("/agent", response_model=AgentResponse)
 async def invoke_agent(request: AgentRequest):
@@ -34,10 +173,168 @@ async def invoke_agent(request: AgentRequest):
 
     try:
         agent = get_selected_agent()
-        result = agent.invoke({"input": request.input})
+        payload = {"input": request.input}
+        if request.profile:
+            payload["profile"] = request.profile
+        if request.session_id:
+            payload["session_id"] = request.session_id
+        if request.diff:
+            payload["diff"] = request.diff
+
+        result = await agent.ainvoke(payload)
 
-        return AgentResponse(result=result["output"] if isinstance(result, dict) else result)
+        return AgentResponse(result=result["output"] if isinstance(result, dict) else result, session_id=request.session_id)
 
     except Exception as e:
         logger.exception("Agent invocation failed.")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+@app.post("/agent/stream")
+async def stream_agent(request: AgentRequest):
+    """
+    Server-Sent-Events variant of /agent.
+
+    Streams the planner decision, step_start/step_end events, LLM tokens and
+    report fragments as they are produced, then a final "done" event.
+    Closing the connection cancels the remaining pipeline steps.
+    """
+    logger.info(f"Received streaming agent request: {request.input}")
+    if request.diff:
+        raise HTTPException(status_code=400, detail="Diff reviews are not streamed; send them to /agent.")
+
+    async def event_source():
+        try:
+            async for event in astream_agent_events(request.input, profile=request.profile, session_id=request.session_id):
+                yield _sse(event)
+        except Exception as e:
+            logger.exception("Agent streaming failed.")
+            yield _sse({"event": "error", "detail": str(e)})
+
+    return StreamingResponse(event_source(), media_type="text/event-stream")
+
+@app.post("/sessions", response_model=SessionCreated, status_code=201)
+def create_session():
+    """
+    Starts a session; pass its id with /agent requests that follow up on each other.
+    """
+    return SessionCreated(session_id=get_session_store().create())
+
+@app.get("/sessions/{session_id}", response_model=SessionStatus)
+def get_session(session_id: str):
+    """
+    Returns the session's summary of older turns, its recent turns and the id
+    of its latest code artifact.
+    """
+    session = get_session_store().load(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+
+    return SessionStatus(
+        session_id=session["id"],
+        turns=session["turns"],
+        summary=render_summary(session["summary"]),
+        recent=[SessionTurn(**turn) for turn in session["recent"]],
+        latest_code=session["latest_code"],
+    )
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def delete_session(session_id: str):
+    if not get_session_store().delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+
+@app.get("/artifacts/{artifact_id}", response_model=Artifact)
+def get_artifact(artifact_id: str):
+    """
+    Returns a code artifact referenced as `[code <id>]` in session turns.
+    """
+    content = get_session_store().get_artifact(artifact_id)
+    if content is None:
+        raise HTTPException(status_code=404, detail=f"Artifact not found: {artifact_id}")
+
+    return Artifact(artifact_id=artifact_id, content=content)
+
+@app.post("/agent/batch", response_model=BatchResponse)
+async def invoke_batch(request: BatchRequest):
+    """
+    Runs many inputs through one tool (or the planner's choice per input)
+    concurrently. Results come back in input order, each with its own status.
+    """
+    logger.info(f"Received batch request: {len(request.inputs)} inputs, tool={request.tool}")
+
+    try:
+        results = await arun_tool_batch(
+            request.inputs,
+            tool_name=request.tool,
+            max_concurrency=request.max_concurrency,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return BatchResponse(results=[BatchItemResult(**result) for result in results])
+
+@app.post("/generate", response_model=GenerateResponse)
+async def generate_code(request: GenerateRequest):
+    """
+    Generates the requirement in several languages at once. The requirement is
+    analysed once and the languages are generated concurrently from that
+    analysis; results are cached per requirement and language.
+    """
+    logger.info(f"Received code generation request: languages={request.languages}")
+
+    # Imported here: the chain module is only needed by this endpoint
+    from app.chains.code_generation_chain import arun_multi_language_generation, normalize_languages
+
+    try:
+        languages = normalize_languages(request.languages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        result = await arun_multi_language_generation(request.requirement, languages)
+    except Exception as e:
+        logger.exception("Code generation failed.")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return GenerateResponse(
+        requirement_hash=result["requirement_hash"],
+        analysis=result["analysis"],
+        results=[GeneratedCode(**item) for item in result["results"]],
+    )
+
+@app.post("/jobs", response_model=JobSubmitted, status_code=202)
+def submit_job(request: JobRequest):
+    """
+    Queues a long-running tool run and returns immediately with its job id.
+    """
+    if request.tool is not None and request.tool not in tool_names():
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown tool: {request.tool}. Available tools: {', '.join(tool_names())}",
+        )
+
+    job_id = job_store().submit(request.input, tool=request.tool)
+    logger.info(f"Queued job {job_id} (tool={request.tool})")
+
+    return JobSubmitted(job_id=job_id, status="queued")
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    """
+    Returns job status plus the pipeline steps finished so far.
+    """
+    job = job_store().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    return JobStatus(
+        job_id=job["id"],
+        tool=job["tool"],
+        status=job["status"],
+        steps=[JobStep(**step) for step in job["steps"]],
+        result=job["result"],
+        error=job["error"],
+    )
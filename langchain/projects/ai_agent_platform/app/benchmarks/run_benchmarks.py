@@ -0,0 +1,373 @@
+"""
+Performance benchmarks, run entirely against the local simulated LLM.
+
+    python -m app.benchmarks.run_benchmarks --output bench.json
+    python -m app.benchmarks.run_benchmarks --quick --output new.json --baseline bench.json
+
+Covers per-step and end-to-end latency of every pipeline, agent throughput at
+several concurrency levels, /agent requests per second and latency
+percentiles through the ASGI app, cold-import time of `app.tools`, and how
+often the local intent router decides without the LLM planner (and how well).
+With --baseline, exits non-zero when a metric regressed beyond --threshold.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+# Benchmarks never talk to a real provider, and cached answers would hide the work
+os.environ.setdefault("LLM_PROVIDER", "simulated")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("CODE_GENERATION_CACHE_ENABLED", "false")
+os.environ.setdefault("LLM_WARMUP", "false")
+os.environ.setdefault("JOB_WORKERS", "0")
+os.environ.setdefault("SIMULATED_TTFT_SECONDS", "0.1")
+os.environ.setdefault("SIMULATED_TOKEN_SECONDS", "0.002")
+
+# Databases and tool logs go to a scratch directory, not the working tree
+_STATE_DIR = tempfile.mkdtemp(prefix="ai_agent_bench_")
+for _name, _default in (
+    ("JOB_DB_PATH", "jobs.sqlite3"),
+    ("LLM_CACHE_PATH", "llm_cache.sqlite3"),
+    ("PIPELINE_CHECKPOINT_PATH", "checkpoints.sqlite3"),
+    ("CODE_GENERATION_CACHE_PATH", "code_generations.sqlite3"),
+    ("SESSION_DB_PATH", "sessions.sqlite3"),
+    ("TOOL_LOG_DIR", "logs"),
+):
+    os.environ.setdefault(_name, os.path.join(_STATE_DIR, _default))
+atexit.register(shutil.rmtree, _STATE_DIR, True)
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+SAMPLE_CODE = """
+def fetch_data(urls):
+    results = []
+    for url in urls:
+        data = requests.get(url).text
+        results.append(data)
+    return results
+"""
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+
+# Result name -> statement timed in a fresh interpreter. Imports should stay
+# cheap (chains, tools and the LLM are built lazily); first_tool_call_seconds
+# is where that cost is paid instead.
+COLD_START_STATEMENTS = {
+    "app_tools_seconds": "import app.tools",
+    "api_app_seconds": "import app.api.app",
+    "langgraph_agent_seconds": "import app.agents.langgraph_code_assistant",
+    "cli_main_seconds": "import app.main",
+    "first_tool_call_seconds": "from app.tools import code_reviewer; code_reviewer.invoke({'code': 'x = 1'})",
+}
+
+
+def percentiles(samples: list) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def pick(q):
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+# ---------------------------
+# Pipelines
+# ---------------------------
+
+def _pipelines():
+    from app.chains.code_review_chain import arun_code_review_pipeline, astream_code_review_pipeline
+    from app.chains.performance_optimization_chain import (
+        arun_performance_optimization_pipeline,
+        astream_performance_optimization_pipeline,
+    )
+    from app.chains.unit_test_generation_chain import (
+        arun_unit_test_generation_pipeline,
+        astream_unit_test_generation_pipeline,
+    )
+
+    return {
+        "code_review": (arun_code_review_pipeline, astream_code_review_pipeline),
+        "performance_optimization": (arun_performance_optimization_pipeline, astream_performance_optimization_pipeline),
+        "unit_test_generation": (arun_unit_test_generation_pipeline, astream_unit_test_generation_pipeline),
+    }
+
+
+async def bench_pipelines(iterations: int) -> dict:
+    results = {}
+
+    for name, (run, stream) in _pipelines().items():
+        end_to_end = []
+        steps = {}
+        prompt_tokens = {}
+        llm_calls = []
+
+        for i in range(iterations):
+            code = f"{SAMPLE_CODE}\n# run {i}"
+
+            started = time.perf_counter()
+            await run(code)
+            end_to_end.append(time.perf_counter() - started)
+
+            step_started = {}
+            llm_calls.append(0)
+            async for event in stream(code):
+                if event["event"] == "step_start":
+                    llm_calls[-1] += not event.get("skipped")
+                    step_started[event["step"]] = time.perf_counter()
+                    prompt_tokens.setdefault(event["step"], []).append(event["prompt_tokens"])
+                elif event["event"] == "step_end":
+                    elapsed = time.perf_counter() - step_started[event["step"]]
+                    steps.setdefault(event["step"], []).append(elapsed)
+
+        results[name] = {
+            "end_to_end_seconds": percentiles(end_to_end),
+            "steps_seconds": {step: percentiles(samples) for step, samples in steps.items()},
+            # Prompt size per step; growing step over step means the handoff is leaking whole reports
+            "steps_prompt_tokens": {step: percentiles(samples) for step, samples in prompt_tokens.items()},
+            # Steps skipped by the static pre-pass make no LLM call
+            "llm_calls_per_run": statistics.fmean(llm_calls),
+        }
+
+    return results
+
+
+# ---------------------------
+# Agent and API throughput
+# ---------------------------
+
+async def _run_concurrently(call, concurrency: int, requests: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(requests)])
+    wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": requests / wall if wall else None,
+        "latency_seconds": percentiles(latencies),
+    }
+
+
+async def bench_agent(concurrency_levels: list, requests: int) -> dict:
+    from app.agents.langgraph_code_assistant import code_assistant_agent
+
+    async def call(i):
+        await code_assistant_agent.ainvoke({"input": f"Please review this code:\n{SAMPLE_CODE}\n# {i}"})
+
+    return {str(level): await _run_concurrently(call, level, requests) for level in concurrency_levels}
+
+
+async def bench_api(concurrency_levels: list, requests: int) -> dict:
+    import httpx
+    from app.api.app import app
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def call(i):
+            response = await client.post("/agent", json={"input": f"Please review this code:\n{SAMPLE_CODE}\n# {i}"})
+            response.raise_for_status()
+
+        for level in concurrency_levels:
+            results[str(level)] = await _run_concurrently(call, level, requests)
+
+    return results
+
+
+# ---------------------------
+# Routing
+# ---------------------------
+
+# (instruction, expected tool); the sample code is appended to each
+ROUTING_SAMPLES = [
+    ("Please review this code", "code_reviewer"),
+    ("Can you check this for security issues and best practices?", "code_reviewer"),
+    ("Give me feedback on the naming and readability", "code_reviewer"),
+    ("Optimize this function", "performance_optimizer"),
+    ("This is too slow, make it faster", "performance_optimizer"),
+    ("Reduce the latency of these requests", "performance_optimizer"),
+    ("Write unit tests for this", "unit_test_generator"),
+    ("Generate pytest test cases covering the edge cases", "unit_test_generator"),
+    ("I need a test suite with mocks for the HTTP calls", "unit_test_generator"),
+    ("Write a function that fetches URLs concurrently in Go and Python", "code_generator"),
+    ("Implement a CLI tool that downloads these files", "code_generator"),
+    ("", None),  # bare code: only the LLM can tell
+]
+
+
+def bench_routing(repeats: int = 200) -> dict:
+    from app.agents.intent_router import IntentRouter
+    from app.tools import tool_names
+
+    tools = tool_names()
+    inputs = [(f"{instruction}\n{SAMPLE_CODE}", expected) for instruction, expected in ROUTING_SAMPLES]
+
+    decisions = []
+    latencies = []
+    for _ in range(repeats):
+        router = IntentRouter(cache_size=0)  # measure the classifier, not the cache
+        for text, expected in inputs:
+            started = time.perf_counter()
+            decision = router.route(text, tools)
+            latencies.append(time.perf_counter() - started)
+            decisions.append((decision, expected))
+
+    local = [(decision, expected) for decision, expected in decisions if decision is not None]
+    return {
+        "decision_seconds": percentiles(latencies),
+        # Share of inputs that still need the LLM planner call
+        "llm_fallback_rate": 1 - len(local) / len(decisions),
+        "local_accuracy": sum(d.tool == expected for d, expected in local) / len(local) if local else None,
+    }
+
+
+# ---------------------------
+# Import time
+# ---------------------------
+
+def bench_import(repeats: int) -> dict:
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    results = {}
+
+    for name, statement in COLD_START_STATEMENTS.items():
+        samples = []
+        for _ in range(repeats):
+            output = subprocess.run(
+                [sys.executable, "-c", IMPORT_SNIPPET.format(statement=statement)],
+                cwd=project_root,
+                env=os.environ.copy(),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            samples.append(float(output.strip().splitlines()[-1]))
+
+        results[name] = percentiles(samples)
+
+    return results
+
+
+# ---------------------------
+# Runner and comparison
+# ---------------------------
+
+async def run_all(iterations: int, concurrency_levels: list, requests: int, import_repeats: int) -> dict:
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "provider": os.environ["LLM_PROVIDER"],
+            "simulated_ttft_seconds": float(os.environ.get("SIMULATED_TTFT_SECONDS", 0)),
+            "simulated_token_seconds": float(os.environ.get("SIMULATED_TOKEN_SECONDS", 0)),
+        },
+        # Measured first, before this process imports the app itself
+        "imports": bench_import(import_repeats) if import_repeats else {},
+        "routing": bench_routing(),
+        "pipelines": await bench_pipelines(iterations),
+        "agent": await bench_agent(concurrency_levels, requests),
+        "api": await bench_api(concurrency_levels, requests),
+    }
+
+
+def _flatten(data, prefix=""):
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def find_regressions(baseline: dict, current: dict, threshold: float) -> list:
+    """
+    Compares latency (lower is better) and requests_per_second (higher is
+    better) metrics; returns the ones that got worse by more than threshold.
+    """
+    old = dict(_flatten({k: v for k, v in baseline.items() if k != "meta"}))
+    regressions = []
+
+    for path, value in _flatten({k: v for k, v in current.items() if k != "meta"}):
+        before = old.get(path)
+        if not before:
+            continue
+
+        if path.endswith("requests_per_second"):
+            change = (before - value) / before
+        elif path.split(".")[-1] in ("mean", "p50", "p95", "p99"):
+            change = (value - before) / before
+        else:
+            continue
+
+        if change > threshold:
+            regressions.append({"metric": path, "baseline": before, "current": value, "change": change})
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run AI Agent Platform benchmarks against the simulated LLM.")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results JSON path (default: benchmark_results.json)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression (default 0.10)")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke runs")
+    args = parser.parse_args()
+
+    iterations, requests, import_repeats = (1, 8, 1) if args.quick else (5, 64, 5)
+    concurrency_levels = [1, 8] if args.quick else [1, 8, 32, 128]
+
+    results = asyncio.run(run_all(iterations, concurrency_levels, requests, import_repeats))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Benchmark results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(json.load(f), results, args.threshold)
+
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['metric']}: {regression['baseline']:.4f} -> "
+                f"{regression['current']:.4f} ({regression['change']:+.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.configs.settings import PIPELINE_CHECKPOINT_PATH, PIPELINE_CHECKPOINT_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+    run_key TEXT NOT NULL,
+    step TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    output TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (run_key, step)
+);
+CREATE INDEX IF NOT EXISTS idx_pipeline_checkpoints_created ON pipeline_checkpoints (created_at);
+"""
+
+
+class CheckpointStore:
+    """
+    SQLite table of completed pipeline steps, keyed by run key (pipeline, prompts,
+    model and input hash) and step name.
+
+    Like the job store, every call opens its own connection so the store is safe
+    to share between threads and processes. Rows of abandoned runs expire after
+    ttl_seconds; a run that completes clears its own rows.
+    """
+
+    def __init__(self, db_path: str = PIPELINE_CHECKPOINT_PATH, ttl_seconds: float = PIPELINE_CHECKPOINT_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.execute("DELETE FROM pipeline_checkpoints WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def load(self, run_key: str) -> dict:
+        """
+        Returns {step_name: {"output", "prompt_tokens"}} for the run's completed steps.
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT step, output, prompt_tokens FROM pipeline_checkpoints "
+                "WHERE run_key = ? AND created_at >= ? ORDER BY position",
+                (run_key, time.time() - self.ttl_seconds),
+            ).fetchall()
+
+        return {row["step"]: {"output": row["output"], "prompt_tokens": row["prompt_tokens"]} for row in rows}
+
+    def save(self, run_key: str, step: str, position: int, output: str, prompt_tokens: int):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pipeline_checkpoints "
+                "(run_key, step, position, output, prompt_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (run_key, step, position, output, prompt_tokens, time.time()),
+            )
+
+    def clear(self, run_key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM pipeline_checkpoints WHERE run_key = ?", (run_key,))
+
+
+_checkpoint_store = None
+_checkpoint_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore:
+    """
+    Returns the process-wide checkpoint store shared by every pipeline.
+    """
+    global _checkpoint_store
+
+    if _checkpoint_store is None:
+        with _checkpoint_store_lock:
+            if _checkpoint_store is None:
+                _checkpoint_store = CheckpointStore()
+
+    return _checkpoint_store
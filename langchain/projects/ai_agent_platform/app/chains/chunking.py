@@ -0,0 +1,314 @@
+import ast
+import asyncio
+from typing import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from app.configs.settings import (
+    MODEL_TOKEN_BUDGETS,
+    DEFAULT_TOKEN_BUDGET,
+    CHUNK_TOKEN_BUDGET,
+    CHUNK_OVERLAP_LINES,
+    CHUNK_MAX_PARALLEL,
+)
+from app.llm.llm_provider import get_llm, get_model_name
+from app.utils.lazy import Lazy
+from app.utils.logger import logger
+from app.utils.token_counter import count_tokens
+
+MERGE_PROMPT = """
+You are merging partial {label} reports. Each report covers one consecutive part
+of the same source file. Produce ONE consolidated {label} report for the whole file:
+- Keep every distinct finding, drop duplicates
+- Keep the code blocks of all changed or generated code, in file order
+- End with a short overall summary
+
+Format the result in clean Markdown with headers and bullet points.
+Do not add ```markdown in the output.
+
+PARTIAL REPORTS:
+{reports}
+"""
+
+
+def _build_merge_chain():
+    from langchain.chains import LLMChain
+    from langchain_core.prompts import PromptTemplate
+
+    return LLMChain(
+        llm=get_llm(),
+        prompt=PromptTemplate(input_variables=["label", "reports"], template=MERGE_PROMPT),
+        output_key="code",
+    )
+
+
+merge_chain = Lazy(_build_merge_chain)
+
+
+@dataclass
+class CodeChunk:
+    start: int  # 1-based, inclusive, without the overlap
+    end: int
+    code: str  # includes the overlap lines before `start`
+
+
+def input_token_budget() -> int:
+    """
+    Token budget for the code given to one pipeline run with the configured model.
+    """
+    if CHUNK_TOKEN_BUDGET > 0:
+        return CHUNK_TOKEN_BUDGET
+    return MODEL_TOKEN_BUDGETS.get(get_model_name(), DEFAULT_TOKEN_BUDGET)
+
+
+def _ast_units(code: str, total_lines: int) -> list:
+    """
+    Line ranges of the module-level statements. Comments and blank lines between
+    statements belong to the following statement, so the ranges cover every line.
+    """
+    try:
+        body = ast.parse(code).body
+    except SyntaxError:
+        return []
+
+    units = []
+    previous_end = 0
+    for node in body:
+        end = node.end_lineno
+        if end <= previous_end:
+            continue
+        units.append([previous_end + 1, end])
+        previous_end = end
+
+    if units:
+        units[-1][1] = total_lines
+    return units
+
+
+def _line_windows(lines: list, start: int, end: int, budget: int) -> list:
+    windows = []
+    window_start = start
+    tokens = 0
+
+    for line_no in range(start, end + 1):
+        line_tokens = count_tokens(lines[line_no - 1] + "\n")
+        if tokens and tokens + line_tokens > budget:
+            windows.append([window_start, line_no - 1])
+            window_start, tokens = line_no, 0
+        tokens += line_tokens
+
+    windows.append([window_start, end])
+    return windows
+
+
+def split_code(code: str, budget: int, overlap_lines: int = CHUNK_OVERLAP_LINES) -> list:
+    """
+    Splits code into chunks of at most ~budget tokens along module-level
+    function/class boundaries. Definitions larger than the budget, and code
+    that does not parse, are split into line windows. Each chunk also carries
+    the `overlap_lines` lines before it as context.
+    """
+    lines = code.splitlines()
+    units = _ast_units(code, len(lines)) or [[1, len(lines)]]
+
+    pieces = []
+    for start, end in units:
+        text = "\n".join(lines[start - 1:end])
+        if count_tokens(text) > budget:
+            pieces.extend(_line_windows(lines, start, end, budget))
+        else:
+            pieces.append([start, end])
+
+    chunks = []
+    current = None
+    current_tokens = 0
+    for start, end in pieces:
+        tokens = count_tokens("\n".join(lines[start - 1:end]))
+        if current and current_tokens + tokens <= budget:
+            current[1] = end
+            current_tokens += tokens
+        else:
+            if current:
+                chunks.append(current)
+            current, current_tokens = [start, end], tokens
+    if current:
+        chunks.append(current)
+
+    return [
+        CodeChunk(start=start, end=end, code="\n".join(lines[max(start - 1 - overlap_lines, 0):end]))
+        for start, end in chunks
+    ]
+
+
+def _part_label(index: int, chunks: list) -> str:
+    chunk = chunks[index - 1]
+    return f"[Part {index}/{len(chunks)}, lines {chunk.start}-{chunk.end}]"
+
+
+def _prefixed_steps(results: list, chunks: list, steps_key: str) -> list:
+    steps = []
+    for index, result in enumerate(results, start=1):
+        label = _part_label(index, chunks)
+        steps.extend({**step, "step": f"{label} {step['step']}"} for step in result[steps_key])
+    return steps
+
+
+def _merge_groups(parts: list, budget: int) -> list:
+    """
+    Groups consecutive partial reports so each merge prompt stays within budget.
+    Always merges at least two parts per group so the reduction terminates.
+    """
+    groups = []
+    for part in parts:
+        tokens = count_tokens(part)
+        if groups and (groups[-1][1] + tokens <= budget or len(groups[-1][0]) < 2):
+            groups[-1][0].append(part)
+            groups[-1][1] += tokens
+        else:
+            groups.append([[part], tokens])
+
+    # A trailing single part is folded into the previous group
+    if len(groups) > 1 and len(groups[-1][0]) == 1:
+        groups[-2][0].extend(groups.pop()[0])
+
+    return [group for group, _ in groups]
+
+
+def _merge_inputs(group: list, label: str) -> dict:
+    reports = "\n\n".join(f"### Part {index}\n\n{part}" for index, part in enumerate(group, start=1))
+    return {"label": label, "reports": reports}
+
+
+def _reduce(parts: list, label: str, budget: int) -> str:
+    while len(parts) > 1:
+        groups = _merge_groups(parts, budget)
+        logger.info(f"Merging {len(parts)} partial {label} reports in {len(groups)} groups.")
+        parts = [merge_chain().invoke(_merge_inputs(group, label))["code"] for group in groups]
+    return parts[0]
+
+
+async def _areduce(parts: list, label: str, budget: int) -> str:
+    while len(parts) > 1:
+        groups = _merge_groups(parts, budget)
+        logger.info(f"Merging {len(parts)} partial {label} reports in {len(groups)} groups.")
+        results = await asyncio.gather(*[merge_chain().ainvoke(_merge_inputs(group, label)) for group in groups])
+        parts = [result["code"] for result in results]
+    return parts[0]
+
+
+def _chunks_for(code: str, label: str):
+    budget = input_token_budget()
+    tokens = count_tokens(code)
+    if tokens <= budget:
+        return budget, None
+
+    chunks = split_code(code, budget)
+    logger.info(f"{label}: input of {tokens} tokens exceeds budget {budget}, split into {len(chunks)} chunks.")
+    return budget, chunks
+
+
+def _chunked_result(results: list, chunks: list, steps_key: str, final_code: str) -> dict:
+    return {
+        "final_code": final_code,
+        steps_key: _prefixed_steps(results, chunks, steps_key),
+        "chunks": [{"start_line": chunk.start, "end_line": chunk.end} for chunk in chunks],
+    }
+
+
+def run_with_chunking(pipeline, code: str, steps_key: str, label: str) -> dict:
+    """
+    Runs `pipeline(code)` directly when the input fits the model's token budget.
+    Otherwise runs it on every chunk in parallel threads and merges the partial
+    reports into one `final_code`; step names are prefixed with their chunk.
+    """
+    budget, chunks = _chunks_for(code, label)
+    if chunks is None:
+        return pipeline(code)
+
+    with ThreadPoolExecutor(max_workers=CHUNK_MAX_PARALLEL) as executor:
+        results = list(executor.map(pipeline, [chunk.code for chunk in chunks]))
+
+    final_code = _reduce([result["final_code"] for result in results], label, budget)
+    return _chunked_result(results, chunks, steps_key, final_code)
+
+
+async def arun_with_chunking(pipeline, code: str, steps_key: str, label: str) -> dict:
+    """
+    Async variant of `run_with_chunking`; at most CHUNK_MAX_PARALLEL chunks run at once.
+    """
+    budget, chunks = _chunks_for(code, label)
+    if chunks is None:
+        return await pipeline(code)
+
+    semaphore = asyncio.Semaphore(CHUNK_MAX_PARALLEL)
+
+    async def run_chunk(chunk: CodeChunk) -> dict:
+        async with semaphore:
+            return await pipeline(chunk.code)
+
+    results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks])
+
+    final_code = await _areduce([result["final_code"] for result in results], label, budget)
+    return _chunked_result(results, chunks, steps_key, final_code)
+
+
+async def astream_with_chunking(stream_pipeline, code: str, label: str) -> AsyncIterator[dict]:
+    """
+    Streaming variant of `run_with_chunking`. An input within budget streams
+    `stream_pipeline(code)` unchanged. Otherwise the chunks stream concurrently
+    (at most CHUNK_MAX_PARALLEL at once, events interleaved, step names prefixed
+    with their chunk), followed by one merge step and the pipeline_end event
+    carrying the merged report.
+    """
+    budget, chunks = _chunks_for(code, label)
+    if chunks is None:
+        async for event in stream_pipeline(code):
+            yield event
+        return
+
+    semaphore = asyncio.Semaphore(CHUNK_MAX_PARALLEL)
+    queue = asyncio.Queue()
+    done = object()
+    parts = {}
+
+    async def pump(index: int, chunk: CodeChunk):
+        try:
+            async with semaphore:
+                part_label = _part_label(index, chunks)
+                async for event in stream_pipeline(chunk.code):
+                    if event["event"] == "pipeline_end":
+                        parts[index] = event["final_code"]
+                    else:
+                        await queue.put({**event, "step": f"{part_label} {event['step']}"})
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.create_task(pump(index, chunk)) for index, chunk in enumerate(chunks, start=1)]
+
+    remaining = len(tasks)
+    try:
+        while remaining:
+            event = await queue.get()
+            if event is done:
+                remaining -= 1
+                continue
+            yield event
+
+        # Surface a failed chunk instead of merging a partial report
+        for task in tasks:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    merge_step = f"Merge {len(chunks)} Partial Reports"
+    yield {"event": "step_start", "step": merge_step, "index": len(chunks)}
+    final_code = await _areduce([parts[index] for index in range(1, len(chunks) + 1)], label, budget)
+    yield {
+        "event": "step_end",
+        "step": merge_step,
+        "index": len(chunks),
+        "output": f"_Merged the reports of {len(chunks)} parts into the final {label} report below._",
+    }
+
+    yield {"event": "pipeline_end", "final_code": final_code}
@@ -1,6 +1,19 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from app.llm.llm_provider import get_llm
+import asyncio
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from app.chains.streaming import chunk_text
+from app.configs.settings import (
+    CODE_GENERATION_CACHE_ENABLED,
+    CODE_GENERATION_DEFAULT_LANGUAGES,
+    CODE_GENERATION_MAX_LANGUAGES,
+    CODE_GENERATION_MAX_PARALLEL,
+)
+from app.llm.llm_provider import get_llm, get_model_name
+from app.utils.lazy import Lazy
+from app.utils.logger import logger
 
 # Markdown formatting guidelines
 MARKDOWN_GUIDELINES = """
@@ -13,11 +26,8 @@ Markdown Guidelines:
 - Make the markdown clean and elegant
 """
 
-# Define prompt
-code_generation_prompt = PromptTemplate(
-    input_variables=["requirement", "language"],
-    template="""
-You are a professional software engineer. 
+CODE_GENERATION_PROMPT = """
+You are a professional software engineer.
 Generate production-quality code based on the given technical requirement.
 
 Requirement:
@@ -35,26 +45,305 @@ IMPORTANT:
 
 Start now.
 """
-)
 
-# Load LLM
-llm = get_llm()
+REQUIREMENT_ANALYSIS_PROMPT = """
+You are a senior software architect.
+Analyse the technical requirement below once, independently of any programming
+language, so that it can be implemented consistently in several languages.
+
+Requirement:
+{requirement}
+
+Describe concisely:
+- Public API: function / class names, parameters and return values
+- Expected behaviour, including input validation and error handling
+- Edge cases the implementation must handle
+- External dependencies or protocols (HTTP, JSON, files, ...)
+
+Do not write any code.
+"""
+
+MULTI_LANGUAGE_PROMPT = """
+You are a professional software engineer.
+Implement the requirement below in {language}. Follow the shared analysis so
+that every language exposes the same API and behaviour, using the idioms and
+standard library of {language}.
+
+Requirement:
+{requirement}
+
+Shared Analysis:
+{analysis}
+
+{markdown_guidelines}
+
+IMPORTANT:
+- Return only the code with minimal explanation if necessary.
+- Use correct syntax and formatting.
+- Wrap multi-line code inside a proper code block for {language}.
+
+Start now.
+"""
+
+ANALYSIS_STEP = "Requirement Analysis"
+
+# Cache slot of the shared analysis, next to the per-language slots
+ANALYSIS_KEY = "_analysis"
+
+# Canonical name -> spellings recognised in a requirement. "Go" only matches
+# capitalised, so "go through the list" is not a language request.
+KNOWN_LANGUAGES = {
+    "python": re.compile(r"\bpython\b", re.IGNORECASE),
+    "typescript": re.compile(r"\btypescript\b", re.IGNORECASE),
+    "javascript": re.compile(r"\b(javascript|node\.?js)\b", re.IGNORECASE),
+    "java": re.compile(r"\bjava\b(?!script)", re.IGNORECASE),
+    "go": re.compile(r"\b(Go|golang)\b"),
+    "rust": re.compile(r"\brust\b", re.IGNORECASE),
+    "csharp": re.compile(r"(\bc#|\bcsharp\b)", re.IGNORECASE),
+    "cpp": re.compile(r"(\bc\+\+|\bcpp\b)", re.IGNORECASE),
+    "kotlin": re.compile(r"\bkotlin\b", re.IGNORECASE),
+    "swift": re.compile(r"\bswift\b", re.IGNORECASE),
+    "ruby": re.compile(r"\bruby\b", re.IGNORECASE),
+    "php": re.compile(r"\bphp\b", re.IGNORECASE),
+}
+
+
+def _build_chains() -> dict:
+    from langchain_core.prompts import PromptTemplate
+
+    llm = get_llm()
+    # Multi-language results are stored by the generation cache, not a second time as prompts
+    multi_llm = llm.model_copy(update={"cache": False}) if CODE_GENERATION_CACHE_ENABLED else llm
+    guidelines = {"markdown_guidelines": MARKDOWN_GUIDELINES}
+
+    return {
+        "single": PromptTemplate.from_template(CODE_GENERATION_PROMPT, partial_variables=guidelines) | llm,
+        "analysis": PromptTemplate.from_template(REQUIREMENT_ANALYSIS_PROMPT) | multi_llm,
+        "language": PromptTemplate.from_template(MULTI_LANGUAGE_PROMPT, partial_variables=guidelines) | multi_llm,
+    }
+
+
+# "single" / "analysis" / "language" -> prompt | llm, built on first use
+code_generation_chains = Lazy(_build_chains)
 
-# Create chain
-code_generation_chain = LLMChain(
-    llm=llm,
-    prompt=code_generation_prompt,
-    output_key="code"
-)
 
 def run_code_generation(requirement: str, language: str) -> str:
     """
     Runs the code generation chain.
     """
-    result = code_generation_chain.invoke({
-        "requirement": requirement,
-        "language": language,
-        "markdown_guidelines": MARKDOWN_GUIDELINES
-    })
+    return chunk_text(code_generation_chains()["single"].invoke({"requirement": requirement, "language": language}))
+
+
+# --- multi-language generation --------------------------------------------
+
+def requirement_hash(requirement: str) -> str:
+    return hashlib.sha256(requirement.strip().encode("utf-8")).hexdigest()
+
+
+def canonical_language(name: str) -> str | None:
+    """KNOWN_LANGUAGES name for a spelling ("Golang", "C#", "node.js"), else None."""
+    name = name.strip()
+    if name.lower() in KNOWN_LANGUAGES:
+        return name.lower()
+    # Lowercased too: the "Go" pattern is case-sensitive for free text, not for a name
+    return next(
+        (canonical for canonical, pattern in KNOWN_LANGUAGES.items() if pattern.fullmatch(name) or pattern.fullmatch(name.lower())),
+        None,
+    )
+
+
+def normalize_languages(languages) -> list:
+    """
+    Canonical, de-duplicated language names in request order. Raises
+    ValueError for names outside KNOWN_LANGUAGES or more than
+    CODE_GENERATION_MAX_LANGUAGES languages.
+    """
+    normalized, unknown = [], []
+    for language in languages or []:
+        if not language.strip():
+            continue
+        canonical = canonical_language(language)
+        if canonical is None:
+            unknown.append(language.strip())
+        elif canonical not in normalized:
+            normalized.append(canonical)
+
+    if unknown:
+        raise ValueError(f"Unknown languages: {', '.join(unknown)}. Supported: {', '.join(KNOWN_LANGUAGES)}")
+    if len(normalized) > CODE_GENERATION_MAX_LANGUAGES:
+        raise ValueError(f"At most {CODE_GENERATION_MAX_LANGUAGES} languages per request, got {len(normalized)}")
+    return normalized
+
+
+def detect_languages(text: str) -> list:
+    """Languages named in a requirement, in KNOWN_LANGUAGES order (at most CODE_GENERATION_MAX_LANGUAGES)."""
+    return [name for name, pattern in KNOWN_LANGUAGES.items() if pattern.search(text)][:CODE_GENERATION_MAX_LANGUAGES]
+
+
+def resolve_languages(requirement: str, languages=None) -> list:
+    return normalize_languages(languages) or detect_languages(requirement) or list(CODE_GENERATION_DEFAULT_LANGUAGES)
+
+
+def _cache_namespace() -> str:
+    # Changing a prompt or the model invalidates the stored generations
+    prompts = hashlib.sha256((REQUIREMENT_ANALYSIS_PROMPT + MULTI_LANGUAGE_PROMPT).encode("utf-8")).hexdigest()[:12]
+    return f"{get_model_name()}|{prompts}"
+
+
+def _cache_lookup(req_hash: str, slot: str):
+    if not CODE_GENERATION_CACHE_ENABLED:
+        return None
+
+    from app.chains.generation_cache import get_generation_cache
+
+    return get_generation_cache().get(_cache_namespace(), req_hash, slot)
+
+
+def _cache_update(req_hash: str, slot: str, text: str):
+    if not CODE_GENERATION_CACHE_ENABLED:
+        return
+
+    from app.chains.generation_cache import get_generation_cache
+
+    get_generation_cache().put(_cache_namespace(), req_hash, slot, text)
+
+
+def _analyse(requirement: str, req_hash: str) -> str:
+    analysis = _cache_lookup(req_hash, ANALYSIS_KEY)
+    if analysis is None:
+        analysis = chunk_text(code_generation_chains()["analysis"].invoke({"requirement": requirement}))
+        _cache_update(req_hash, ANALYSIS_KEY, analysis)
+    return analysis
+
+
+async def _aanalyse(requirement: str, req_hash: str) -> str:
+    analysis = await asyncio.to_thread(_cache_lookup, req_hash, ANALYSIS_KEY)
+    if analysis is None:
+        analysis = chunk_text(await code_generation_chains()["analysis"].ainvoke({"requirement": requirement}))
+        await asyncio.to_thread(_cache_update, req_hash, ANALYSIS_KEY, analysis)
+    return analysis
+
+
+async def aprefetch_analysis(requirement: str) -> str:
+    """
+    Computes and caches the shared analysis ahead of a multi-language run
+    (the agent's speculative mode); only useful with CODE_GENERATION_CACHE_ENABLED.
+    """
+    return await _aanalyse(requirement, requirement_hash(requirement))
+
+
+def _generate(requirement: str, req_hash: str, analysis: str, language: str) -> str:
+    code = chunk_text(code_generation_chains()["language"].invoke(
+        {"requirement": requirement, "analysis": analysis, "language": language}
+    ))
+    _cache_update(req_hash, language, code)
+    return code
+
+
+async def _agenerate(requirement: str, req_hash: str, analysis: str, language: str) -> str:
+    code = chunk_text(await code_generation_chains()["language"].ainvoke(
+        {"requirement": requirement, "analysis": analysis, "language": language}
+    ))
+    await asyncio.to_thread(_cache_update, req_hash, language, code)
+    return code
+
+
+def _result(req_hash: str, analysis: str, languages: list, codes: dict, cached: set) -> dict:
+    return {
+        "requirement_hash": req_hash,
+        "analysis": analysis,
+        "results": [{"language": lang, "code": codes[lang], "cached": lang in cached} for lang in languages],
+    }
+
+
+def run_multi_language_generation(requirement: str, languages=None) -> dict:
+    """
+    Generates the requirement in several languages. The requirement is
+    analysed once; each language missing from the cache is then generated
+    concurrently from that shared analysis.
+    """
+    languages = resolve_languages(requirement, languages)
+    req_hash = requirement_hash(requirement)
+
+    codes = {lang: _cache_lookup(req_hash, lang) for lang in languages}
+    cached = {lang for lang, code in codes.items() if code is not None}
+    missing = [lang for lang in languages if lang not in cached]
+    logger.info(f"Multi-language generation: {len(languages)} languages, {len(cached)} cached")
+
+    analysis = _analyse(requirement, req_hash) if missing else (_cache_lookup(req_hash, ANALYSIS_KEY) or "")
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(len(missing), CODE_GENERATION_MAX_PARALLEL)) as pool:
+            generated = pool.map(lambda lang: _generate(requirement, req_hash, analysis, lang), missing)
+            codes.update(zip(missing, generated))
+
+    return _result(req_hash, analysis, languages, codes, cached)
+
+
+async def arun_multi_language_generation(requirement: str, languages=None) -> dict:
+    """
+    Async variant of `run_multi_language_generation`.
+    """
+    languages = resolve_languages(requirement, languages)
+    req_hash = requirement_hash(requirement)
+
+    codes = {lang: await asyncio.to_thread(_cache_lookup, req_hash, lang) for lang in languages}
+    cached = {lang for lang, code in codes.items() if code is not None}
+    missing = [lang for lang in languages if lang not in cached]
+    logger.info(f"Multi-language generation: {len(languages)} languages, {len(cached)} cached")
+
+    if missing:
+        analysis = await _aanalyse(requirement, req_hash)
+        semaphore = asyncio.Semaphore(CODE_GENERATION_MAX_PARALLEL)
+
+        async def generate(lang: str) -> str:
+            async with semaphore:
+                return await _agenerate(requirement, req_hash, analysis, lang)
+
+        codes.update(zip(missing, await asyncio.gather(*(generate(lang) for lang in missing))))
+    else:
+        analysis = await asyncio.to_thread(_cache_lookup, req_hash, ANALYSIS_KEY) or ""
+
+    return _result(req_hash, analysis, languages, codes, cached)
+
+
+def combine_results(result: dict) -> str:
+    """One markdown document with a section per language."""
+    return "\n\n".join(f"### {item['language']}\n\n{item['code']}" for item in result["results"])
+
+
+async def astream_multi_language_generation(requirement: str, languages=None) -> AsyncIterator[dict]:
+    """
+    Streams a multi-language run in the pipeline event format: the analysis
+    step, then one step per language, each ending as soon as its language is
+    done (not in request order), then "pipeline_end" with all languages.
+    """
+    languages = resolve_languages(requirement, languages)
+    req_hash = requirement_hash(requirement)
+
+    yield {"event": "step_start", "step": ANALYSIS_STEP, "index": 0}
+    analysis = await _aanalyse(requirement, req_hash)
+    yield {"event": "step_end", "step": ANALYSIS_STEP, "index": 0, "output": analysis}
+
+    async def generate(index: int, lang: str):
+        code = await asyncio.to_thread(_cache_lookup, req_hash, lang)
+        if code is None:
+            code = await _agenerate(requirement, req_hash, analysis, lang)
+        return index, lang, code
+
+    for index, lang in enumerate(languages, start=1):
+        yield {"event": "step_start", "step": lang, "index": index}
+
+    codes = {}
+    tasks = [asyncio.ensure_future(generate(index, lang)) for index, lang in enumerate(languages, start=1)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            index, lang, code = await finished
+            codes[lang] = code
+            yield {"event": "step_end", "step": lang, "index": index, "output": code}
+    finally:
+        # The client went away: do not keep generating the other languages
+        for task in tasks:
+            task.cancel()
 
-    return result["code"]
\ No newline at end of file
+    yield {"event": "pipeline_end", "final_code": combine_results(_result(req_hash, analysis, languages, codes, set()))}
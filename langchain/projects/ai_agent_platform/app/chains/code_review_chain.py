@@ -1,6 +1,7 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from app.llm.llm_provider import get_llm
+from app.chains.pipeline_engine import Pipeline, StepPolicy
+from app.chains.static_analysis import SECURITY, LOOPS, RECURSION, IO
+from app.configs.settings import PIPELINE_STEP_TIMEOUT_SECONDS
+from app.chains.fan_out import resolve_mode, run_fan_out, arun_fan_out, astream_fan_out
 
 # Reusable markdown guidelines (same as before)
 MARKDOWN_GUIDELINES = """
@@ -77,33 +78,54 @@ CODE:
 """)
 ]
 
-llm = get_llm()
-review_chains = []
-
-for step_name, prompt_text in REVIEW_STEPS:
-    prompt = PromptTemplate(input_variables=["code"], template=prompt_text)
-    chain = LLMChain(llm=llm, prompt=prompt, output_key="code")
-    review_chains.append((step_name, chain))
-
-def run_code_review_pipeline(code_input: str) -> dict:
-    from app.utils.logger import logger
-
-    current_code = code_input
-    review_report = []
-
-    for step_name, chain in review_chains:
-        logger.info(f"Running review step: {step_name}")
-        result = chain.invoke({"code": current_code})
-        reviewed_code = result["code"]
-
-        review_report.append({
-            "step": step_name,
-            "reviewed_code": reviewed_code
-        })
-
-        current_code = reviewed_code
-
-    return {
-        "final_code": current_code,
-        "review_steps": review_report
-    }
\ No newline at end of file
+review_pipeline = Pipeline(
+    "code_review",
+    REVIEW_STEPS,
+    output_key="reviewed_code",
+    steps_key="review_steps",
+    label="review",
+    policies={
+        # Skipped when the static pre-pass finds nothing for them (heuristic)
+        "Security Vulnerabilities Check": StepPolicy(skip_unless=(SECURITY,)),
+        "Performance Smells Check": StepPolicy(skip_unless=(LOOPS, RECURSION, IO)),
+        # The final step writes the longest answer
+        "Final Review and Polish": StepPolicy(timeout=PIPELINE_STEP_TIMEOUT_SECONDS * 2),
+    },
+)
+
+
+def run_code_review_pipeline(code_input: str, mode: str = None) -> dict:
+    """
+    Runs the steps in order; each step gets the source, the latest code blocks
+    and the findings so far from the previous steps (see `Handoff`). Completed
+    steps are checkpointed, so a failed run resumes where it stopped.
+    With mode="parallel" the independent checks run concurrently on the
+    original code and only the final step sees their combined code blocks
+    and findings (see `run_fan_out`).
+    """
+    if resolve_mode(mode) == "parallel":
+        return run_fan_out(review_pipeline, code_input)
+
+    return review_pipeline.run(code_input)
+
+
+async def arun_code_review_pipeline(code_input: str, mode: str = None) -> dict:
+    """
+    Async variant of `run_code_review_pipeline`.
+    Awaits each step so the event loop stays free while the LLM responds.
+    """
+    if resolve_mode(mode) == "parallel":
+        return await arun_fan_out(review_pipeline, code_input)
+
+    return await review_pipeline.arun(code_input)
+
+
+def astream_code_review_pipeline(code_input: str, mode: str = None):
+    """
+    Streaming variant of `run_code_review_pipeline`.
+    Yields step_start / token / step_end events, then a pipeline_end event.
+    """
+    if resolve_mode(mode) == "parallel":
+        return astream_fan_out(review_pipeline, code_input)
+
+    return review_pipeline.astream(code_input)
@@ -0,0 +1,222 @@
+import ast
+import asyncio
+import re
+from dataclasses import dataclass, field
+
+from app.chains.code_review_chain import run_code_review_pipeline, arun_code_review_pipeline
+from app.utils.logger import logger
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+# Lines of surrounding code sent with a module-level change
+CONTEXT_LINES = 2
+
+
+@dataclass
+class Hunk:
+    old_start: int
+    old_length: int
+    new_start: int
+    lines: list = field(default_factory=list)
+
+
+@dataclass
+class Segment:
+    """A region of the new file touched by the diff, reviewed on its own."""
+    name: str
+    start: int  # 1-based, inclusive
+    end: int
+    code: str
+    context: str = ""  # enclosing class header for methods
+
+    def review_input(self) -> str:
+        return f"{self.context}\n{self.code}" if self.context else self.code
+
+
+def parse_unified_diff(diff: str) -> list:
+    """
+    Parses a single-file unified diff into hunks.
+    """
+    hunks = []
+    files = 0
+    lines = diff.splitlines()
+
+    for index, line in enumerate(lines):
+        next_line = lines[index + 1] if index + 1 < len(lines) else ""
+
+        if line.startswith("--- ") and next_line.startswith("+++ "):
+            files += 1
+            if files > 1:
+                raise ValueError("Diff review supports one file per diff.")
+            continue
+        if line.startswith("+++ ") and index > 0 and lines[index - 1].startswith("--- "):
+            continue
+
+        match = HUNK_HEADER.match(line)
+        if match:
+            hunks.append(Hunk(
+                old_start=int(match.group(1)),
+                old_length=int(match.group(2) or 1),
+                new_start=int(match.group(3)),
+            ))
+        elif hunks and line[:1] in (" ", "+", "-"):
+            hunks[-1].lines.append(line)
+        elif hunks and line == "":
+            # Some tools strip the leading space of empty context lines
+            hunks[-1].lines.append(" ")
+
+    if not hunks:
+        raise ValueError("No hunks found in diff.")
+
+    return hunks
+
+
+def apply_diff(original: str, hunks: list) -> tuple:
+    """
+    Applies the hunks to the original file.
+
+    Returns (new_code, changed_lines) where changed_lines holds the 1-based
+    line numbers in the new file that were added, or that sit where lines
+    were removed.
+    """
+    old_lines = original.splitlines()
+    new_lines = []
+    changed = set()
+    cursor = 0  # index into old_lines
+
+    for hunk in hunks:
+        # A pure insertion ("-N,0") adds lines after line N rather than at it
+        hunk_start = hunk.old_start if hunk.old_length == 0 else hunk.old_start - 1
+        if hunk_start < cursor:
+            raise ValueError("Overlapping hunks in diff.")
+
+        new_lines.extend(old_lines[cursor:hunk_start])
+        cursor = hunk_start
+
+        for line in hunk.lines:
+            marker, text = line[0], line[1:]
+
+            if marker == "+":
+                new_lines.append(text)
+                changed.add(len(new_lines))
+                continue
+
+            if cursor >= len(old_lines) or old_lines[cursor] != text:
+                raise ValueError(f"Diff does not apply to the original file at line {cursor + 1}.")
+            cursor += 1
+
+            if marker == " ":
+                new_lines.append(text)
+            else:
+                changed.add(len(new_lines) + 1)
+
+    new_lines.extend(old_lines[cursor:])
+    total = len(new_lines)
+    changed = {min(max(line, 1), total) for line in changed} if total else set()
+
+    return "\n".join(new_lines), changed
+
+
+def _definitions(tree: ast.AST) -> list:
+    nodes = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            nodes.append((node, start, node.end_lineno))
+    return nodes
+
+
+def find_touched_segments(new_code: str, changed_lines: set, context_lines: int = CONTEXT_LINES) -> list:
+    """
+    Maps changed lines to the smallest enclosing function or class.
+
+    Changes outside any definition (imports, module constants) become small
+    line windows with `context_lines` of surrounding code. Overlapping regions
+    are merged. Falls back to line windows when the file does not parse.
+    """
+    lines = new_code.splitlines()
+
+    try:
+        definitions = _definitions(ast.parse(new_code))
+    except SyntaxError:
+        logger.warning("Diff review: new file does not parse, falling back to line windows.")
+        definitions = []
+
+    regions = {}
+    for line in sorted(changed_lines):
+        enclosing = sorted(
+            (d for d in definitions if d[1] <= line <= d[2]),
+            key=lambda d: d[2] - d[1],
+        )
+        if enclosing:
+            node, start, end = enclosing[0]
+            name = node.name
+            # Minimal context for a method: the header line of its class
+            owner = next((d[0] for d in enclosing[1:] if isinstance(d[0], ast.ClassDef)), None)
+            context = lines[owner.lineno - 1] if owner and not isinstance(node, ast.ClassDef) else ""
+        else:
+            start = max(line - context_lines, 1)
+            end = min(line + context_lines, len(lines))
+            name = "module level"
+            context = ""
+        regions.setdefault((start, end), (name, context))
+
+    merged = []
+    for (start, end), (name, context) in sorted(regions.items()):
+        if merged and start <= merged[-1][1]:
+            previous = merged[-1]
+            names = previous[2] if name in previous[2] else f"{previous[2]}, {name}"
+            merged[-1] = (previous[0], max(previous[1], end), names, previous[3])
+        else:
+            merged.append((start, end, name, context))
+
+    return [
+        Segment(name=name, start=start, end=end, code="\n".join(lines[start - 1:end]), context=context)
+        for start, end, name, context in merged
+    ]
+
+
+def _segments_for(original: str, diff: str) -> list:
+    new_code, changed_lines = apply_diff(original, parse_unified_diff(diff))
+    segments = find_touched_segments(new_code, changed_lines)
+
+    logger.info(
+        f"Diff review: {len(changed_lines)} changed lines -> {len(segments)} segments, "
+        f"{sum(s.end - s.start + 1 for s in segments)} of {len(new_code.splitlines())} lines sent."
+    )
+    return segments
+
+
+def _segment_result(segment: Segment, review: dict) -> dict:
+    return {
+        "name": segment.name,
+        "start_line": segment.start,
+        "end_line": segment.end,
+        "code": segment.code,
+        "review_steps": review["review_steps"],
+        "final_code": review["final_code"],
+    }
+
+
+def run_diff_review_pipeline(original: str, diff: str, pipeline=run_code_review_pipeline) -> dict:
+    """
+    Reviews only the functions/classes a unified diff touches.
+
+    Returns {"segments": [...]} where each segment carries its new-file line
+    range and the review result (from `pipeline`) for that region.
+    """
+    segments = _segments_for(original, diff)
+    return {
+        "segments": [_segment_result(s, pipeline(s.review_input())) for s in segments]
+    }
+
+
+async def arun_diff_review_pipeline(original: str, diff: str, pipeline=arun_code_review_pipeline) -> dict:
+    """
+    Async variant of `run_diff_review_pipeline`; segments are reviewed concurrently.
+    """
+    segments = _segments_for(original, diff)
+    reviews = await asyncio.gather(*[pipeline(s.review_input()) for s in segments])
+    return {
+        "segments": [_segment_result(s, review) for s, review in zip(segments, reviews)]
+    }
@@ -0,0 +1,209 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator
+
+from app.chains.checkpoint_store import get_checkpoint_store
+from app.chains.handoff import Handoff, extract_code_blocks, prompt_tokens
+from app.chains.streaming import astream_step
+from app.configs.settings import PIPELINE_CHECKPOINTS_ENABLED, PIPELINE_MODE
+from app.utils.logger import logger
+
+PIPELINE_MODES = ("sequential", "parallel")
+
+
+def resolve_mode(mode: str = None) -> str:
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unsupported pipeline mode: {mode}. Use one of: {', '.join(PIPELINE_MODES)}")
+    return mode
+
+
+def fan_in(handoff: Handoff, outputs: list) -> Handoff:
+    """
+    Folds the outputs of the independent checks, [(step_name, output), ...],
+    into `handoff` (seeded by the static pre-pass) for the final step: the code
+    blocks of every check in declaration order and the findings of each.
+    """
+    code_blocks = []
+    for step_name, output in outputs:
+        code_blocks.extend(extract_code_blocks(output))
+        handoff.update(step_name, output)
+    handoff.code_blocks = code_blocks
+    return handoff
+
+
+def _check_outputs(report: list, output_key: str) -> list:
+    return [(entry["step"], entry[output_key]) for entry in report if not entry.get("skipped")]
+
+
+def _checkpoints(pipeline, code_input: str):
+    # Fan-out steps see other inputs than sequential ones, so they get their own run key
+    store = get_checkpoint_store() if PIPELINE_CHECKPOINTS_ENABLED else None
+    return store, pipeline.run_key(code_input, mode="parallel")
+
+
+def run_fan_out(pipeline, code_input: str) -> dict:
+    """
+    Runs every step of `pipeline` but the last concurrently on the original
+    input (with the static pre-pass findings), then the last step once on the
+    handoff folded from their outputs (see `fan_in`). Checks whose
+    `skip_unless` concerns the pre-pass rules out are skipped. Each step runs
+    with its StepPolicy and is checkpointed like a sequential step, so a failed
+    run resumes with the checks that already completed. Returns the same
+    result as `Pipeline.run`.
+    """
+    store, run_key = _checkpoints(pipeline, code_input)
+    done = store.load(run_key) if store else {}
+    handoff, analysis = pipeline._start(code_input)
+    check_input = handoff.render()
+    checks, (final_name, final_chain) = pipeline.chains[:-1], pipeline.chains[-1]
+
+    def run_step(index: int, step_name: str, chain, step_input: str) -> dict:
+        if step_name in done:
+            logger.info(f"Resuming {pipeline.label} step from checkpoint: {step_name}")
+            return pipeline._step_entry(step_name, done[step_name]["output"], done[step_name]["prompt_tokens"])
+
+        tokens = prompt_tokens(chain, step_input)
+        logger.info(f"Running {pipeline.label} step: {step_name} ({tokens} prompt tokens)")
+        output = pipeline._invoke(step_name, chain, step_input)
+        if store:
+            store.save(run_key, step_name, index, output, tokens)
+        return pipeline._step_entry(step_name, output, tokens)
+
+    def run_check(index: int) -> dict:
+        step_name, chain = checks[index]
+        note = pipeline._skip_note(step_name, analysis)
+        if note:
+            return pipeline._step_entry(step_name, note, 0, skipped=True)
+        return run_step(index, step_name, chain, check_input)
+
+    logger.info(f"Running {len(checks)} {pipeline.label} checks in parallel.")
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        report = list(executor.map(run_check, range(len(checks))))
+
+    fan_in(handoff, _check_outputs(report, pipeline.output_key))
+    report.append(run_step(len(checks), final_name, final_chain, handoff.render()))
+    handoff.update(final_name, report[-1][pipeline.output_key])
+
+    if store:
+        store.clear(run_key)
+    return pipeline._result(report, handoff)
+
+
+async def arun_fan_out(pipeline, code_input: str) -> dict:
+    """
+    Async variant of `run_fan_out`; checkpoint I/O runs off the event loop.
+    """
+    store, run_key = _checkpoints(pipeline, code_input)
+    done = await asyncio.to_thread(store.load, run_key) if store else {}
+    handoff, analysis = await asyncio.to_thread(pipeline._start, code_input)
+    check_input = handoff.render()
+    checks, (final_name, final_chain) = pipeline.chains[:-1], pipeline.chains[-1]
+
+    async def run_step(index: int, step_name: str, chain, step_input: str) -> dict:
+        if step_name in done:
+            logger.info(f"Resuming {pipeline.label} step from checkpoint: {step_name}")
+            return pipeline._step_entry(step_name, done[step_name]["output"], done[step_name]["prompt_tokens"])
+
+        tokens = prompt_tokens(chain, step_input)
+        logger.info(f"Running {pipeline.label} step: {step_name} ({tokens} prompt tokens)")
+        output = await pipeline._ainvoke(step_name, chain, step_input)
+        if store:
+            await asyncio.to_thread(store.save, run_key, step_name, index, output, tokens)
+        return pipeline._step_entry(step_name, output, tokens)
+
+    async def run_check(index: int, step_name: str, chain) -> dict:
+        note = pipeline._skip_note(step_name, analysis)
+        if note:
+            return pipeline._step_entry(step_name, note, 0, skipped=True)
+        return await run_step(index, step_name, chain, check_input)
+
+    logger.info(f"Running {len(checks)} {pipeline.label} checks in parallel.")
+    report = list(await asyncio.gather(*[
+        run_check(index, step_name, chain) for index, (step_name, chain) in enumerate(checks)
+    ]))
+
+    fan_in(handoff, _check_outputs(report, pipeline.output_key))
+    report.append(await run_step(len(checks), final_name, final_chain, handoff.render()))
+    handoff.update(final_name, report[-1][pipeline.output_key])
+
+    if store:
+        await asyncio.to_thread(store.clear, run_key)
+    return pipeline._result(report, handoff)
+
+
+async def astream_fan_out(pipeline, code_input: str) -> AsyncIterator[dict]:
+    """
+    Streams the independent checks concurrently (their events interleave and are
+    told apart by "step"), then streams the final step on their folded handoff.
+    Steps are retried, timed out, skipped and checkpointed as in `Pipeline.astream`;
+    skipped and checkpointed steps are replayed without tokens.
+    """
+    store, run_key = _checkpoints(pipeline, code_input)
+    done = await asyncio.to_thread(store.load, run_key) if store else {}
+    handoff, analysis = await asyncio.to_thread(pipeline._start, code_input)
+    checks, (final_name, final_chain) = pipeline.chains[:-1], pipeline.chains[-1]
+    notes = {index: pipeline._skip_note(step_name, analysis) for index, (step_name, _) in enumerate(checks)}
+
+    async def astream_checkpointed(index: int, step_name: str, chain, step_input: str):
+        if notes.get(index):
+            yield {"event": "step_start", "step": step_name, "index": index, "prompt_tokens": 0, "skipped": True}
+            yield {"event": "step_end", "step": step_name, "index": index, "output": notes[index]}
+            return
+
+        if step_name in done:
+            yield {"event": "step_start", "step": step_name, "index": index, "prompt_tokens": done[step_name]["prompt_tokens"]}
+            yield {"event": "step_end", "step": step_name, "index": index, "output": done[step_name]["output"]}
+            return
+
+        timeout = pipeline.policies[step_name].timeout or None
+        async for event in astream_step(index, step_name, chain, step_input, timeout, pipeline._retry_or_raise):
+            if event["event"] == "step_end" and store:
+                await asyncio.to_thread(
+                    store.save, run_key, step_name, index, event["output"], prompt_tokens(chain, step_input)
+                )
+            yield event
+
+    queue = asyncio.Queue()
+    finished = object()
+    check_input = handoff.render()
+
+    async def pump(index, step_name, chain):
+        try:
+            async for event in astream_checkpointed(index, step_name, chain, check_input):
+                await queue.put(event)
+        finally:
+            await queue.put(finished)
+
+    logger.info(f"Streaming {len(checks)} {pipeline.label} checks in parallel.")
+    tasks = [asyncio.create_task(pump(i, name, chain)) for i, (name, chain) in enumerate(checks)]
+
+    outputs = {}
+    remaining = len(tasks)
+    try:
+        while remaining:
+            event = await queue.get()
+            if event is finished:
+                remaining -= 1
+                continue
+            if event["event"] == "step_end":
+                outputs[event["index"]] = event["output"]
+            yield event
+
+        # Surface a failed check instead of merging partial findings
+        for task in tasks:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    fan_in(handoff, [(name, outputs[i]) for i, (name, _) in enumerate(checks) if not notes[i]])
+    final_output = ""
+    async for event in astream_checkpointed(len(checks), final_name, final_chain, handoff.render()):
+        if event["event"] == "step_end":
+            final_output = event["output"]
+        yield event
+
+    if store:
+        await asyncio.to_thread(store.clear, run_key)
+    yield {"event": "pipeline_end", "final_code": final_output}
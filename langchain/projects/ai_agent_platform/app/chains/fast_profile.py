@@ -0,0 +1,152 @@
+import re
+
+from pydantic import Field, create_model
+
+from app.chains.code_review_chain import REVIEW_STEPS
+from app.chains.performance_optimization_chain import PERFORMANCE_STEPS
+from app.chains.streaming import chunk_text
+from app.chains.unit_test_generation_chain import UNIT_TEST_STEPS
+from app.configs.settings import DEFAULT_PROFILE
+from app.llm.llm_provider import get_llm
+from app.utils.lazy import Lazy
+from app.utils.logger import logger
+
+PROFILES = ("detailed", "fast")
+
+FAST_STEP_NAME = "Single-Pass Analysis"
+
+# tool name -> (task description, pipeline steps, steps key, step output key)
+FAST_TASKS = {
+    "code_reviewer": ("code review", REVIEW_STEPS, "review_steps", "reviewed_code"),
+    "performance_optimizer": ("performance optimization", PERFORMANCE_STEPS, "optimization_steps", "optimized_code"),
+    "unit_test_generator": ("unit test generation", UNIT_TEST_STEPS, "test_generation_steps", "generated_code"),
+}
+
+FAST_PROMPT = """
+You are performing a complete {task} in a single pass.
+Cover every one of the following sections:
+
+{sections}
+
+CODE:
+{{code}}
+
+Each section value is Markdown text: headers, bullet points, inline code and
+code blocks for multi-line code. The last section holds the final result.
+
+{{format_instructions}}
+"""
+
+
+def resolve_profile(profile: str = None) -> str:
+    profile = profile or DEFAULT_PROFILE
+    if profile not in PROFILES:
+        raise ValueError(f"Unsupported profile: {profile}. Use one of: {', '.join(PROFILES)}")
+    return profile
+
+
+def _field_name(step_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", step_name.lower()).strip("_")
+
+
+def _step_instructions(prompt_text: str) -> str:
+    # Everything a step prompt says before its CODE block is the step's task
+    return prompt_text.split("CODE:")[0].strip()
+
+
+def _build(tool_name: str, task: str, steps: list):
+    from langchain_core.output_parsers import PydanticOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    model = create_model(
+        f"{''.join(part.title() for part in tool_name.split('_'))}FastResult",
+        **{_field_name(name): (str, Field(..., description=name)) for name, _ in steps},
+    )
+    parser = PydanticOutputParser(pydantic_object=model)
+
+    sections = "\n\n".join(
+        f"### {name} (JSON key: \"{_field_name(name)}\")\n{_step_instructions(text)}" for name, text in steps
+    )
+    prompt = PromptTemplate(
+        input_variables=["code"],
+        template=FAST_PROMPT.format(task=task, sections=sections),
+        partial_variables={"format_instructions": parser.get_format_instructions()},
+    )
+    return prompt, parser
+
+
+def _build_fast_chains() -> dict:
+    llm = get_llm()
+    chains = {}
+
+    for tool_name, (task, steps, _, _) in FAST_TASKS.items():
+        prompt, parser = _build(tool_name, task, steps)
+        chains[tool_name] = (prompt | llm, parser)
+
+    return chains
+
+
+# tool name -> (prompt | llm, parser), built on first use
+fast_chains = Lazy(_build_fast_chains)
+
+
+def _to_pipeline_result(tool_name: str, raw_output: str) -> dict:
+    """
+    Maps the structured answer onto the multi-step pipeline result shape, so
+    the tools render the same report. Unparseable output becomes the final
+    section so the caller still gets the model's answer.
+    """
+    _, steps, steps_key, output_key = FAST_TASKS[tool_name]
+    _, parser = fast_chains()[tool_name]
+
+    try:
+        sections = parser.parse(raw_output).model_dump()
+    except Exception:
+        logger.warning(f"Fast profile for {tool_name} returned unstructured output; using it as the final section.")
+        sections = {_field_name(name): "" for name, _ in steps}
+        sections[_field_name(steps[-1][0])] = raw_output
+
+    report = [{"step": name, output_key: sections[_field_name(name)]} for name, _ in steps]
+    return {"final_code": report[-1][output_key], steps_key: report}
+
+
+def run_fast_profile(tool_name: str, code_input: str) -> dict:
+    """
+    Runs the tool's whole analysis in one LLM call with a structured result.
+    """
+    chain, _ = fast_chains()[tool_name]
+    logger.info(f"Running fast profile for {tool_name}")
+    return _to_pipeline_result(tool_name, chunk_text(chain.invoke({"code": code_input})))
+
+
+async def arun_fast_profile(tool_name: str, code_input: str) -> dict:
+    """
+    Async variant of `run_fast_profile`.
+    """
+    chain, _ = fast_chains()[tool_name]
+    logger.info(f"Running fast profile for {tool_name}")
+    return _to_pipeline_result(tool_name, chunk_text(await chain.ainvoke({"code": code_input})))
+
+
+async def astream_fast_profile(tool_name: str, code_input: str):
+    """
+    Streams the single LLM call as one step, then emits a step_end event per
+    section, matching the events of the streaming pipelines.
+    """
+    chain, _ = fast_chains()[tool_name]
+    _, _, steps_key, output_key = FAST_TASKS[tool_name]
+
+    yield {"event": "step_start", "step": FAST_STEP_NAME, "index": 0}
+
+    parts = []
+    async for chunk in chain.astream({"code": code_input}):
+        text = chunk_text(chunk)
+        if text:
+            parts.append(text)
+            yield {"event": "token", "step": FAST_STEP_NAME, "text": text}
+
+    result = _to_pipeline_result(tool_name, "".join(parts))
+    for index, step in enumerate(result[steps_key]):
+        yield {"event": "step_end", "step": step["step"], "index": index, "output": step[output_key]}
+
+    yield {"event": "pipeline_end", "final_code": result["final_code"]}
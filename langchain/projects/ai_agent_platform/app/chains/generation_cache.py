@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.configs.settings import CODE_GENERATION_CACHE_PATH, CODE_GENERATION_CACHE_TTL_SECONDS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS code_generations (
+    namespace TEXT NOT NULL,
+    requirement_hash TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (namespace, requirement_hash, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_code_generations_created ON code_generations (created_at);
+"""
+
+
+class GenerationCache:
+    """
+    SQLite table of multi-language generation results, keyed by namespace
+    (model and prompts), requirement hash and slot (a language, or the shared
+    analysis). Separate from the LLM prompt cache, so either can be turned off
+    on its own.
+
+    Like the job store, every call opens its own connection so the cache is safe
+    to share between threads and processes. Rows expire after ttl_seconds.
+    """
+
+    def __init__(self, db_path: str = CODE_GENERATION_CACHE_PATH, ttl_seconds: float = CODE_GENERATION_CACHE_TTL_SECONDS):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.execute("DELETE FROM code_generations WHERE created_at < ?", (time.time() - ttl_seconds,))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, namespace: str, requirement_hash: str, slot: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT content FROM code_generations "
+                "WHERE namespace = ? AND requirement_hash = ? AND slot = ? AND created_at >= ?",
+                (namespace, requirement_hash, slot, time.time() - self.ttl_seconds),
+            ).fetchone()
+
+        return row["content"] if row else None
+
+    def put(self, namespace: str, requirement_hash: str, slot: str, content: str):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO code_generations "
+                "(namespace, requirement_hash, slot, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, requirement_hash, slot, content, time.time()),
+            )
+
+
+_generation_cache = None
+_generation_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationCache:
+    """
+    Returns the process-wide code generation cache.
+    """
+    global _generation_cache
+
+    if _generation_cache is None:
+        with _generation_cache_lock:
+            if _generation_cache is None:
+                _generation_cache = GenerationCache()
+
+    return _generation_cache
@@ -0,0 +1,76 @@
+import re
+from dataclasses import dataclass, field
+
+from app.configs.settings import HANDOFF_MAX_FINDINGS_PER_STEP, HANDOFF_MAX_FINDING_CHARS
+from app.utils.token_counter import count_tokens
+
+CODE_BLOCK_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+LIST_ITEM_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*\S)")
+
+
+def extract_code_blocks(markdown: str) -> list:
+    """
+    Returns the contents of the fenced code blocks in a step's markdown output.
+    """
+    return [block.strip("\n") for block in CODE_BLOCK_RE.findall(markdown) if block.strip()]
+
+
+def extract_findings(markdown: str, limit: int = HANDOFF_MAX_FINDINGS_PER_STEP) -> list:
+    """
+    Returns the first `limit` bullet / numbered list items outside code blocks,
+    stripped of markdown emphasis and truncated to HANDOFF_MAX_FINDING_CHARS.
+    """
+    findings = []
+
+    for line in CODE_BLOCK_RE.sub("", markdown).splitlines():
+        match = LIST_ITEM_RE.match(line)
+        if not match:
+            continue
+
+        text = match.group(1).replace("**", "").strip()
+        if len(text) > HANDOFF_MAX_FINDING_CHARS:
+            text = text[:HANDOFF_MAX_FINDING_CHARS - 3].rstrip() + "..."
+        if text and text not in findings:
+            findings.append(text)
+        if len(findings) >= limit:
+            break
+
+    return findings
+
+
+def prompt_tokens(chain, step_input: str) -> int:
+    """Token count of the prompt a chain sends for the given {code} input."""
+    return count_tokens(chain.prompt.format(code=step_input))
+
+
+@dataclass
+class Handoff:
+    """
+    What one pipeline step passes to the next: the original source, the code
+    blocks of the most recent step that produced any, and a compact list of
+    findings from every step so far, seeded by the static pre-pass. The next
+    step's prompt stays bounded instead of growing with each full report.
+    """
+    source: str
+    code_blocks: list = field(default_factory=list)
+    findings: list = field(default_factory=list)  # [{"step": ..., "finding": ...}, ...]
+
+    def update(self, step_name: str, output: str) -> None:
+        blocks = extract_code_blocks(output)
+        if blocks:
+            self.code_blocks = blocks
+        self.findings.extend({"step": step_name, "finding": text} for text in extract_findings(output))
+
+    def render(self) -> str:
+        if not self.code_blocks and not self.findings:
+            return self.source
+
+        parts = [f"SOURCE CODE:\n{self.source}"]
+        if self.code_blocks:
+            latest = "\n\n".join(f"```\n{block}\n```" for block in self.code_blocks)
+            parts.append(f"LATEST CODE FROM PREVIOUS STEPS:\n{latest}")
+        if self.findings:
+            listed = "\n".join(f"- [{f['step']}] {f['finding']}" for f in self.findings)
+            parts.append(f"FINDINGS SO FAR:\n{listed}")
+
+        return "\n\n".join(parts)
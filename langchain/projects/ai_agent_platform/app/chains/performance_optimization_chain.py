@@ -1,6 +1,7 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from app.llm.llm_provider import get_llm
+from app.chains.pipeline_engine import Pipeline, StepPolicy
+from app.chains.static_analysis import LOOPS, RECURSION, IO
+from app.configs.settings import PIPELINE_STEP_TIMEOUT_SECONDS
+from app.chains.fan_out import resolve_mode, run_fan_out, arun_fan_out, astream_fan_out
 
 # Define reusable markdown guidelines
 MARKDOWN_GUIDELINES = """
@@ -101,33 +102,56 @@ CODE:
 """)
 ]
 
-llm = get_llm()
-optimization_chains = []
-
-for step_name, prompt_text in PERFORMANCE_STEPS:
-    prompt = PromptTemplate(input_variables=["code"], template=prompt_text)
-    chain = LLMChain(llm=llm, prompt=prompt, output_key="code")
-    optimization_chains.append((step_name, chain))
-
-def run_performance_optimization_pipeline(code_input: str) -> dict:
-    from app.utils.logger import logger
-
-    current_code = code_input
-    optimization_report = []
-
-    for step_name, chain in optimization_chains:
-        logger.info(f"Running performance optimization step: {step_name}")
-        result = chain.invoke({"code": current_code})
-        optimized_code = result["code"]
-
-        optimization_report.append({
-            "step": step_name,
-            "optimized_code": optimized_code
-        })
-
-        current_code = optimized_code
-
-    return {
-        "final_code": current_code,
-        "optimization_steps": optimization_report
-    }
\ No newline at end of file
+optimization_pipeline = Pipeline(
+    "performance_optimization",
+    PERFORMANCE_STEPS,
+    output_key="optimized_code",
+    steps_key="optimization_steps",
+    label="performance optimization",
+    policies={
+        # Skipped when the static pre-pass finds nothing for them (heuristic)
+        "CPU and Memory Optimization": StepPolicy(skip_unless=(LOOPS, RECURSION)),
+        "I/O Optimization": StepPolicy(skip_unless=(IO,)),
+        "Concurrency Optimization": StepPolicy(skip_unless=(IO, LOOPS)),
+        "Caching and Memoization": StepPolicy(skip_unless=(LOOPS, RECURSION, IO)),
+        # The final step writes the longest answer
+        "Final Review and Polish": StepPolicy(timeout=PIPELINE_STEP_TIMEOUT_SECONDS * 2),
+    },
+)
+
+
+def run_performance_optimization_pipeline(code_input: str, mode: str = None) -> dict:
+    """
+    Runs the steps in order; each step gets the source, the latest code blocks
+    and the findings so far from the previous steps (see `Handoff`). Completed
+    steps are checkpointed, so a failed run resumes where it stopped.
+    With mode="parallel" the independent checks run concurrently on the
+    original code and only the final step sees their combined code blocks
+    and findings (see `run_fan_out`).
+    """
+    if resolve_mode(mode) == "parallel":
+        return run_fan_out(optimization_pipeline, code_input)
+
+    return optimization_pipeline.run(code_input)
+
+
+async def arun_performance_optimization_pipeline(code_input: str, mode: str = None) -> dict:
+    """
+    Async variant of `run_performance_optimization_pipeline`.
+    Awaits each step so the event loop stays free while the LLM responds.
+    """
+    if resolve_mode(mode) == "parallel":
+        return await arun_fan_out(optimization_pipeline, code_input)
+
+    return await optimization_pipeline.arun(code_input)
+
+
+def astream_performance_optimization_pipeline(code_input: str, mode: str = None):
+    """
+    Streaming variant of `run_performance_optimization_pipeline`.
+    Yields step_start / token / step_end events, then a pipeline_end event.
+    """
+    if resolve_mode(mode) == "parallel":
+        return astream_fan_out(optimization_pipeline, code_input)
+
+    return optimization_pipeline.astream(code_input)
@@ -0,0 +1,351 @@
+import asyncio
+import contextvars
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from app.chains.checkpoint_store import get_checkpoint_store
+from app.chains.handoff import Handoff, prompt_tokens
+from app.chains.static_analysis import analyze
+from app.chains.streaming import astream_step
+from app.configs.settings import (
+    PIPELINE_CHECKPOINTS_ENABLED,
+    PIPELINE_RETRY_BACKOFF_SECONDS,
+    PIPELINE_STEP_RETRIES,
+    PIPELINE_STEP_THREADS,
+    PIPELINE_STEP_TIMEOUT_SECONDS,
+    STATIC_ANALYSIS_ENABLED,
+)
+from app.llm.llm_provider import get_llm, get_model_name
+from app.utils.lazy import Lazy
+from app.utils.logger import logger
+
+
+STATIC_ANALYSIS_STEP = "Static Analysis"
+MAX_STATIC_FINDINGS = 10
+
+
+@dataclass(frozen=True)
+class StepPolicy:
+    """
+    Timeout (seconds, 0 = none) and retry policy of one pipeline step.
+    `skip_unless` lists the static-analysis concerns the step is about; the
+    step is skipped when the pre-pass heuristically finds none of them.
+    """
+    timeout: float = PIPELINE_STEP_TIMEOUT_SECONDS
+    retries: int = PIPELINE_STEP_RETRIES
+    backoff: float = PIPELINE_RETRY_BACKOFF_SECONDS
+    skip_unless: tuple = ()
+
+    def delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt)
+
+
+class PipelineStepError(RuntimeError):
+    """A step still failed after its last retry; completed steps stay checkpointed."""
+
+    def __init__(self, pipeline: str, step: str, attempts: int, cause: Exception):
+        super().__init__(f"{pipeline} step '{step}' failed after {attempts} attempt(s): {cause!r}")
+        self.pipeline = pipeline
+        self.step = step
+        self.attempts = attempts
+
+
+# Shared by every sync step with a timeout. A timed-out LLM call cannot be
+# interrupted: it keeps its thread and limiter slot until the provider answers,
+# so the pool size bounds how many abandoned calls can pile up.
+_step_executor = Lazy(lambda: ThreadPoolExecutor(max_workers=PIPELINE_STEP_THREADS, thread_name_prefix="pipeline-step"))
+_abandoned_lock = threading.Lock()
+_abandoned = {"running": 0, "total": 0}
+
+
+def _call_finished(future):
+    with _abandoned_lock:
+        _abandoned["running"] -= 1
+
+
+def _invoke_with_timeout(chain, inputs: dict, timeout: float) -> dict:
+    if not timeout:
+        return chain.invoke(inputs)
+
+    context = contextvars.copy_context()
+    future = _step_executor().submit(context.run, chain.invoke, inputs)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # Still waiting for a thread: nothing to abandon. Either way the step
+        # is retried or failed.
+        if not future.cancel():
+            with _abandoned_lock:
+                _abandoned["running"] += 1
+                _abandoned["total"] += 1
+            future.add_done_callback(_call_finished)
+        raise
+
+
+def step_thread_stats() -> dict:
+    """Sync step calls abandoned after a timeout: still running, and since start."""
+    with _abandoned_lock:
+        stats = {f"abandoned_{key}": value for key, value in _abandoned.items()}
+    stats["threads"] = PIPELINE_STEP_THREADS
+    return stats
+
+
+class Pipeline:
+    """
+    Declarative sequential pipeline: a list of (step name, prompt) pairs, each
+    run with its StepPolicy and handed off to the next step (see `Handoff`).
+
+    The step chains (and the LLM behind them) are built on first use.
+    A local static-analysis pre-pass seeds the handoff with its findings and
+    lets steps whose concerns the code heuristically lacks be skipped.
+    Every completed step is checkpointed under the run key (pipeline name,
+    prompts, model and input hash) and the step name, so running the same input
+    after a failure or crash resumes from the last completed step. A run that
+    completes clears its checkpoints.
+    """
+
+    def __init__(self, name: str, steps: list, output_key: str, steps_key: str, label: str, policies: dict = None):
+        self.name = name
+        self.output_key = output_key
+        self.steps_key = steps_key
+        self.label = label
+
+        self.steps = steps
+        self._chains = Lazy(self._build_chains)
+        self.policies = {step_name: (policies or {}).get(step_name, StepPolicy()) for step_name, _ in steps}
+        self._fingerprint = hashlib.sha256("\0".join(text for _, text in steps).encode()).hexdigest()
+
+    def _build_chains(self) -> list:
+        from langchain.chains import LLMChain
+        from langchain_core.prompts import PromptTemplate
+
+        llm = get_llm()
+        return [
+            (step_name, LLMChain(llm=llm, prompt=PromptTemplate(input_variables=["code"], template=prompt_text), output_key="code"))
+            for step_name, prompt_text in self.steps
+        ]
+
+    @property
+    def chains(self) -> list:
+        """[(step name, LLMChain), ...] in step order."""
+        return self._chains()
+
+    def run_key(self, code_input: str, mode: str = "sequential") -> str:
+        return hashlib.sha256(
+            "\0".join([self.name, mode, self._fingerprint, get_model_name(), code_input]).encode()
+        ).hexdigest()
+
+    def _result(self, report: list, handoff: Handoff) -> dict:
+        return {
+            "final_code": report[-1][self.output_key],
+            self.steps_key: report,
+            "findings": handoff.findings,
+        }
+
+    def _step_entry(self, step_name: str, output: str, tokens: int, skipped: bool = False) -> dict:
+        entry = {"step": step_name, self.output_key: output, "prompt_tokens": tokens}
+        if skipped:
+            entry["skipped"] = True
+        return entry
+
+    def _start(self, code_input: str):
+        """
+        Runs the static pre-pass; returns the seeded Handoff and the analysis
+        (None when the pre-pass is disabled).
+        """
+        if not STATIC_ANALYSIS_ENABLED:
+            return Handoff(code_input), None
+
+        analysis = analyze(code_input)
+        findings = [{"step": STATIC_ANALYSIS_STEP, "finding": str(f)} for f in analysis.findings[:MAX_STATIC_FINDINGS]]
+        return Handoff(code_input, findings=findings), analysis
+
+    def _skip_note(self, step_name: str, analysis) -> str | None:
+        concerns = self.policies[step_name].skip_unless
+        if analysis is None or not concerns or not analysis.rules_out(concerns):
+            return None
+
+        logger.info(f"Skipping {self.label} step: {step_name} (static analysis found no {'/'.join(concerns)})")
+        return f"_Skipped: local static analysis found no {', '.join(concerns)} concerns in this code._"
+
+    def _retry_or_raise(self, step_name: str, attempt: int, error: Exception) -> float:
+        policy = self.policies[step_name]
+        if attempt >= policy.retries:
+            raise PipelineStepError(self.label, step_name, attempt + 1, error) from error
+
+        delay = policy.delay(attempt)
+        logger.warning(f"{self.label} step '{step_name}' attempt {attempt + 1} failed ({error!r}); retrying in {delay:.1f}s")
+        return delay
+
+    def _invoke(self, step_name: str, chain, step_input: str) -> str:
+        timeout = self.policies[step_name].timeout
+        attempt = 0
+
+        while True:
+            try:
+                return _invoke_with_timeout(chain, {"code": step_input}, timeout)["code"]
+            except Exception as error:
+                time.sleep(self._retry_or_raise(step_name, attempt, error))
+                attempt += 1
+
+    async def _ainvoke(self, step_name: str, chain, step_input: str) -> str:
+        timeout = self.policies[step_name].timeout or None
+        attempt = 0
+
+        while True:
+            try:
+                return (await asyncio.wait_for(chain.ainvoke({"code": step_input}), timeout))["code"]
+            except Exception as error:
+                await asyncio.sleep(self._retry_or_raise(step_name, attempt, error))
+                attempt += 1
+
+    def run(self, code_input: str) -> dict:
+        store = get_checkpoint_store() if PIPELINE_CHECKPOINTS_ENABLED else None
+        run_key = self.run_key(code_input)
+        done = store.load(run_key) if store else {}
+
+        handoff, analysis = self._start(code_input)
+        report = []
+
+        for index, (step_name, chain) in enumerate(self.chains):
+            note = self._skip_note(step_name, analysis)
+            if note:
+                report.append(self._step_entry(step_name, note, 0, skipped=True))
+                continue
+
+            if step_name in done:
+                logger.info(f"Resuming {self.label} step from checkpoint: {step_name}")
+                output, tokens = done[step_name]["output"], done[step_name]["prompt_tokens"]
+            else:
+                step_input = handoff.render()
+                tokens = prompt_tokens(chain, step_input)
+                logger.info(f"Running {self.label} step: {step_name} ({tokens} prompt tokens)")
+                output = self._invoke(step_name, chain, step_input)
+                if store:
+                    store.save(run_key, step_name, index, output, tokens)
+
+            report.append(self._step_entry(step_name, output, tokens))
+            handoff.update(step_name, output)
+
+        if store:
+            store.clear(run_key)
+        return self._result(report, handoff)
+
+    async def arun(self, code_input: str) -> dict:
+        """
+        Async variant of `run`; checkpoint I/O runs off the event loop.
+        """
+        store = get_checkpoint_store() if PIPELINE_CHECKPOINTS_ENABLED else None
+        run_key = self.run_key(code_input)
+        done = await asyncio.to_thread(store.load, run_key) if store else {}
+
+        handoff, analysis = await asyncio.to_thread(self._start, code_input)
+        report = []
+
+        for index, (step_name, chain) in enumerate(self.chains):
+            note = self._skip_note(step_name, analysis)
+            if note:
+                report.append(self._step_entry(step_name, note, 0, skipped=True))
+                continue
+
+            if step_name in done:
+                logger.info(f"Resuming {self.label} step from checkpoint: {step_name}")
+                output, tokens = done[step_name]["output"], done[step_name]["prompt_tokens"]
+            else:
+                step_input = handoff.render()
+                tokens = prompt_tokens(chain, step_input)
+                logger.info(f"Running {self.label} step: {step_name} ({tokens} prompt tokens)")
+                output = await self._ainvoke(step_name, chain, step_input)
+                if store:
+                    await asyncio.to_thread(store.save, run_key, step_name, index, output, tokens)
+
+            report.append(self._step_entry(step_name, output, tokens))
+            handoff.update(step_name, output)
+
+        if store:
+            await asyncio.to_thread(store.clear, run_key)
+        return self._result(report, handoff)
+
+    async def aprefetch(self, code_input: str) -> str | None:
+        """
+        Runs and checkpoints only the first step that calls the LLM, so a later
+        run of the same input resumes after it (the agent's speculative mode).
+        Returns the step name, or None when checkpoints are disabled or the
+        step is already checkpointed.
+        """
+        if not PIPELINE_CHECKPOINTS_ENABLED:
+            return None
+
+        store = get_checkpoint_store()
+        run_key = self.run_key(code_input)
+        done = await asyncio.to_thread(store.load, run_key)
+        handoff, analysis = await asyncio.to_thread(self._start, code_input)
+
+        for index, (step_name, chain) in enumerate(self.chains):
+            if self._skip_note(step_name, analysis):
+                continue
+            if step_name in done:
+                return None
+
+            step_input = handoff.render()
+            logger.info(f"Prefetching {self.label} step: {step_name}")
+            output = await self._ainvoke(step_name, chain, step_input)
+            await asyncio.to_thread(store.save, run_key, step_name, index, output, prompt_tokens(chain, step_input))
+            return step_name
+
+        return None
+
+    async def astream(self, code_input: str) -> AsyncIterator[dict]:
+        """
+        Runs the pipeline and yields events while it is produced.
+
+        Checkpointed and skipped steps are replayed as step_start / step_end
+        without tokens (a skipped step's step_start carries "skipped": True).
+        A live step is retried only until its first token has been sent; its
+        timeout applies to the wait for each next chunk.
+
+        Yields dicts with an "event" key:
+        - step_start: {"step", "index", "prompt_tokens"}
+        - token:      {"step", "text"}
+        - step_end:   {"step", "index", "output"}
+        - pipeline_end: {"final_code"}
+        """
+        store = get_checkpoint_store() if PIPELINE_CHECKPOINTS_ENABLED else None
+        run_key = self.run_key(code_input)
+        done = await asyncio.to_thread(store.load, run_key) if store else {}
+
+        handoff, analysis = await asyncio.to_thread(self._start, code_input)
+        output = code_input
+
+        for index, (step_name, chain) in enumerate(self.chains):
+            note = self._skip_note(step_name, analysis)
+            if note:
+                yield {"event": "step_start", "step": step_name, "index": index, "prompt_tokens": 0, "skipped": True}
+                yield {"event": "step_end", "step": step_name, "index": index, "output": note}
+                continue
+
+            if step_name in done:
+                output = done[step_name]["output"]
+                yield {"event": "step_start", "step": step_name, "index": index, "prompt_tokens": done[step_name]["prompt_tokens"]}
+                yield {"event": "step_end", "step": step_name, "index": index, "output": output}
+            else:
+                logger.info(f"Streaming {self.label} step: {step_name}")
+                step_input = handoff.render()
+                async for event in astream_step(
+                    index, step_name, chain, step_input, self.policies[step_name].timeout or None, self._retry_or_raise
+                ):
+                    if event["event"] == "step_end":
+                        output = event["output"]
+                    yield event
+                if store:
+                    await asyncio.to_thread(store.save, run_key, step_name, index, output, prompt_tokens(chain, step_input))
+
+            handoff.update(step_name, output)
+
+        if store:
+            await asyncio.to_thread(store.clear, run_key)
+        yield {"event": "pipeline_end", "final_code": output}
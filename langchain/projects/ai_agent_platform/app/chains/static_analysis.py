@@ -0,0 +1,284 @@
+import ast
+import io
+import re
+import tokenize
+from dataclasses import dataclass, field
+
+from app.chains.handoff import CODE_BLOCK_RE
+from app.configs.settings import STATIC_SKIP_MAX_LINES
+
+# Concerns a pipeline step can depend on (see StepPolicy.skip_unless)
+SECURITY = "security"
+LOOPS = "loops"
+RECURSION = "recursion"
+IO = "io"
+PRACTICES = "practices"
+
+SECRET_NAME_RE = re.compile(r"(pass(word|wd)?|pwd|secret|api_?key|token|private_?key|credentials?)", re.IGNORECASE)
+SECRET_ASSIGN_RE = re.compile(
+    r"""(pass(word|wd)?|secret|api_?key|token|private_?key)\s*[:=]\s*["'][^"'\s]{3,}["']""", re.IGNORECASE
+)
+KEY_LITERAL_RE = re.compile(r"(AKIA[0-9A-Z]{16}|-----BEGIN [A-Z ]*PRIVATE KEY-----|gh[pousr]_[A-Za-z0-9]{36}|sk-[A-Za-z0-9]{20,})")
+SQL_RE = re.compile(r"\b(SELECT\s.+\sFROM|INSERT\s+INTO|UPDATE\s.+\sSET|DELETE\s+FROM)\b", re.IGNORECASE | re.DOTALL)
+CODE_START_RE = re.compile(r"^(def |class |async def |import |from |@)")
+
+NETWORK_CALLS = {"get", "post", "put", "patch", "delete", "head", "request", "urlopen", "fetch", "recv", "send", "connect"}
+NETWORK_MODULES = {"requests", "httpx", "urllib", "aiohttp", "socket", "http", "session", "client"}
+FILE_CALLS = {"read", "write", "readlines", "writelines", "read_text", "write_text", "read_csv", "to_csv"}
+UNSAFE_CALLS = {"eval", "exec", "compile", "__import__"}
+UNSAFE_ATTR_CALLS = {("os", "system"), ("os", "popen"), ("pickle", "loads"), ("pickle", "load"), ("marshal", "loads"), ("yaml", "load")}
+# Calls taking a file path: a path from a variable can point outside the intended directory
+PATH_CALLS = {"open", "Path"}
+PATH_ATTR_CALLS = {("os", "remove"), ("os", "unlink"), ("os", "rmdir"), ("os", "listdir"), ("os", "makedirs"), ("shutil", "rmtree"), ("shutil", "copy"), ("shutil", "move"), ("pathlib", "Path")}
+RISKY_MODULES = {"os", "subprocess", "pickle", "marshal", "shelve", "yaml", "sqlite3", "socket", "requests", "httpx", "urllib", "tempfile", "hashlib", "random", "jwt", "flask", "django"}
+
+
+@dataclass
+class Finding:
+    line: int
+    rule: str
+    concern: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message} ({self.rule})"
+
+
+@dataclass
+class Analysis:
+    """
+    Result of the local pre-pass. `concerns` says which kinds of problems the
+    code could have at all (it has loops, I/O, a security surface, ...), which
+    is broader than the concrete findings. Both come from pattern rules, not a
+    proof: code can have a concern the rules do not recognise.
+    """
+    findings: list = field(default_factory=list)
+    concerns: set = field(default_factory=set)
+    parsed: bool = False
+    lines: int = 0
+
+    @property
+    def confident(self) -> bool:
+        # Only small inputs that parsed as Python are trusted to be fully understood
+        return self.parsed and self.lines <= STATIC_SKIP_MAX_LINES
+
+    def rules_out(self, concerns) -> bool:
+        """True when the rules found none of the given concerns (a heuristic, not a proof)."""
+        return self.confident and not (set(concerns) & self.concerns)
+
+
+def python_source(text: str):
+    """
+    Returns the parsed module for text that is, or contains, Python source:
+    the whole text, its fenced code blocks, or everything from the first line
+    that starts a definition or import (agent inputs often lead with prose).
+    """
+    candidates = [text, "\n".join(CODE_BLOCK_RE.findall(text))]
+    lines = text.splitlines()
+    start = next((i for i, line in enumerate(lines) if CODE_START_RE.match(line)), None)
+    if start:
+        candidates.append("\n".join(lines[start:]))
+
+    for source in candidates:
+        if not source.strip():
+            continue
+        try:
+            return source, ast.parse(source)
+        except (SyntaxError, ValueError):
+            continue
+
+    return text, None
+
+
+def _call_name(node: ast.Call) -> tuple:
+    # ("requests", "get") for requests.get(...), (None, "open") for open(...)
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        owner = func.value
+        owner_name = owner.id if isinstance(owner, ast.Name) else owner.attr if isinstance(owner, ast.Attribute) else None
+        return owner_name, func.attr
+    if isinstance(func, ast.Name):
+        return None, func.id
+    return None, None
+
+
+def _is_sql(node) -> bool:
+    return isinstance(node, ast.Constant) and isinstance(node.value, str) and bool(SQL_RE.search(node.value))
+
+
+def _is_text(node) -> bool:
+    if isinstance(node, ast.JoinedStr):
+        return True
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.BinOp):
+        return _is_text(node.left) or _is_text(node.right)
+    return False
+
+
+class _Visitor(ast.NodeVisitor):
+    def __init__(self, analysis: Analysis):
+        self.analysis = analysis
+        self.loop_depth = 0
+        self.functions = []
+        self.parameters = []  # argument names of the enclosing functions
+
+    def _add(self, node, rule: str, concern: str, message: str):
+        self.analysis.findings.append(Finding(getattr(node, "lineno", 0), rule, concern, message))
+        self.analysis.concerns.add(concern)
+
+    # --- structure -------------------------------------------------------
+
+    def _visit_loop(self, node):
+        self.analysis.concerns.add(LOOPS)
+        if self.loop_depth:
+            self._add(node, "nested-loop", LOOPS, "nested loop; check the complexity or use a dict/set lookup")
+        self.loop_depth += 1
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    visit_For = visit_AsyncFor = visit_While = _visit_loop
+
+    def _visit_comprehension(self, node):
+        self.analysis.concerns.add(LOOPS)
+        self.generic_visit(node)
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _visit_comprehension
+
+    def _visit_function(self, node):
+        args = node.args
+        self.functions.append(node.name)
+        self.parameters.append({arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg] if arg})
+        self.generic_visit(node)
+        self.parameters.pop()
+        self.functions.pop()
+
+    def _from_parameter(self, node) -> str | None:
+        names = set().union(*self.parameters) if self.parameters else set()
+        return next((child.id for child in ast.walk(node) if isinstance(child, ast.Name) and child.id in names), None)
+
+    visit_FunctionDef = visit_AsyncFunctionDef = _visit_function
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.name.split(".")[0] in RISKY_MODULES:
+                self.analysis.concerns.add(SECURITY)
+            if alias.name.split(".")[0] in NETWORK_MODULES:
+                self.analysis.concerns.add(IO)
+
+    def visit_ImportFrom(self, node):
+        if node.module and node.module.split(".")[0] in RISKY_MODULES:
+            self.analysis.concerns.add(SECURITY)
+        if node.module and node.module.split(".")[0] in NETWORK_MODULES:
+            self.analysis.concerns.add(IO)
+
+    # --- statements ------------------------------------------------------
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            name = target.id if isinstance(target, ast.Name) else target.attr if isinstance(target, ast.Attribute) else ""
+            value = node.value
+            if SECRET_NAME_RE.search(name) and isinstance(value, ast.Constant) and isinstance(value.value, str) and value.value:
+                self._add(node, "hardcoded-secret", SECURITY, f"hardcoded secret in `{name}`; load it from the environment or a secret store")
+        self.generic_visit(node)
+
+    def visit_BinOp(self, node):
+        if isinstance(node.op, (ast.Mod, ast.Add)) and (_is_sql(node.left) or _is_sql(node.right)):
+            self._add(node, "sql-format", SECURITY, "SQL built with % formatting or concatenation; use query parameters")
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if self.loop_depth and isinstance(node.op, ast.Add) and _is_text(node.value):
+            self._add(node, "concat-in-loop", LOOPS, "string built with += in a loop; collect parts and use str.join")
+        self.generic_visit(node)
+
+    def visit_ExceptHandler(self, node):
+        if node.type is None:
+            self._add(node, "bare-except", PRACTICES, "bare `except:` hides errors; catch specific exceptions")
+        self.generic_visit(node)
+
+    # --- calls -----------------------------------------------------------
+
+    def visit_Call(self, node):
+        owner, name = _call_name(node)
+
+        if (owner is None and name in UNSAFE_CALLS) or (owner, name) in UNSAFE_ATTR_CALLS:
+            self._add(node, "unsafe-call", SECURITY, f"`{name}` on untrusted data can execute arbitrary code")
+        if owner == "subprocess" and any(k.arg == "shell" and getattr(k.value, "value", False) is True for k in node.keywords):
+            self._add(node, "shell-true", SECURITY, "`shell=True` allows shell injection; pass an argument list")
+        if owner is None and name == "input":
+            self.analysis.concerns.add(SECURITY)
+        if name == "format" and isinstance(node.func, ast.Attribute) and _is_sql(node.func.value):
+            self._add(node, "sql-format", SECURITY, "SQL built with str.format; use query parameters")
+
+        is_path = (owner is None and name in PATH_CALLS) or (owner, name) in PATH_ATTR_CALLS
+        path = node.args[0] if node.args else next((k.value for k in node.keywords if k.arg in ("file", "path")), None)
+        if is_path and path is not None and not isinstance(path, ast.Constant):
+            self.analysis.concerns.add(SECURITY)
+            parameter = self._from_parameter(path)
+            if parameter:
+                self._add(node, "path-from-input", SECURITY, f"file path built from `{parameter}`; resolve it and check it stays inside an allowed directory")
+        if (owner is None and name in ("print", "log")) or name in ("info", "debug", "warning", "error"):
+            if any(isinstance(arg, ast.Name) and SECRET_NAME_RE.search(arg.id) for arg in node.args):
+                self._add(node, "secret-logged", SECURITY, "sensitive value written to output or logs")
+
+        is_network = name in NETWORK_CALLS and (owner in NETWORK_MODULES or name == "urlopen")
+        is_file = (owner is None and name == "open") or (owner is not None and name in FILE_CALLS)
+        if is_network or is_file:
+            self.analysis.concerns.add(IO)
+        if is_network and self.loop_depth:
+            self._add(node, "network-in-loop", IO, f"sequential `{owner}.{name}` call in a loop; batch the requests or run them concurrently")
+        elif is_file and self.loop_depth:
+            self._add(node, "io-in-loop", IO, f"`{name}` inside a loop; open once and batch the reads/writes")
+
+        if self.loop_depth and name == "append" and owner is not None:
+            self._add(node, "append-in-loop", LOOPS, f"`{owner}.append` in a loop; a list comprehension is usually faster")
+        if owner is None and name == "range" and node.args and isinstance(node.args[0], ast.Call) and _call_name(node.args[0])[1] == "len":
+            self._add(node, "range-len", PRACTICES, "`range(len(...))`; iterate directly or use enumerate")
+        if self.functions and owner is None and name == self.functions[-1]:
+            self.analysis.concerns.add(RECURSION)
+            self._add(node, "recursion", RECURSION, f"`{name}` is recursive; consider functools.lru_cache or iteration")
+
+        self.generic_visit(node)
+
+
+def _scan_tokens(source: str, analysis: Analysis):
+    # String literals can carry keys and SQL regardless of where they are assigned
+    try:
+        tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return
+
+    for token in tokens:
+        if token.type != tokenize.STRING:
+            continue
+        if KEY_LITERAL_RE.search(token.string):
+            analysis.findings.append(Finding(token.start[0], "key-literal", SECURITY, "credential-looking literal in source"))
+            analysis.concerns.add(SECURITY)
+        if SQL_RE.search(token.string):
+            analysis.concerns.add(SECURITY)
+            if token.string.lstrip("rbuRBU").startswith(("f", "F")):
+                analysis.findings.append(Finding(token.start[0], "sql-fstring", SECURITY, "SQL built with an f-string; use query parameters"))
+
+
+def analyze(code: str) -> Analysis:
+    """
+    Fast local pre-pass over the input. Python is analysed with ast/tokenize;
+    any other text only gets the regex rules, and is never `confident`.
+    """
+    source, tree = python_source(code)
+    analysis = Analysis(parsed=tree is not None, lines=len(source.strip().splitlines()))
+
+    if tree is not None:
+        _Visitor(analysis).visit(tree)
+        _scan_tokens(source, analysis)
+    else:
+        for number, line in enumerate(code.splitlines(), start=1):
+            if SECRET_ASSIGN_RE.search(line) or KEY_LITERAL_RE.search(line):
+                analysis.findings.append(Finding(number, "hardcoded-secret", SECURITY, "hardcoded credential"))
+                analysis.concerns.add(SECURITY)
+
+    # One finding per rule and line, in source order
+    unique = {(f.line, f.rule): f for f in analysis.findings}
+    analysis.findings = sorted(unique.values(), key=lambda f: (f.line, f.rule))
+    return analysis
@@ -0,0 +1,53 @@
+import asyncio
+from typing import AsyncIterator
+
+from app.chains.handoff import prompt_tokens
+
+
+def chunk_text(chunk) -> str:
+    # Chat models stream message chunks, completion models (Ollama) stream plain strings.
+    return getattr(chunk, "content", chunk) or ""
+
+
+async def _astream_text(chain, code: str, timeout: float = None) -> AsyncIterator[str]:
+    # LLMChain.astream only yields the final result, so stream its parts directly
+    stream = (chain.prompt | chain.llm).astream({"code": code}).__aiter__()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), timeout)
+            except StopAsyncIteration:
+                return
+            text = chunk_text(chunk)
+            if text:
+                yield text
+    finally:
+        await stream.aclose()
+
+
+async def astream_step(index: int, step_name: str, chain, code: str, timeout: float = None, retry_delay=None) -> AsyncIterator[dict]:
+    """
+    Streams one step as step_start / token / step_end events.
+
+    `timeout` bounds the wait for each chunk. With `retry_delay`, a failure before
+    the first token is retried after `retry_delay(step_name, attempt, error)`
+    seconds; the callback raises once retries are exhausted.
+    """
+    yield {"event": "step_start", "step": step_name, "index": index, "prompt_tokens": prompt_tokens(chain, code)}
+
+    parts = []
+    attempt = 0
+    while True:
+        try:
+            async for text in _astream_text(chain, code, timeout):
+                parts.append(text)
+                yield {"event": "token", "step": step_name, "text": text}
+            break
+        except Exception as error:
+            # Tokens already sent cannot be taken back, so only retry a silent failure
+            if parts or retry_delay is None:
+                raise
+            await asyncio.sleep(retry_delay(step_name, attempt, error))
+            attempt += 1
+
+    yield {"event": "step_end", "step": step_name, "index": index, "output": "".join(parts)}
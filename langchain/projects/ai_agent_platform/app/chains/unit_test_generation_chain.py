@@ -1,6 +1,5 @@
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from app.llm.llm_provider import get_llm
+from app.chains.pipeline_engine import Pipeline, StepPolicy
+from app.configs.settings import PIPELINE_STEP_TIMEOUT_SECONDS
 
 # Define the reusable markdown guidelines
 MARKDOWN_GUIDELINES = """
@@ -63,34 +62,32 @@ CODE:
 """)
 ]
 
-llm = get_llm()
-test_generation_chains = []
-
-for step_name, prompt_text in UNIT_TEST_STEPS:
-    prompt = PromptTemplate(input_variables=["code"], template=prompt_text)
-    chain = LLMChain(llm=llm, prompt=prompt, output_key="code")
-    test_generation_chains.append((step_name, chain))
+test_generation_pipeline = Pipeline(
+    "unit_test_generation",
+    UNIT_TEST_STEPS,
+    output_key="generated_code",
+    steps_key="test_generation_steps",
+    label="unit test generation",
+    # The final step writes the longest answer
+    policies={"Finalize Unit Test Code": StepPolicy(timeout=PIPELINE_STEP_TIMEOUT_SECONDS * 2)},
+)
 
 
 def run_unit_test_generation_pipeline(code_input: str) -> dict:
-    from app.utils.logger import logger
-
-    current_code = code_input
-    test_generation_report = []
+    return test_generation_pipeline.run(code_input)
 
-    for step_name, chain in test_generation_chains:
-        logger.info(f"Running unit test generation step: {step_name}")
-        result = chain.invoke({"code": current_code})
-        generated_code = result["code"]
 
-        test_generation_report.append({
-            "step": step_name,
-            "generated_code": generated_code
-        })
+async def arun_unit_test_generation_pipeline(code_input: str) -> dict:
+    """
+    Async variant of `run_unit_test_generation_pipeline`.
+    Awaits each step so the event loop stays free while the LLM responds.
+    """
+    return await test_generation_pipeline.arun(code_input)
 
-        current_code = generated_code
 
-    return {
-        "final_code": current_code,
-        "test_generation_steps": test_generation_report
-    }
+def astream_unit_test_generation_pipeline(code_input: str):
+    """
+    Streaming variant of `run_unit_test_generation_pipeline`.
+    Yields step_start / token / step_end events, then a pipeline_end event.
+    """
+    return test_generation_pipeline.astream(code_input)
@@ -1,6 +1,168 @@
 # Configuration values for the project
+import os
 
 DEFAULT_LLM_MODEL = "ollama"  # or other supported models
 # LLM_PROVIDER = "openai"  # change from "dummy" to "openai"
-LLM_PROVIDER = "ollama"  # change from "dummy" to "ollama"
-AGENT_TYPE = "langgraph"
\ No newline at end of file
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "ollama")  # change from "dummy" to "ollama"
+AGENT_TYPE = os.getenv("AGENT_TYPE", "langgraph")
+
+# Maximum number of pipelines a single batch request runs at the same time
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+# Background job queue (POST /jobs, GET /jobs/{id})
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "data/jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # 0 = API only, run workers via `python -m app.jobs.job_worker`
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "900"))  # running jobs without a heartbeat for this long are requeued
+JOB_REQUEUE_INTERVAL = float(os.getenv("JOB_REQUEUE_INTERVAL", "60"))  # how often every worker pool checks for them
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))  # workers renew their lease this often; keep well below the lease
+
+# Send one tiny prompt at startup so the model is loaded before /health reports ready
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+
+# LLM response cache: in-memory LRU in front of a SQLite store
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3")
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_TOUCH_SECONDS = float(os.getenv("LLM_CACHE_TOUCH_SECONDS", "60"))  # memory hits refresh the disk LRU time this often
+
+# Provider client limits (0 = unlimited). Callers over the limit are queued, not rejected.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "512"))
+
+# Ollama model, and the endpoint list used by the "ollama_pool" provider
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3")
+OLLAMA_ENDPOINTS = [url.strip() for url in os.getenv("OLLAMA_ENDPOINTS", "http://localhost:11434").split(",") if url.strip()]
+OLLAMA_HEALTH_CHECK_INTERVAL = float(os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL", "10"))
+OLLAMA_HEDGE_ENABLED = os.getenv("OLLAMA_HEDGE_ENABLED", "false").lower() == "true"
+OLLAMA_HEDGE_MIN_SAMPLES = int(os.getenv("OLLAMA_HEDGE_MIN_SAMPLES", "20"))  # latencies needed before p95 is trusted
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4-turbo")
+
+# Token budget for the code sent to one pipeline run; larger inputs are chunked
+# along AST boundaries and map-reduced. CHUNK_TOKEN_BUDGET > 0 overrides the per-model value.
+MODEL_TOKEN_BUDGETS = {
+    "gpt-4-turbo": 24000,
+    "llama3": 3000,
+}
+DEFAULT_TOKEN_BUDGET = 3000
+CHUNK_TOKEN_BUDGET = int(os.getenv("CHUNK_TOKEN_BUDGET", "0"))
+CHUNK_OVERLAP_LINES = int(os.getenv("CHUNK_OVERLAP_LINES", "3"))
+CHUNK_MAX_PARALLEL = int(os.getenv("CHUNK_MAX_PARALLEL", "4"))
+
+# "simulated" provider for offline load tests (latencies in seconds, rates 0..1)
+SIMULATED_LLM_SEED = int(os.getenv("SIMULATED_LLM_SEED", "42"))
+SIMULATED_TTFT_SECONDS = float(os.getenv("SIMULATED_TTFT_SECONDS", "0.4"))
+SIMULATED_TOKEN_SECONDS = float(os.getenv("SIMULATED_TOKEN_SECONDS", "0.02"))
+SIMULATED_ERROR_RATE = float(os.getenv("SIMULATED_ERROR_RATE", "0"))
+SIMULATED_TIMEOUT_RATE = float(os.getenv("SIMULATED_TIMEOUT_RATE", "0"))
+SIMULATED_TIME_SCALE = float(os.getenv("SIMULATED_TIME_SCALE", "1.0"))
+
+# Per-step policy for the sequential pipelines (individual steps may override it).
+# Completed steps are checkpointed so a failed run resumes instead of starting over.
+PIPELINE_STEP_TIMEOUT_SECONDS = float(os.getenv("PIPELINE_STEP_TIMEOUT_SECONDS", "180"))
+PIPELINE_STEP_RETRIES = int(os.getenv("PIPELINE_STEP_RETRIES", "2"))  # extra attempts after the first
+PIPELINE_RETRY_BACKOFF_SECONDS = float(os.getenv("PIPELINE_RETRY_BACKOFF_SECONDS", "1.0"))  # doubled per attempt
+# Threads running sync steps that have a timeout; a timed-out call keeps its thread
+# (and LLM limiter slot) until the provider answers, so this caps abandoned calls too
+PIPELINE_STEP_THREADS = int(os.getenv("PIPELINE_STEP_THREADS", str(max(LLM_MAX_CONCURRENCY, 1) * 2)))
+PIPELINE_CHECKPOINTS_ENABLED = os.getenv("PIPELINE_CHECKPOINTS_ENABLED", "true").lower() == "true"
+PIPELINE_CHECKPOINT_PATH = os.getenv("PIPELINE_CHECKPOINT_PATH", "data/checkpoints.sqlite3")
+PIPELINE_CHECKPOINT_TTL_SECONDS = float(os.getenv("PIPELINE_CHECKPOINT_TTL_SECONDS", str(24 * 3600)))
+
+# Local static-analysis pre-pass: its findings are added to every step's input, and
+# steps for concerns the code heuristically lacks are skipped (only for parsed Python
+# of at most STATIC_SKIP_MAX_LINES lines)
+STATIC_ANALYSIS_ENABLED = os.getenv("STATIC_ANALYSIS_ENABLED", "true").lower() == "true"
+STATIC_SKIP_MAX_LINES = int(os.getenv("STATIC_SKIP_MAX_LINES", "80"))
+
+# "sequential": each step reviews the previous step's output (original behaviour)
+# "parallel": independent checks run concurrently on the original code, then one final merge step
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "sequential")
+
+# Tool profile: "detailed" runs the multi-step pipelines, "fast" answers in one structured LLM call
+DEFAULT_PROFILE = os.getenv("DEFAULT_PROFILE", "detailed")
+
+# Step-to-step handoff: the next step sees the source, the latest code blocks and
+# at most this many findings per earlier step (each truncated to HANDOFF_MAX_FINDING_CHARS)
+HANDOFF_MAX_FINDINGS_PER_STEP = int(os.getenv("HANDOFF_MAX_FINDINGS_PER_STEP", "5"))
+HANDOFF_MAX_FINDING_CHARS = int(os.getenv("HANDOFF_MAX_FINDING_CHARS", "200"))
+
+# Multi-language code generation: languages used when a request names none, and
+# how many languages are generated concurrently from the shared analysis
+CODE_GENERATION_DEFAULT_LANGUAGES = [
+    lang.strip() for lang in os.getenv("CODE_GENERATION_DEFAULT_LANGUAGES", "python,typescript,java,go").split(",") if lang.strip()
+]
+CODE_GENERATION_MAX_PARALLEL = int(os.getenv("CODE_GENERATION_MAX_PARALLEL", "4"))
+CODE_GENERATION_MAX_LANGUAGES = int(os.getenv("CODE_GENERATION_MAX_LANGUAGES", "8"))  # per request
+# The shared analysis and each language's code are cached per requirement hash,
+# independently of the LLM prompt cache (whose entries they then skip)
+CODE_GENERATION_CACHE_ENABLED = os.getenv("CODE_GENERATION_CACHE_ENABLED", "true").lower() == "true"
+CODE_GENERATION_CACHE_PATH = os.getenv("CODE_GENERATION_CACHE_PATH", "data/code_generations.sqlite3")
+CODE_GENERATION_CACHE_TTL_SECONDS = float(os.getenv("CODE_GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Generated unit tests can be run against the input code in sandboxed subprocesses
+# (see TEST_VALIDATION_ISOLATION; CPU / memory / process / wall-clock limits), at most
+# TEST_VALIDATION_WORKERS at a time; the pass/fail counts are added to the report
+TEST_VALIDATION_ENABLED = os.getenv("TEST_VALIDATION_ENABLED", "false").lower() == "true"
+TEST_VALIDATION_WORKERS = int(os.getenv("TEST_VALIDATION_WORKERS", "4"))
+TEST_VALIDATION_TIMEOUT_SECONDS = float(os.getenv("TEST_VALIDATION_TIMEOUT_SECONDS", "30"))
+TEST_VALIDATION_CPU_SECONDS = float(os.getenv("TEST_VALIDATION_CPU_SECONDS", "10"))
+TEST_VALIDATION_MEMORY_MB = int(os.getenv("TEST_VALIDATION_MEMORY_MB", "512"))  # 0 = no address space limit
+# Isolation of the test process: "namespace" runs it in its own user, PID, mount
+# and network namespaces (`unshare`): no network, and the API's processes and
+# their /proc entries are invisible. "none" applies only the limits above and is
+# for trusted input only. TEST_VALIDATION_UID runs the tests as that uid ("auto":
+# nobody when the API runs as root, which is also exempt from the process limit;
+# "none": never switch). TEST_VALIDATION_PYTHON must be executable by that uid
+# (default: the first of this interpreter and the system python3 that works).
+TEST_VALIDATION_ISOLATION = os.getenv("TEST_VALIDATION_ISOLATION", "namespace")
+TEST_VALIDATION_UID = os.getenv("TEST_VALIDATION_UID", "auto")
+TEST_VALIDATION_PYTHON = os.getenv("TEST_VALIDATION_PYTHON", "")
+TEST_VALIDATION_MAX_PROCESSES = int(os.getenv("TEST_VALIDATION_MAX_PROCESSES", "32"))  # RLIMIT_NPROC headroom per sandbox
+
+# Local intent router in front of the LLM planner: keyword scores pick the tool
+# when the winner's confidence (0-1) reaches ROUTER_MIN_CONFIDENCE; confidence is
+# scaled down until the winner has ROUTER_FULL_EVIDENCE points. Decisions, local
+# or from the LLM, are cached for the last ROUTER_CACHE_SIZE distinct inputs.
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.6"))
+ROUTER_FULL_EVIDENCE = float(os.getenv("ROUTER_FULL_EVIDENCE", "2.0"))
+ROUTER_CACHE_SIZE = int(os.getenv("ROUTER_CACHE_SIZE", "2048"))
+ROUTER_HISTORY_SIZE = int(os.getenv("ROUTER_HISTORY_SIZE", "50"))  # recent decisions used to guess for speculation
+
+# Speculative mode (async agent only): while the LLM planner decides, the likely
+# tool's first pipeline step already runs; it is kept when the planner agrees and
+# cancelled otherwise. At most SPECULATION_MAX_PER_MINUTE speculative runs (0 = no limit).
+SPECULATION_ENABLED = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+SPECULATION_MAX_PER_MINUTE = float(os.getenv("SPECULATION_MAX_PER_MINUTE", "30"))
+
+# Agent sessions: a request with a session_id sees the session's last
+# SESSION_RECENT_TURNS turns verbatim (each capped at SESSION_TURN_MAX_TOKENS, code
+# replaced by artifact hashes) and a summary of older turns capped at
+# SESSION_SUMMARY_MAX_TOKENS; a follow-up without code works on the latest code artifact
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "data/sessions.sqlite3")
+SESSION_RECENT_TURNS = int(os.getenv("SESSION_RECENT_TURNS", "3"))
+SESSION_TURN_MAX_TOKENS = int(os.getenv("SESSION_TURN_MAX_TOKENS", "600"))
+SESSION_SUMMARY_MAX_TOKENS = int(os.getenv("SESSION_SUMMARY_MAX_TOKENS", "400"))
+SESSION_SUMMARY_FINDINGS = int(os.getenv("SESSION_SUMMARY_FINDINGS", "3"))  # findings kept per summarised turn
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))  # idle sessions expire
+SESSION_EXPIRE_INTERVAL = float(os.getenv("SESSION_EXPIRE_INTERVAL", "300"))  # how often writes purge expired sessions
+
+# Tool run logs (<TOOL_LOG_DIR>/<tool>_result.md) are written by a background
+# thread in batches of up to TOOL_LOG_BATCH_SIZE entries, at most
+# TOOL_LOG_FLUSH_SECONDS after they were queued. A file is rotated at
+# TOOL_LOG_MAX_BYTES or when its first entry is TOOL_LOG_ROTATE_SECONDS old
+# (0 = never); rotated segments are gzipped and the newest TOOL_LOG_BACKUPS kept.
+TOOL_LOG_ENABLED = os.getenv("TOOL_LOG_ENABLED", "true").lower() == "true"
+TOOL_LOG_DIR = os.getenv("TOOL_LOG_DIR", "logs")
+TOOL_LOG_MAX_BYTES = int(os.getenv("TOOL_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TOOL_LOG_ROTATE_SECONDS = float(os.getenv("TOOL_LOG_ROTATE_SECONDS", str(24 * 3600)))
+TOOL_LOG_BACKUPS = int(os.getenv("TOOL_LOG_BACKUPS", "10"))  # 0 = keep all segments
+TOOL_LOG_BATCH_SIZE = int(os.getenv("TOOL_LOG_BATCH_SIZE", "100"))
+TOOL_LOG_FLUSH_SECONDS = float(os.getenv("TOOL_LOG_FLUSH_SECONDS", "1.0"))
+TOOL_LOG_QUEUE_SIZE = int(os.getenv("TOOL_LOG_QUEUE_SIZE", "10000"))  # entries beyond this are dropped
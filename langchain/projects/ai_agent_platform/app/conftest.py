@@ -0,0 +1,15 @@
+import os
+import tempfile
+
+# Chains build their LLM at import time, so the provider must be chosen before
+# any `app.*` module is collected. Tests never talk to a real model.
+os.environ.setdefault("LLM_PROVIDER", "dummy")
+
+# Keep test state out of the working tree
+os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="ai_agent_tests_"), "jobs.sqlite3"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.environ["JOB_DB_PATH"]), "llm_cache.sqlite3"))
+os.environ.setdefault("PIPELINE_CHECKPOINT_PATH", os.path.join(os.path.dirname(os.environ["JOB_DB_PATH"]), "checkpoints.sqlite3"))
+os.environ.setdefault("CODE_GENERATION_CACHE_PATH", os.path.join(os.path.dirname(os.environ["JOB_DB_PATH"]), "code_generations.sqlite3"))
+os.environ.setdefault("SESSION_DB_PATH", os.path.join(os.path.dirname(os.environ["JOB_DB_PATH"]), "sessions.sqlite3"))
+os.environ.setdefault("TOOL_LOG_DIR", os.path.join(os.path.dirname(os.environ["JOB_DB_PATH"]), "logs"))
+os.environ.setdefault("PIPELINE_RETRY_BACKOFF_SECONDS", "0")
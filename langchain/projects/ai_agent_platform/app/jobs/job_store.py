@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from app.configs.settings import JOB_DB_PATH
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tool TEXT,
+    input TEXT NOT NULL,
+    status TEXT NOT NULL,
+    steps TEXT NOT NULL DEFAULT '[]',
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed job table shared by the API and any number of worker processes.
+
+    Every call opens its own connection, so the store is safe to use from
+    threads and separate processes; WAL mode lets readers poll while workers write.
+    """
+
+    def __init__(self, db_path: str = JOB_DB_PATH):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["steps"] = json.loads(job["steps"])
+        return job
+
+    def submit(self, input_text: str, tool: str = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, tool, input, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, tool, input_text, QUEUED, now, now),
+            )
+
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        return self._to_dict(row) if row else None
+
+    def claim_next(self, worker_id: str) -> dict | None:
+        """
+        Atomically moves the oldest queued job to running and returns it.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = ?, worker = ?, steps = '[]', updated_at = ? WHERE id = ?",
+                (RUNNING, worker_id, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+
+        job = self._to_dict(row)
+        job.update(status=RUNNING, worker=worker_id, steps=[])
+        return job
+
+    # Writes of a running job only apply while `worker` still holds it: once the
+    # job was requeued (and maybe claimed again), the old worker's writes are dropped.
+    _OWNED = f"id = ? AND worker = ? AND status = '{RUNNING}'"
+
+    def set_tool(self, job_id: str, worker_id: str, tool: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET tool = ?, updated_at = ? WHERE {self._OWNED}",
+                (tool, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Renews the worker's lease on a running job. False when the job was
+        requeued or finished meanwhile, i.e. the worker no longer holds it.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(f"UPDATE jobs SET updated_at = ? WHERE {self._OWNED}", (time.time(), job_id, worker_id))
+            return cursor.rowcount > 0
+
+    def append_step(self, job_id: str, worker_id: str, step: dict) -> bool:
+        """
+        Records one finished pipeline step and renews the lease. False (nothing
+        written) when the worker no longer holds the job.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(f"SELECT steps FROM jobs WHERE {self._OWNED}", (job_id, worker_id)).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+
+            steps = json.loads(row["steps"]) + [step]
+            conn.execute(
+                "UPDATE jobs SET steps = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(steps), time.time(), job_id),
+            )
+            conn.execute("COMMIT")
+            return True
+
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE {self._OWNED}",
+                (SUCCEEDED, result, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE {self._OWNED}",
+                (FAILED, error, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def requeue_stale(self, lease_seconds: float) -> int:
+        """
+        Puts running jobs whose worker stopped heartbeating back in the queue,
+        e.g. after a crash or restart. Returns the number of requeued jobs.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (QUEUED, time.time(), RUNNING, time.time() - lease_seconds),
+            )
+            return cursor.rowcount
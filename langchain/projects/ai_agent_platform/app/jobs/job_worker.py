@@ -0,0 +1,162 @@
+import asyncio
+import os
+import socket
+
+from app.configs.settings import (
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_INTERVAL,
+    JOB_REQUEUE_INTERVAL,
+    JOB_WORKERS,
+)
+from app.jobs.job_store import JobStore
+from app.utils.logger import logger
+
+
+class JobLeaseLost(RuntimeError):
+    """The job was requeued while this worker ran it; another worker owns it now."""
+
+
+class JobWorkerPool:
+    """
+    Pool of asyncio workers that claim queued jobs from the JobStore and run
+    the selected tool, recording each finished pipeline step as it completes.
+
+    The pool can run inside the API process (started from the FastAPI lifespan)
+    or standalone via `python -m app.jobs.job_worker`, so workers scale
+    independently of the API layer. A worker renews its lease on the running
+    job every `heartbeat_interval` seconds, however long a step takes; every
+    pool requeues jobs whose worker stopped heartbeating, every
+    `requeue_interval` seconds. A worker whose job was requeued stops running it.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        requeue_interval: float = JOB_REQUEUE_INTERVAL,
+        heartbeat_interval: float = JOB_HEARTBEAT_INTERVAL,
+    ):
+        self.store = store
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.requeue_interval = requeue_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._tasks = []
+        self._worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+
+    async def _heartbeat(self, job_id: str, worker_id: str, run: asyncio.Task) -> bool:
+        # True when the lease was lost and the run cancelled
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not await asyncio.to_thread(self.store.heartbeat, job_id, worker_id):
+                run.cancel()
+                return True
+
+    async def _run_job(self, job: dict):
+        run = asyncio.create_task(self._run_tool(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"], job["worker"], run))
+        try:
+            await run
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled() and heartbeat.result():
+                raise JobLeaseLost(f"Job {job['id']} was requeued while running.") from None
+            raise
+        finally:
+            run.cancel()
+            heartbeat.cancel()
+            await asyncio.gather(run, heartbeat, return_exceptions=True)
+
+    async def _run_tool(self, job: dict):
+        from app.tools import tool_streams
+
+        job_id = job["id"]
+        worker_id = job["worker"]
+        tool_name = job["tool"]
+
+        if tool_name is None:
+            # Imported lazily: the agent module builds the tools and LLM
+            from app.agents.langgraph_code_assistant import aplanner_node
+
+            plan = await aplanner_node({"input": job["input"]})
+            tool_name = plan["tool_to_use"]
+            if tool_name is None:
+                raise ValueError("No valid tool found for input.")
+            await asyncio.to_thread(self.store.set_tool, job_id, worker_id, tool_name)
+
+        streams = tool_streams()
+        if tool_name not in streams:
+            raise ValueError(f"Unknown tool: {tool_name}")
+
+        async for event in streams[tool_name](job["input"]):
+            if event["event"] == "step_end":
+                step = {"step": event["step"], "output": event["output"]}
+                await asyncio.to_thread(self.store.append_step, job_id, worker_id, step)
+            elif event["event"] == "tool_end":
+                await asyncio.to_thread(self.store.complete, job_id, worker_id, event["output"])
+
+    async def _worker_loop(self, worker_id: str):
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next, worker_id)
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            logger.info(f"[{worker_id}] Running job {job['id']} (tool={job['tool']})")
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                # Shutting down: leave the job running, requeue_stale picks it up later
+                raise
+            except JobLeaseLost:
+                logger.warning(f"[{worker_id}] Stopped job {job['id']}: it was requeued to another worker.")
+            except Exception as e:
+                logger.exception(f"Job {job['id']} failed.")
+                await asyncio.to_thread(self.store.fail, job["id"], worker_id, str(e))
+
+    async def _requeue_stale(self):
+        try:
+            requeued = await asyncio.to_thread(self.store.requeue_stale, self.lease_seconds)
+        except Exception:
+            logger.exception("Could not requeue stale jobs.")
+            return
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs.")
+
+    async def _requeue_loop(self):
+        # Workers of other processes can die at any time, not only before this one starts
+        while True:
+            await asyncio.sleep(self.requeue_interval)
+            await self._requeue_stale()
+
+    async def start(self):
+        await self._requeue_stale()
+
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self._worker_prefix}-{n}"))
+            for n in range(self.workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._requeue_loop()))
+        logger.info(f"Started {self.workers} job workers.")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+async def _serve_forever():
+    pool = JobWorkerPool(JobStore(), workers=max(JOB_WORKERS, 1))
+    await pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(_serve_forever())
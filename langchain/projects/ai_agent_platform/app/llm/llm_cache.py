@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from langchain_core.caches import BaseCache, RETURN_VAL_TYPE
+from langchain_core.load import dumps, loads
+
+from app.configs.settings import (
+    LLM_CACHE_PATH,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TOUCH_SECONDS,
+    LLM_CACHE_TTL_SECONDS,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at);
+"""
+
+
+class TwoTierLLMCache(BaseCache):
+    """
+    LangChain LLM cache with a bounded in-memory LRU in front of a SQLite store.
+
+    Entries are keyed on LangChain's llm_string (provider type, model and
+    invocation parameters) plus the exact prompt. Both tiers honour the TTL;
+    the SQLite tier evicts least recently used rows once a write takes it past
+    max_entries, down to 99% of it so eviction runs once per batch of new rows.
+    Memory hits refresh a row's disk access time at most every touch_seconds,
+    so entries hot in memory are not evicted from disk.
+    """
+
+    def __init__(
+        self,
+        db_path: str = LLM_CACHE_PATH,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        touch_seconds: float = LLM_CACHE_TOUCH_SECONDS,
+    ):
+        self.db_path = db_path
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_seconds = touch_seconds
+
+        self._memory = OrderedDict()  # key -> (created_at, generations)
+        self._touched = {}  # key -> last disk accessed_at written for a memory entry
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Rows written by this process since; other processes' rows are seen when evicting
+            self._rows = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: RETURN_VAL_TYPE, touched_at: float):
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            self._touched[key] = touched_at
+            while len(self._memory) > self.memory_entries:
+                old_key, _ = self._memory.popitem(last=False)
+                self._touched.pop(old_key, None)
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            touch = False
+            if entry is not None:
+                if self._expired(entry[0], now):
+                    del self._memory[key]
+                    self._touched.pop(key, None)
+                    entry = None
+                else:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    touch = now - self._touched.get(key, 0.0) >= self.touch_seconds
+                    if touch:
+                        self._touched[key] = now
+
+        if entry is not None:
+            if touch:
+                with self._connect() as conn:
+                    conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return entry[1]
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and self._expired(row[1], now):
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            self._count("misses")
+            return None
+
+        value = [loads(generation) for generation in json.loads(row[0])]
+        self._remember(key, row[1], value, now)
+        self._count("disk_hits")
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        payload = json.dumps([dumps(generation) for generation in return_val])
+
+        self._remember(key, now, return_val, now)
+
+        evicted = 0
+        with self._connect() as conn:
+            exists = conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone() is not None
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            with self._lock:
+                self._rows += 0 if exists else 1
+                over_limit = self._rows > self.max_entries
+            if over_limit:
+                evicted = self._evict(conn)
+
+        self._count("writes")
+        if evicted > 0:
+            self._count("evictions", evicted)
+
+    def _evict(self, conn) -> int:
+        # Oldest rows first via the accessed_at index, never a sort of the whole table
+        rows = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        excess = rows - (self.max_entries - self.max_entries // 100)
+        evicted = 0
+        if rows > self.max_entries and excess > 0:
+            evicted = conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?"
+                ")",
+                (excess,),
+            ).rowcount
+
+        with self._lock:
+            self._rows = rows - evicted
+        return evicted
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._rows = 0
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+
+        stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> TwoTierLLMCache:
+    """
+    Returns the process-wide LLM cache shared by every provider instance.
+    """
+    global _llm_cache
+
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = TwoTierLLMCache()
+
+    return _llm_cache
@@ -1,55 +1,179 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.language_models import BaseChatModel
-from app.configs.settings import LLM_PROVIDER
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import ClassVar
+
+from app.configs.settings import LLM_PROVIDER, LLM_CACHE_ENABLED, OLLAMA_MODEL, OLLAMA_ENDPOINTS, OPENAI_MODEL
+from app.llm.rate_limiter import get_provider_limiter, estimate_tokens
 from dotenv import load_dotenv
-from langchain_community.llms import Ollama
 
 load_dotenv()
 
-class DummyLLM(BaseChatModel):
-    """Dummy fallback LLM when no real provider is selected."""
 
-    def _generate(self, messages, stop=None, **kwargs):
-        from langchain_core.outputs import ChatResult, ChatGeneration
-        from langchain_core.messages import AIMessage
+# Set while a call holds its limiter slot. Default async implementations run the
+# sync method in an executor (with a copied context), which must not queue twice.
+_inside_limiter = ContextVar("inside_llm_limiter", default=False)
+
+
+@contextmanager
+def _outside_limiter():
+    # A generator's caller runs in the same context between chunks: clear the
+    # flag while yielding, so the caller's own LLM calls are still limited
+    _inside_limiter.set(False)
+    try:
+        yield
+    finally:
+        _inside_limiter.set(True)
+
+
+class RateLimitedMixin:
+    """
+    Routes every provider call through the shared ProviderLimiter
+    (concurrency cap + RPM/TPM buckets). Cache hits never reach the limiter.
+    """
+
+    limiter_name: ClassVar[str] = "default"
+
+    @contextmanager
+    def _limited(self, inputs):
+        if _inside_limiter.get():
+            yield
+            return
+
+        _inside_limiter.set(True)
+        try:
+            with get_provider_limiter(self.limiter_name).limit(estimate_tokens(inputs)):
+                yield
+        finally:
+            _inside_limiter.set(False)
 
-        input_text = "\n".join([m.content for m in messages])
-        output_text = f"(DummyLLM) {input_text}"
+    @asynccontextmanager
+    async def _alimited(self, inputs):
+        if _inside_limiter.get():
+            yield
+            return
 
-        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=output_text))])
+        _inside_limiter.set(True)
+        try:
+            async with get_provider_limiter(self.limiter_name).alimit(estimate_tokens(inputs)):
+                yield
+        finally:
+            _inside_limiter.set(False)
 
-    @property
-    def _llm_type(self) -> str:
-        return "dummy_llm"
+    def _generate(self, inputs, *args, **kwargs):
+        with self._limited(inputs):
+            return super()._generate(inputs, *args, **kwargs)
+
+    async def _agenerate(self, inputs, *args, **kwargs):
+        async with self._alimited(inputs):
+            return await super()._agenerate(inputs, *args, **kwargs)
+
+
+class RateLimitedStreamMixin(RateLimitedMixin):
+    """RateLimitedMixin for providers that also implement token streaming."""
+
+    def _stream(self, inputs, *args, **kwargs):
+        with self._limited(inputs):
+            for chunk in super()._stream(inputs, *args, **kwargs):
+                with _outside_limiter():
+                    yield chunk
+
+    async def _astream(self, inputs, *args, **kwargs):
+        async with self._alimited(inputs):
+            async for chunk in super()._astream(inputs, *args, **kwargs):
+                with _outside_limiter():
+                    yield chunk
+
+
+_shared_llms = {}
+_shared_llms_lock = threading.Lock()
 
-    @property
-    def lc_serializable(self) -> bool:
-        return False
 
 def get_llm():
     """
-    Returns the LLM instance based on configuration.
+    Returns the shared LLM instance for the configured provider.
+    All chains and agents reuse one client per provider, so HTTP connections
+    are pooled and the provider limits apply process-wide.
+    """
+    provider = LLM_PROVIDER.lower()
+
+    with _shared_llms_lock:
+        if provider not in _shared_llms:
+            _shared_llms[provider] = _create_llm(provider)
+        return _shared_llms[provider]
+
+
+def get_model_name() -> str:
+    """
+    Returns the model name behind the configured provider (used for token budgets).
+    """
+    provider = LLM_PROVIDER.lower()
+
+    if provider == "openai":
+        return OPENAI_MODEL
+    elif provider in ("ollama", "ollama_pool"):
+        return OLLAMA_MODEL
+    return provider
+
+
+def _create_llm(provider: str):
+    """
+    Creates the LLM instance based on configuration.
     Supported providers:
     - openai
     - ollama
+    - ollama_pool (latency-aware routing across OLLAMA_ENDPOINTS)
+    - simulated (offline model with realistic latency, see SIMULATED_* settings)
     - dummy
+
+    Every provider shares the two-tier response cache unless LLM_CACHE_ENABLED is off.
+    Provider SDKs are imported here, on first use, not when this module is imported.
     """
+    from app.llm.llm_cache import get_llm_cache
 
-    provider = LLM_PROVIDER.lower()
+    # Shared response cache (in-memory LRU + SQLite); False disables caching explicitly
+    cache = get_llm_cache() if LLM_CACHE_ENABLED else False
 
     if provider == "openai":
-        return ChatOpenAI(
-            model="gpt-4-turbo",
+        from app.llm.providers import PooledChatOpenAI
+        return PooledChatOpenAI(
+            model=OPENAI_MODEL,
             temperature=0.0,
+            cache=cache,
         )
 
     elif provider == "ollama":
-        # Default model: llama3 (You can change to codellama, phi3 etc)
-        return Ollama(
-            model="llama3"
+        # Default model: llama3 via OLLAMA_MODEL (You can change to codellama, phi3 etc)
+        from app.llm.providers import PooledOllama
+        return PooledOllama(
+            model=OLLAMA_MODEL,
+            cache=cache,
+        )
+
+    elif provider == "ollama_pool":
+        from app.llm.providers import PooledOllamaEndpoints
+        return PooledOllamaEndpoints(
+            endpoints=OLLAMA_ENDPOINTS,
+            model=OLLAMA_MODEL,
+            cache=cache,
         )
 
+    elif provider == "simulated":
+        from app.llm.providers import RateLimitedSimulatedLLM
+        return RateLimitedSimulatedLLM(cache=cache)
+
     elif provider == "dummy":
-        return DummyLLM()
+        from app.llm.providers import DummyLLM
+        return DummyLLM(cache=cache)
     else:
-        raise ValueError(f"Unsupported LLM Provider: {LLM_PROVIDER}")
\ No newline at end of file
+        raise ValueError(f"Unsupported LLM Provider: {LLM_PROVIDER}")
+
+
+def __getattr__(name):
+    # The provider classes live in app.llm.providers, whose SDK imports are slow;
+    # they stay importable from here without loading them at startup.
+    if name in ("PooledChatOpenAI", "PooledOllama", "PooledOllamaEndpoints", "RateLimitedSimulatedLLM", "DummyLLM"):
+        from app.llm import providers
+        return getattr(providers, name)
+
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
@@ -0,0 +1,287 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+
+import httpx
+from langchain_community.llms import Ollama
+from langchain_core.language_models import BaseLLM
+from langchain_core.outputs import Generation, LLMResult
+from pydantic import PrivateAttr
+
+from app.configs.settings import (
+    OLLAMA_MODEL,
+    OLLAMA_HEALTH_CHECK_INTERVAL,
+    OLLAMA_HEDGE_ENABLED,
+    OLLAMA_HEDGE_MIN_SAMPLES,
+)
+from app.utils.logger import logger
+
+# Weight of the newest sample in the per-endpoint latency average
+EWMA_ALPHA = 0.3
+LATENCY_WINDOW = 200
+
+
+class OllamaEndpoint:
+    """Routing state for one Ollama host."""
+
+    def __init__(self, base_url: str, model: str):
+        self.base_url = base_url.rstrip("/")
+        self.client = Ollama(base_url=self.base_url, model=model, cache=False)
+        self.ewma_latency = None
+        self.in_flight = 0
+        self.healthy = True
+        self.last_health_check = 0.0
+        self.requests = 0
+        self.failures = 0
+
+    def score(self) -> float:
+        # Unmeasured hosts score 0 so every endpoint gets sampled early
+        return (self.ewma_latency or 0.0) * (self.in_flight + 1)
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "ewma_latency_seconds": self.ewma_latency,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class OllamaEndpointPool:
+    """
+    Routes calls across several Ollama hosts.
+
+    Each call goes to the healthy endpoint with the best (EWMA latency x
+    in-flight) score. A failing endpoint leaves the rotation until its
+    /api/tags health check passes again, checked at most every
+    `health_check_interval` seconds. With hedging on, a call still running
+    after the pool's p95 latency is duplicated on the next best endpoint and
+    the first answer wins.
+    """
+
+    def __init__(
+        self,
+        endpoints: List[str],
+        model: str = OLLAMA_MODEL,
+        hedge: bool = OLLAMA_HEDGE_ENABLED,
+        hedge_min_samples: int = OLLAMA_HEDGE_MIN_SAMPLES,
+        health_check_interval: float = OLLAMA_HEALTH_CHECK_INTERVAL,
+    ):
+        if not endpoints:
+            raise ValueError("OllamaEndpointPool needs at least one endpoint.")
+
+        self.endpoints = [OllamaEndpoint(url, model) for url in endpoints]
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.health_check_interval = health_check_interval
+
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(4, 2 * len(endpoints)), thread_name_prefix="ollama-pool")
+        self._stats = {"hedged": 0, "hedge_wins": 0}
+
+    # ---------------------------
+    # Health and selection
+    # ---------------------------
+
+    def _check_health(self, endpoint: OllamaEndpoint) -> bool:
+        try:
+            response = httpx.get(f"{endpoint.base_url}/api/tags", timeout=2.0)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    def _recheck_unhealthy(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                e for e in self.endpoints
+                if not e.healthy and now - e.last_health_check >= self.health_check_interval
+            ]
+            for endpoint in due:
+                endpoint.last_health_check = now
+
+        for endpoint in due:
+            if self._check_health(endpoint):
+                logger.info(f"Ollama endpoint back in rotation: {endpoint.base_url}")
+                with self._lock:
+                    endpoint.healthy = True
+
+    def _select(self, exclude=()) -> Optional[OllamaEndpoint]:
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.healthy and e not in exclude]
+            if not candidates:
+                return None
+            endpoint = min(candidates, key=OllamaEndpoint.score)
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def _finish(self, endpoint: OllamaEndpoint, started: float, ok: bool):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            endpoint.in_flight -= 1
+            if ok:
+                endpoint.ewma_latency = elapsed if endpoint.ewma_latency is None else (
+                    EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * endpoint.ewma_latency
+                )
+                self._latencies.append(elapsed)
+            else:
+                endpoint.failures += 1
+                endpoint.healthy = False
+                endpoint.last_health_check = time.monotonic()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Returns the pool-wide p95 latency, once enough samples exist."""
+        with self._lock:
+            if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+
+    # ---------------------------
+    # Calls
+    # ---------------------------
+
+    def _call_endpoint(self, endpoint: OllamaEndpoint, prompt: str, stop) -> str:
+        started = time.monotonic()
+        try:
+            result = endpoint.client.invoke(prompt, stop=stop)
+        except Exception:
+            self._finish(endpoint, started, ok=False)
+            logger.warning(f"Ollama endpoint failed, removed from rotation: {endpoint.base_url}")
+            raise
+        self._finish(endpoint, started, ok=True)
+        return result
+
+    async def _acall_endpoint(self, endpoint: OllamaEndpoint, prompt: str, stop) -> str:
+        started = time.monotonic()
+        try:
+            result = await endpoint.client.ainvoke(prompt, stop=stop)
+        except asyncio.CancelledError:
+            # Lost a hedge race: not a failure, but no latency sample either
+            with self._lock:
+                endpoint.in_flight -= 1
+            raise
+        except Exception:
+            self._finish(endpoint, started, ok=False)
+            logger.warning(f"Ollama endpoint failed, removed from rotation: {endpoint.base_url}")
+            raise
+        self._finish(endpoint, started, ok=True)
+        return result
+
+    def _record_hedge(self, hedge_won: bool):
+        with self._lock:
+            self._stats["hedged"] += 1
+            self._stats["hedge_wins"] += int(hedge_won)
+
+    def call(self, prompt: str, stop=None) -> str:
+        self._recheck_unhealthy()
+        tried = []
+        last_error = None
+
+        while True:
+            primary = self._select(exclude=tried)
+            if primary is None:
+                raise RuntimeError(f"No healthy Ollama endpoint available. Last error: {last_error}")
+            tried.append(primary)
+
+            futures = {self._executor.submit(self._call_endpoint, primary, prompt, stop): primary}
+            delay = self.hedge_delay()
+            done, _ = wait(futures, timeout=delay)
+
+            if not done:
+                backup = self._select(exclude=tried)
+                if backup is not None:
+                    tried.append(backup)
+                    futures[self._executor.submit(self._call_endpoint, backup, prompt, stop)] = backup
+
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        if len(futures) > 1:
+                            self._record_hedge(futures[future] is not primary)
+                        # A losing sync request cannot be aborted; it finishes in the background
+                        return future.result()
+                    last_error = future.exception()
+
+    async def acall(self, prompt: str, stop=None) -> str:
+        await asyncio.to_thread(self._recheck_unhealthy)
+        tried = []
+        last_error = None
+
+        while True:
+            primary = self._select(exclude=tried)
+            if primary is None:
+                raise RuntimeError(f"No healthy Ollama endpoint available. Last error: {last_error}")
+            tried.append(primary)
+
+            tasks = {asyncio.ensure_future(self._acall_endpoint(primary, prompt, stop)): primary}
+            delay = self.hedge_delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+
+            if not done:
+                backup = self._select(exclude=tried)
+                if backup is not None:
+                    tried.append(backup)
+                    tasks[asyncio.ensure_future(self._acall_endpoint(backup, prompt, stop))] = backup
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        for loser in pending:
+                            loser.cancel()
+                        if len(tasks) > 1:
+                            self._record_hedge(tasks[task] is not primary)
+                        return task.result()
+                    last_error = task.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "endpoints": {e.base_url: e.stats() for e in self.endpoints},
+            }
+
+
+class OllamaPoolLLM(BaseLLM):
+    """
+    Completion model backed by an OllamaEndpointPool ("ollama_pool" provider).
+    """
+
+    endpoints: List[str]
+    model: str = OLLAMA_MODEL
+    hedge: bool = OLLAMA_HEDGE_ENABLED
+
+    _pool: OllamaEndpointPool = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._pool = OllamaEndpointPool(self.endpoints, model=self.model, hedge=self.hedge)
+
+    @property
+    def pool(self) -> OllamaEndpointPool:
+        return self._pool
+
+    def _generate(self, prompts, stop=None, run_manager=None, **kwargs) -> LLMResult:
+        return LLMResult(generations=[[Generation(text=self._pool.call(p, stop=stop))] for p in prompts])
+
+    async def _agenerate(self, prompts, stop=None, run_manager=None, **kwargs) -> LLMResult:
+        texts = await asyncio.gather(*[self._pool.acall(p, stop=stop) for p in prompts])
+        return LLMResult(generations=[[Generation(text=text)] for text in texts])
+
+    @property
+    def _identifying_params(self) -> dict:
+        # Cache keys depend on the model, not on which host answered
+        return {"model": self.model}
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama_pool"
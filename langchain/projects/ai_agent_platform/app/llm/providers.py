@@ -0,0 +1,49 @@
+from typing import ClassVar
+
+from langchain_community.llms import Ollama
+from langchain_core.language_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+
+from app.llm.llm_provider import RateLimitedMixin, RateLimitedStreamMixin
+from app.llm.ollama_pool import OllamaPoolLLM
+from app.llm.simulated_llm import SimulatedLLM
+
+# Provider classes routed through the shared limiter. `llm_provider` imports this
+# module only when it creates the first client, so the SDKs load on first use.
+
+
+class PooledChatOpenAI(RateLimitedStreamMixin, ChatOpenAI):
+    limiter_name: ClassVar[str] = "openai"
+
+
+class PooledOllama(RateLimitedStreamMixin, Ollama):
+    limiter_name: ClassVar[str] = "ollama"
+
+
+class PooledOllamaEndpoints(RateLimitedMixin, OllamaPoolLLM):
+    limiter_name: ClassVar[str] = "ollama"
+
+
+class RateLimitedSimulatedLLM(RateLimitedStreamMixin, SimulatedLLM):
+    limiter_name: ClassVar[str] = "simulated"
+
+
+class DummyLLM(BaseChatModel):
+    """Dummy fallback LLM when no real provider is selected."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        from langchain_core.outputs import ChatResult, ChatGeneration
+        from langchain_core.messages import AIMessage
+
+        input_text = "\n".join([m.content for m in messages])
+        output_text = f"(DummyLLM) {input_text}"
+
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=output_text))])
+
+    @property
+    def _llm_type(self) -> str:
+        return "dummy_llm"
+
+    @property
+    def lc_serializable(self) -> bool:
+        return False
@@ -0,0 +1,251 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from app.configs.settings import (
+    LLM_MAX_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute` tokens per minute.
+
+    `reserve()` takes tokens immediately (the balance may go negative) and
+    returns how long the caller has to wait, so callers are served in arrival
+    order and nobody is rejected.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # A single request larger than the bucket still gets through, once it is full
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def try_take(self, amount: float = 1.0) -> bool:
+        """Takes tokens only if they are available now; never waits or goes negative."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if self._tokens < amount:
+                return False
+            self._tokens -= amount
+            return True
+
+
+class _Slots:
+    """
+    FIFO concurrency limit usable from threads and event loops at the same time.
+    A released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._waiters)
+
+    def acquire(self):
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.in_use < self.limit and not self._waiters:
+                self.in_use += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiting = (loop, future) in self._waiters
+                if waiting:
+                    self._waiters.remove((loop, future))
+            if not waiting and future.done() and not future.cancelled():
+                # The slot was handed over just before the cancellation landed
+                self.release()
+            # Otherwise `_hand_over` is still scheduled and passes the slot on
+            raise
+
+    def _hand_over(self, future):
+        if future.done():
+            # The waiter was cancelled after `release()` picked it
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.in_use -= 1
+                return
+            waiter = self._waiters.popleft()
+
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(self._hand_over, future)
+
+
+class ProviderLimiter:
+    """
+    Limits one provider client: max in-flight requests plus optional
+    requests-per-minute and tokens-per-minute token buckets.
+
+    Use `with limiter.limit(tokens):` or `async with limiter.alimit(tokens):`
+    around each provider call; excess callers wait in line.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.name = name
+        self._slots = _Slots(max_concurrency) if max_concurrency > 0 else None
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+        self._lock = threading.Lock()
+        self._rate_waiting = 0
+        self._stats = {"requests": 0, "queued_requests": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    def _rate_delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        return delay
+
+    def _record(self, waited: float):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            if waited > 0.001:
+                self._stats["queued_requests"] += 1
+
+    def _track_rate_wait(self, delta: int):
+        with self._lock:
+            self._rate_waiting += delta
+
+    @contextmanager
+    def limit(self, tokens: int):
+        started = time.monotonic()
+
+        delay = self._rate_delay(tokens)
+        if delay:
+            self._track_rate_wait(1)
+            try:
+                time.sleep(delay)
+            finally:
+                self._track_rate_wait(-1)
+
+        if self._slots is not None:
+            self._slots.acquire()
+        self._record(time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int):
+        started = time.monotonic()
+
+        delay = self._rate_delay(tokens)
+        if delay:
+            self._track_rate_wait(1)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self._track_rate_wait(-1)
+
+        if self._slots is not None:
+            await self._slots.aacquire()
+        self._record(time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._rate_waiting + (len(self._slots) if self._slots is not None else 0)
+
+        stats["in_flight"] = self._slots.in_use if self._slots is not None else None
+        stats["avg_wait_seconds"] = stats["total_wait_seconds"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_provider_limiter(name: str) -> ProviderLimiter:
+    """
+    Returns the process-wide limiter for a provider, created from settings on first use.
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = ProviderLimiter(
+                name,
+                max_concurrency=LLM_MAX_CONCURRENCY,
+                requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+                tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+            )
+        return _limiters[name]
+
+
+def limiter_stats() -> dict:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+def estimate_tokens(inputs) -> int:
+    """
+    Rough token estimate for TPM accounting: ~4 characters per token for the
+    prompt plus the expected completion length.
+    """
+    if isinstance(inputs, str):
+        inputs = [inputs]
+
+    # Completion models get prompt strings, chat models get message objects
+    chars = sum(len(str(getattr(item, "content", item))) for item in inputs)
+
+    return chars // 4 + LLM_EXPECTED_COMPLETION_TOKENS
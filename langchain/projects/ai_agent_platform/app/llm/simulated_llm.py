@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Iterator, List
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from app.configs.settings import (
+    SIMULATED_LLM_SEED,
+    SIMULATED_TTFT_SECONDS,
+    SIMULATED_TOKEN_SECONDS,
+    SIMULATED_ERROR_RATE,
+    SIMULATED_TIMEOUT_RATE,
+    SIMULATED_TIME_SCALE,
+)
+
+FILLER_WORDS = [
+    "the", "code", "function", "should", "use", "a", "loop", "value", "input", "return",
+    "consider", "improve", "variable", "performance", "readability", "validate", "cache",
+    "result", "list", "call", "instead", "of", "and", "to", "for", "with", "this",
+]
+
+WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]{2,}")
+
+
+class SimulatedLLMError(RuntimeError):
+    """Injected provider failure."""
+
+
+class SimulatedLLM(BaseChatModel):
+    """
+    Offline chat model with realistic timing, for load tests and capacity planning.
+
+    - time to first token: log-normal around `ttft_seconds`
+    - per-token latency: log-normal around `token_seconds`
+    - output length grows with prompt length (`output_ratio`), clamped
+    - token-by-token streaming, sync and async
+    - injected errors (`error_rate`) and timeouts (`timeout_rate`)
+
+    Text and timing come from an RNG seeded with `seed` and the prompt, so the
+    same seed and prompt always give the same response, independent of call
+    order or concurrency. The failure draw also takes the prompt's call count on
+    this instance, so a retry of a failed prompt gets a fresh draw, while the
+    n-th call of a prompt fails the same way on every run. Call counts are kept
+    for the `max_tracked_prompts` most recently used prompts only. `time_scale`
+    multiplies all delays (0 disables sleeping). Disable the LLM cache when
+    load testing.
+    """
+
+    seed: int = SIMULATED_LLM_SEED
+    ttft_seconds: float = SIMULATED_TTFT_SECONDS
+    ttft_sigma: float = 0.5
+    token_seconds: float = SIMULATED_TOKEN_SECONDS
+    token_sigma: float = 0.3
+    output_ratio: float = 0.5
+    min_output_tokens: int = 16
+    max_output_tokens: int = 768
+    error_rate: float = SIMULATED_ERROR_RATE
+    timeout_rate: float = SIMULATED_TIMEOUT_RATE
+    timeout_seconds: float = 30.0
+    time_scale: float = SIMULATED_TIME_SCALE
+    max_tracked_prompts: int = 4096
+
+    _attempts: OrderedDict = PrivateAttr(default_factory=OrderedDict)  # prompt digest -> calls so far, LRU order
+    _attempts_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def _attempt(self, digest: bytes) -> int:
+        with self._attempts_lock:
+            attempt = self._attempts.pop(digest, 0) + 1
+            self._attempts[digest] = attempt
+            if len(self._attempts) > self.max_tracked_prompts:
+                self._attempts.popitem(last=False)
+        return attempt
+
+    def _plan(self, messages: List[BaseMessage]) -> dict:
+        prompt = "\n".join(str(m.content) for m in messages)
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        failure_rng = random.Random(f"{self.seed}:{digest.hex()}:{self._attempt(digest)}")
+
+        prompt_tokens = max(len(prompt) // 4, 1)
+        mean_length = min(max(prompt_tokens * self.output_ratio, self.min_output_tokens), self.max_output_tokens)
+        length = int(min(max(rng.gauss(mean_length, mean_length * 0.15), self.min_output_tokens), self.max_output_tokens))
+
+        # Echo identifiers from the prompt so downstream steps see plausible text
+        prompt_words = WORD_PATTERN.findall(prompt)[-200:] or FILLER_WORDS
+        tokens = [
+            rng.choice(prompt_words) if rng.random() < 0.3 else rng.choice(FILLER_WORDS)
+            for _ in range(length)
+        ]
+
+        roll = failure_rng.random()
+        failure = "timeout" if roll < self.timeout_rate else (
+            "error" if roll < self.timeout_rate + self.error_rate else None
+        )
+
+        return {
+            "ttft": rng.lognormvariate(math.log(self.ttft_seconds), self.ttft_sigma) if self.ttft_seconds > 0 else 0.0,
+            "token_delays": [
+                rng.lognormvariate(math.log(self.token_seconds), self.token_sigma) if self.token_seconds > 0 else 0.0
+                for _ in tokens
+            ],
+            "tokens": ["### Simulated response\n\n"] + [f"{token} " for token in tokens],
+            "failure": failure,
+        }
+
+    def _first_token_delay(self, plan: dict) -> float:
+        return self.timeout_seconds if plan["failure"] == "timeout" else plan["ttft"]
+
+    @staticmethod
+    def _raise_injected_failure(plan: dict):
+        if plan["failure"] == "timeout":
+            raise TimeoutError("Simulated LLM request timed out.")
+        if plan["failure"] == "error":
+            raise SimulatedLLMError("Simulated LLM provider error.")
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        plan = self._plan(messages)
+        delays = [self._first_token_delay(plan)] + plan["token_delays"]
+
+        for index, (token, delay) in enumerate(zip(plan["tokens"], delays)):
+            time.sleep(delay * self.time_scale)
+            if index == 0:
+                self._raise_injected_failure(plan)
+
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        plan = self._plan(messages)
+        delays = [self._first_token_delay(plan)] + plan["token_delays"]
+
+        for index, (token, delay) in enumerate(zip(plan["tokens"], delays)):
+            await asyncio.sleep(delay * self.time_scale)
+            if index == 0:
+                self._raise_injected_failure(plan)
+
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        text = "".join(chunk.message.content for chunk in self._stream(messages, stop=stop))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        parts = [chunk.message.content async for chunk in self._astream(messages, stop=stop)]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="".join(parts)))])
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"seed": self.seed, "output_ratio": self.output_ratio}
+
+    @property
+    def _llm_type(self) -> str:
+        return "simulated_llm"
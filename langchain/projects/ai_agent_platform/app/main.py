@@ -1,4 +1,4 @@
-from app.tools.code_reviewer_tool import code_review_tool
+from app.tools.code_reviewer_tool import code_reviewer
 
 if __name__ == "__main__":
     sample_code = """
@@ -11,5 +11,5 @@ def process_user_input(input):
         print("Access denied.")
 """
 
-    result = code_review_tool.invoke(sample_code)
+    result = code_reviewer.invoke(sample_code)
     print(result)
\ No newline at end of file
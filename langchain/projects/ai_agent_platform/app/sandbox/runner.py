@@ -0,0 +1,116 @@
+"""
+Runs generated unit tests inside a sandbox subprocess:
+
+    python -I runner.py <workdir> <cpu seconds> <memory MB> <max processes>
+
+<workdir> holds `solution.py` (the code under test) and `test_generated.py`.
+The limits are applied before either file is imported (POSIX only; elsewhere
+just the parent's wall-clock timeout applies). <max processes> is the
+RLIMIT_NPROC of the sandbox uid (0 = not set). Isolation from the host
+(namespaces, uid) is set up by the parent.
+Only the standard library is used, since the interpreter starts isolated from
+the application's environment. The counts are printed as one JSON line
+prefixed with RESULT_MARKER; everything else on stdout/stderr is test output.
+"""
+import ast
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import traceback
+import unittest
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+RESULT_MARKER = "__SANDBOX_RESULT__ "
+
+
+def _missing_modules(test_source: str) -> set:
+    """
+    Top-level modules the tests import that do not exist here. Generated tests
+    usually import the code under a made-up name (`from my_module import add`),
+    so those names are pointed at the solution module instead.
+    """
+    names = set()
+    for node in ast.walk(ast.parse(test_source)):
+        if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+        elif isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+
+    missing = set()
+    for name in names:
+        try:
+            found = importlib.util.find_spec(name.split(".")[0]) is not None
+        except (ImportError, ValueError):
+            found = False
+        if not found:
+            missing.add(name)
+    return missing
+
+
+def _limit_resources(cpu_seconds: int, memory_mb: int, max_processes: int):
+    if resource is None:
+        return
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    if memory_mb > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb * 1024 * 1024,) * 2)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (16 * 1024 * 1024,) * 2)
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if max_processes > 0:
+        # Counts every process of the uid, so fork bombs fail fast
+        resource.setrlimit(resource.RLIMIT_NPROC, (max_processes, max_processes))
+
+
+def _report(**result):
+    sys.stdout.write("\n" + RESULT_MARKER + json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+
+def main(workdir: str, cpu_seconds: int, memory_mb: int, max_processes: int = 0):
+    _limit_resources(cpu_seconds, memory_mb, max_processes)
+    os.chdir(workdir)
+    sys.path.insert(0, workdir)
+
+    try:
+        solution = importlib.import_module("solution")
+        with open("test_generated.py", encoding="utf-8") as handle:
+            test_source = handle.read()
+
+        for name in _missing_modules(test_source):
+            parts = name.split(".")
+            for depth in range(1, len(parts) + 1):
+                sys.modules.setdefault(".".join(parts[:depth]), solution)
+
+        tests = importlib.import_module("test_generated")
+    except BaseException:
+        _report(error="The code under test or the tests could not be imported:\n" + traceback.format_exc(limit=5))
+        return
+
+    # Tests often call the functions under test without importing them
+    for name, value in vars(solution).items():
+        if not name.startswith("__"):
+            vars(tests).setdefault(name, value)
+
+    stream = io.StringIO()
+    result = unittest.TextTestRunner(stream=stream, verbosity=2).run(
+        unittest.defaultTestLoader.loadTestsFromModule(tests)
+    )
+
+    _report(
+        tests_run=result.testsRun,
+        failures=len(result.failures) + len(result.unexpectedSuccesses),
+        errors=len(result.errors),
+        skipped=len(result.skipped) + len(result.expectedFailures),
+        output=stream.getvalue(),
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]) if len(sys.argv) > 4 else 0)
@@ -0,0 +1,312 @@
+import asyncio
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from app.chains.handoff import extract_code_blocks
+from app.chains.static_analysis import python_source
+from app.configs.settings import (
+    TEST_VALIDATION_CPU_SECONDS,
+    TEST_VALIDATION_ISOLATION,
+    TEST_VALIDATION_MAX_PROCESSES,
+    TEST_VALIDATION_MEMORY_MB,
+    TEST_VALIDATION_PYTHON,
+    TEST_VALIDATION_TIMEOUT_SECONDS,
+    TEST_VALIDATION_UID,
+    TEST_VALIDATION_WORKERS,
+)
+from app.sandbox.runner import RESULT_MARKER
+from app.utils.lazy import Lazy
+from app.utils.logger import logger
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runner.py")
+
+VALIDATION_STEP = "Test Validation"
+
+TEST_CODE_RE = re.compile(r"(unittest|def test_|class Test)")
+
+MAX_OUTPUT_CHARS = 4000
+
+NOBODY_UID = 65534
+
+# Own user, PID (with a private /proc), mount and network namespaces; the test
+# process is PID 1 there, and everything in the namespace dies with it
+NAMESPACE_COMMAND = ["unshare", "--user", "--map-root-user", "--net", "--pid", "--fork", "--mount-proc", "--kill-child"]
+
+# Interpreters tried when TEST_VALIDATION_PYTHON is not set; the runner only
+# needs the standard library, so any python3 the sandbox uid can execute works
+PYTHON_CANDIDATES = [sys.executable, "/usr/bin/python3", "/usr/local/bin/python3"]
+
+
+@dataclass
+class ValidationResult:
+    """
+    Outcome of running generated tests against the input code. `status` is one
+    of "passed", "failed", "error" (tests did not import or crashed),
+    "timeout", "no_tests" or "skipped" (nothing runnable to validate).
+    """
+    status: str
+    tests_run: int = 0
+    passed: int = 0
+    failures: int = 0
+    errors: int = 0
+    skipped: int = 0
+    duration: float = 0.0
+    detail: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_markdown(self) -> str:
+        lines = [
+            f"- Status: **{self.status}**",
+            f"- Tests run: {self.tests_run} (passed {self.passed}, failed {self.failures}, "
+            f"errors {self.errors}, skipped {self.skipped})",
+            f"- Duration: {self.duration:.2f}s",
+        ]
+        if self.detail:
+            lines.append(f"\n```text\n{self.detail.strip()}\n```")
+        return "\n".join(lines)
+
+
+def extract_test_code(markdown: str) -> str | None:
+    """
+    The generated test class: the last code block that looks like tests,
+    or the whole text when the model answered without code fences.
+    """
+    for block in reversed(extract_code_blocks(markdown)):
+        if TEST_CODE_RE.search(block):
+            return block
+
+    source, tree = python_source(markdown)
+    if tree is not None and TEST_CODE_RE.search(source):
+        return source
+    return None
+
+
+def _tail(text: str) -> str:
+    return text if len(text) <= MAX_OUTPUT_CHARS else "...\n" + text[-MAX_OUTPUT_CHARS:]
+
+
+def _crash_reason(returncode: int) -> str:
+    if returncode == -getattr(signal, "SIGXCPU", 0):
+        return f"Test process exceeded the CPU limit ({TEST_VALIDATION_CPU_SECONDS:g}s)."
+    if returncode < 0:
+        return f"Test process was killed by {signal.Signals(-returncode).name}."
+    return f"Test process exited with code {returncode} before reporting results."
+
+
+def _parse(returncode: int, stdout: str, stderr: str, duration: float) -> ValidationResult:
+    marker = stdout.rfind(RESULT_MARKER)
+    if marker < 0:
+        # The process died before reporting: resource limit, sys.exit, segfault, ...
+        detail = "\n".join(part for part in (_crash_reason(returncode), stderr.strip()) if part)
+        return ValidationResult("error", duration=duration, detail=_tail(detail))
+
+    report = json.loads(stdout[marker + len(RESULT_MARKER):].splitlines()[0])
+    if "error" in report:
+        return ValidationResult("error", duration=duration, detail=_tail(report["error"]))
+
+    run, failures, errors, skipped = report["tests_run"], report["failures"], report["errors"], report["skipped"]
+    status = "no_tests" if run == 0 else "failed" if failures or errors else "passed"
+    return ValidationResult(
+        status,
+        tests_run=run,
+        passed=max(0, run - failures - errors - skipped),
+        failures=failures,
+        errors=errors,
+        skipped=skipped,
+        duration=duration,
+        detail="" if status == "passed" else _tail(report["output"]),
+    )
+
+
+# --- isolation -------------------------------------------------------------
+
+def sandbox_uid() -> int | None:
+    """The uid the tests run as, or None to keep the API's own uid."""
+    if TEST_VALIDATION_UID == "none" or not hasattr(os, "geteuid"):
+        return None
+    if TEST_VALIDATION_UID == "auto":
+        return NOBODY_UID if os.geteuid() == 0 else None
+    return int(TEST_VALIDATION_UID)
+
+
+def _isolation_prefix() -> list:
+    return list(NAMESPACE_COMMAND) if TEST_VALIDATION_ISOLATION == "namespace" else []
+
+
+def _user_options(uid: int | None) -> dict:
+    return {"user": uid, "group": uid, "extra_groups": []} if uid is not None else {}
+
+
+def _works(python: str, uid: int | None) -> bool:
+    try:
+        probe = subprocess.run(
+            _isolation_prefix() + [python, "-I", "-c", "pass"],
+            env={"PATH": os.environ.get("PATH", "")},
+            cwd="/",
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=30,
+            **_user_options(uid),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return probe.returncode == 0
+
+
+def _find_python() -> str | None:
+    if TEST_VALIDATION_ISOLATION not in ("namespace", "none"):
+        logger.error(f"Unknown TEST_VALIDATION_ISOLATION: {TEST_VALIDATION_ISOLATION}")
+        return None
+    if TEST_VALIDATION_ISOLATION == "none":
+        logger.warning("Generated tests run without isolation (TEST_VALIDATION_ISOLATION=none): trusted input only.")
+
+    uid = sandbox_uid()
+    candidates = [TEST_VALIDATION_PYTHON] if TEST_VALIDATION_PYTHON else PYTHON_CANDIDATES
+    for python in dict.fromkeys(candidates):
+        if os.path.exists(python) and _works(python, uid):
+            return python
+
+    logger.error(
+        f"No sandbox available: none of {candidates} runs with isolation '{TEST_VALIDATION_ISOLATION}' "
+        f"as uid {uid if uid is not None else os.getuid()}."
+    )
+    return None
+
+
+# Interpreter that starts inside the configured isolation; probed once per process
+sandbox_python = Lazy(_find_python)
+
+
+def _process_limit(uid: int | None) -> int:
+    """
+    RLIMIT_NPROC for the sandbox: the uid's running processes plus
+    TEST_VALIDATION_MAX_PROCESSES. 0 (not set) for root, which the kernel exempts.
+    """
+    uid = os.getuid() if uid is None else uid
+    if uid == 0 or TEST_VALIDATION_MAX_PROCESSES <= 0 or not os.path.isdir("/proc"):
+        return 0
+
+    running = 0
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status", encoding="utf-8") as handle:
+                uids = next(line for line in handle if line.startswith("Uid:")).split()
+        except (OSError, StopIteration):
+            continue
+        running += uids[1] == str(uid)
+    return running + TEST_VALIDATION_MAX_PROCESSES
+
+
+def _kill_group(process: subprocess.Popen):
+    # Anything the tests started in the background goes too
+    if not hasattr(os, "killpg"):
+        process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def run_sandboxed(source: str, test_code: str) -> ValidationResult:
+    """
+    Runs `test_code` against `source` in a fresh interpreter (`python -I`, empty
+    environment, temporary working directory, own process group) under CPU,
+    memory, process-count and wall-clock limits. With the default "namespace"
+    isolation it has no network and cannot see the API's processes; as root
+    the tests also run as an unprivileged uid. "skipped" when that isolation
+    is not available on this host.
+    """
+    python = sandbox_python()
+    if python is None:
+        return ValidationResult("skipped", detail="No isolated sandbox is available on this host.")
+
+    uid = sandbox_uid()
+    started = time.monotonic()
+
+    with tempfile.TemporaryDirectory(prefix="unit_test_sandbox_") as workdir:
+        # The runner is copied in, so the sandbox uid needs no access to the application
+        shutil.copy(RUNNER_PATH, os.path.join(workdir, "_sandbox_runner.py"))
+        for name, content in (("solution.py", source), ("test_generated.py", test_code)):
+            with open(os.path.join(workdir, name), "w", encoding="utf-8") as handle:
+                handle.write(content)
+        if uid is not None:
+            for name in [".", *os.listdir(workdir)]:
+                os.chown(os.path.join(workdir, name), uid, uid)
+
+        process = subprocess.Popen(
+            _isolation_prefix() + [
+                python, "-I", "-B", "_sandbox_runner.py", workdir,
+                str(max(1, int(TEST_VALIDATION_CPU_SECONDS))), str(TEST_VALIDATION_MEMORY_MB), str(_process_limit(uid)),
+            ],
+            cwd=workdir,
+            env={"PATH": os.environ.get("PATH", ""), "HOME": workdir, "TMPDIR": workdir},
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+            **_user_options(uid),
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=TEST_VALIDATION_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            _kill_group(process)
+            process.communicate()
+            return ValidationResult(
+                "timeout",
+                duration=time.monotonic() - started,
+                detail=f"Tests did not finish within {TEST_VALIDATION_TIMEOUT_SECONDS:g}s.",
+            )
+        finally:
+            _kill_group(process)
+
+    return _parse(process.returncode, stdout, stderr, time.monotonic() - started)
+
+
+def _validate(code: str, generated_markdown: str) -> ValidationResult:
+    source, tree = python_source(code)
+    if tree is None:
+        return ValidationResult("skipped", detail="The input is not Python source.")
+
+    test_code = extract_test_code(generated_markdown)
+    if test_code is None:
+        return ValidationResult("no_tests", detail="No test code found in the generated output.")
+
+    result = run_sandboxed(source, test_code)
+    logger.info(f"Generated tests validated: {result.status} ({result.passed}/{result.tests_run} passed)")
+    return result
+
+
+# Bounds how many sandboxes run at once across the process; each worker thread
+# only waits on its subprocess, so the event loop is never blocked.
+validation_pool = Lazy(lambda: ThreadPoolExecutor(max_workers=TEST_VALIDATION_WORKERS, thread_name_prefix="test-sandbox"))
+
+
+def validate_generated_tests(code: str, generated_markdown: str) -> ValidationResult:
+    """
+    Pulls the final test class out of the generator's markdown and runs it
+    against the input code in a sandbox from the shared pool.
+    """
+    return validation_pool().submit(_validate, code, generated_markdown).result()
+
+
+async def avalidate_generated_tests(code: str, generated_markdown: str) -> ValidationResult:
+    """
+    Async variant of `validate_generated_tests`.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(validation_pool(), _validate, code, generated_markdown)
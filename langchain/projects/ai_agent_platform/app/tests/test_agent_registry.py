@@ -0,0 +1,17 @@
+from fastapi.testclient import TestClient
+
+from app.agents.agent_factory import get_selected_agent
+from app.api.app import app
+
+
+def test_agent_is_built_once_and_reused():
+    assert get_selected_agent() is get_selected_agent()
+
+
+def test_health_reports_ready_after_startup():
+    with TestClient(app) as client:
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
+    assert "langgraph" in response.json()["agents"]
@@ -0,0 +1,64 @@
+import asyncio
+import time
+import uuid
+
+from app.llm.providers import DummyLLM
+from app.tools.code_reviewer_tool import code_reviewer
+from app.agents.langgraph_code_assistant import code_assistant_agent
+
+
+def test_code_reviewer_tool_ainvoke():
+    result = asyncio.run(code_reviewer.ainvoke("def foo():\n    pass"))
+
+    assert "FINAL REVIEWED CODE" in result
+    assert "foo" in result
+
+
+class SleepingLLM:
+    """Patched over DummyLLM._agenerate: every async LLM call sleeps, and overlapping calls are counted."""
+
+    delay = 0.1
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+
+    def patch(self, monkeypatch):
+        tracker = self
+
+        async def agenerate(llm, messages, stop=None, run_manager=None, **kwargs):
+            tracker.calls += 1
+            tracker.active += 1
+            tracker.max_active = max(tracker.max_active, tracker.active)
+            try:
+                await asyncio.sleep(tracker.delay)
+            finally:
+                tracker.active -= 1
+            return llm._generate(messages, stop=stop)
+
+        monkeypatch.setattr(DummyLLM, "_agenerate", agenerate)
+        return self
+
+
+def test_agent_ainvoke_runs_concurrently(monkeypatch):
+    llm = SleepingLLM().patch(monkeypatch)
+    run = uuid.uuid4().hex  # unique prompts: no LLM cache or checkpoint hits
+
+    async def run_many():
+        return await asyncio.gather(*[
+            code_assistant_agent.ainvoke({"input": f"def foo_{i}_{run}(): pass"})
+            for i in range(5)
+        ])
+
+    started = time.perf_counter()
+    results = asyncio.run(run_many())
+    elapsed = time.perf_counter() - started
+
+    assert len(results) == 5
+    for i, result in enumerate(results):
+        assert f"foo_{i}_{run}" in result["output"]
+
+    # The five runs overlap their LLM calls instead of queueing behind each other
+    assert llm.max_active == 5
+    assert elapsed < llm.calls * llm.delay / 2
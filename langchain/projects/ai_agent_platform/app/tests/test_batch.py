@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.tools import batch
+from app.tools.batch import arun_tool_batch
+
+
+def test_batch_dedupes_and_keeps_input_order():
+    inputs = ["def a(): pass", "def b(): pass", "def a(): pass"]
+    results = asyncio.run(arun_tool_batch(inputs, tool_name="code_reviewer", max_concurrency=2))
+
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert all(result["status"] == "ok" for result in results)
+    assert "def b()" in results[1]["output"]
+    assert results[0]["output"] == results[2]["output"]
+
+
+def test_batch_reports_item_failures_individually(monkeypatch):
+    async def no_route(code):
+        return None if "bad" in code else "code_reviewer"
+
+    monkeypatch.setattr(batch, "_route", no_route)
+    results = asyncio.run(arun_tool_batch(["def ok(): pass", "bad input"]))
+
+    assert results[0]["status"] == "ok"
+    assert results[1]["status"] == "error"
+    assert "No valid tool" in results[1]["error"]
+
+
+def test_batch_rejects_unknown_tool():
+    with pytest.raises(ValueError):
+        asyncio.run(arun_tool_batch(["x"], tool_name="missing"))
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.benchmarks.run_benchmarks import bench_pipelines, find_regressions, percentiles
+
+
+def test_percentiles():
+    stats = percentiles([float(i) for i in range(1, 101)])
+
+    assert stats["count"] == 100
+    assert stats["p50"] == 51.0
+    assert stats["p99"] == 100.0
+
+
+def test_find_regressions_flags_slower_latency_and_lower_throughput():
+    baseline = {"api": {"8": {"requests_per_second": 100.0, "latency_seconds": {"p95": 1.0, "count": 10}}}}
+    current = {"api": {"8": {"requests_per_second": 80.0, "latency_seconds": {"p95": 1.05, "count": 50}}}}
+
+    regressions = find_regressions(baseline, current, threshold=0.10)
+
+    assert [r["metric"] for r in regressions] == ["api.8.requests_per_second"]
+
+
+def test_pipeline_benchmark_reports_every_step():
+    results = asyncio.run(bench_pipelines(iterations=1))
+
+    assert set(results) == {"code_review", "performance_optimization", "unit_test_generation"}
+    assert len(results["performance_optimization"]["steps_seconds"]) == 6
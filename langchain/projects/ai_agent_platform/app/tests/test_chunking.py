@@ -0,0 +1,56 @@
+import asyncio
+
+from app.chains import chunking
+from app.chains.chunking import split_code
+from app.tools.performance_optimizer_tool import performance_optimizer
+from app.utils.token_counter import count_tokens
+
+BIG_MODULE = "import os\n\n\n" + "\n\n\n".join(
+    f"def function_{i}(values):\n    total = 0\n    for value in values:\n        total += value * {i}\n    return total"
+    for i in range(12)
+)
+
+
+def test_split_code_follows_function_boundaries_within_budget():
+    chunks = split_code(BIG_MODULE, budget=60, overlap_lines=0)
+
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk.code) <= 60 for chunk in chunks)
+    assert all(chunk.code.lstrip().startswith(("import", "def")) for chunk in chunks)
+    assert "\n".join(chunk.code for chunk in chunks).count("def function_") == 12
+
+
+def test_split_code_adds_overlap_and_handles_unparseable_input():
+    chunks = split_code(BIG_MODULE, budget=60, overlap_lines=2)
+    assert chunks[1].code.splitlines()[:2] == BIG_MODULE.splitlines()[chunks[1].start - 3:chunks[1].start - 1]
+
+    broken = "def broken(:\n" + "x = 1\n" * 200
+    assert len(split_code(broken, budget=50, overlap_lines=0)) > 1
+
+
+def test_large_input_is_map_reduced_into_one_report(monkeypatch):
+    monkeypatch.setattr(chunking, "input_token_budget", lambda: 60)
+
+    sync_result = performance_optimizer.invoke(BIG_MODULE)
+    async_result = asyncio.run(performance_optimizer.ainvoke(BIG_MODULE))
+
+    for result in (sync_result, async_result):
+        assert "[Part 1/" in result
+        assert "merging partial performance optimization reports" in result
+
+
+def test_large_input_is_chunked_when_streamed(monkeypatch):
+    from app.tools.performance_optimizer_tool import astream_performance_optimizer
+
+    monkeypatch.setattr(chunking, "input_token_budget", lambda: 60)
+
+    async def collect():
+        return [event async for event in astream_performance_optimizer(BIG_MODULE)]
+
+    events = asyncio.run(collect())
+    step_ends = [event["step"] for event in events if event["event"] == "step_end"]
+
+    assert len(split_code(BIG_MODULE, 60)) > 1
+    assert all(step.startswith("[Part ") for step in step_ends[:-1])
+    assert step_ends[-1].startswith("Merge ")
+    assert "merging partial performance optimization reports" in events[-1]["output"]
@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.app import app
+from app.chains import code_generation_chain
+from app.chains.code_generation_chain import (
+    KNOWN_LANGUAGES,
+    detect_languages,
+    normalize_languages,
+    run_multi_language_generation,
+)
+from app.tools.code_generator_tool import astream_code_generator
+from app.utils.lazy import Lazy
+
+
+class FakeChain:
+    def __init__(self, name: str, calls: list):
+        self.name = name
+        self.calls = calls
+
+    def _answer(self, inputs: dict) -> str:
+        self.calls.append((self.name, inputs.get("language")))
+        return f"{self.name}:{inputs.get('language', '')}"
+
+    def invoke(self, inputs: dict) -> str:
+        return self._answer(inputs)
+
+    async def ainvoke(self, inputs: dict) -> str:
+        return self._answer(inputs)
+
+
+def _fake_chains(monkeypatch) -> list:
+    calls = []
+    chains = {name: FakeChain(name, calls) for name in ("single", "analysis", "language")}
+    monkeypatch.setattr(code_generation_chain, "code_generation_chains", Lazy(lambda: chains))
+    return calls
+
+
+def _requirement() -> str:
+    # A fresh requirement per test, so results cached by other tests never match
+    return f"Write a function that validates an email address ({uuid.uuid4()})"
+
+
+def test_requirement_is_analysed_once_and_cached_per_language(monkeypatch):
+    calls = _fake_chains(monkeypatch)
+    requirement = _requirement()
+
+    result = run_multi_language_generation(requirement, ["Python", "go", "python"])
+
+    assert [item["language"] for item in result["results"]] == ["python", "go"]
+    assert result["analysis"] == "analysis:"
+    assert sorted(calls) == [("analysis", None), ("language", "go"), ("language", "python")]
+
+    calls.clear()
+    again = run_multi_language_generation(requirement, ["go", "rust"])
+
+    assert [(item["language"], item["cached"]) for item in again["results"]] == [("go", True), ("rust", False)]
+    assert calls == [("language", "rust")]  # the analysis comes from the cache too
+
+
+def test_languages_are_detected_from_the_requirement():
+    assert detect_languages("Port this to TypeScript and Go; go through every field") == ["typescript", "go"]
+    assert detect_languages("A JavaScript helper, then the Java version") == ["javascript", "java"]
+    assert detect_languages("a C# and C++ port") == ["csharp", "cpp"]
+
+
+def test_requested_languages_are_canonicalised_and_bounded():
+    assert normalize_languages(["Python", "Golang", "C#", "node.js", "python"]) == ["python", "go", "csharp", "javascript"]
+
+    with pytest.raises(ValueError, match="Unknown languages: brainfuck"):
+        normalize_languages(["python", "brainfuck"])
+    with pytest.raises(ValueError, match="At most"):
+        normalize_languages(list(KNOWN_LANGUAGES))
+
+
+def test_stream_emits_analysis_then_one_step_per_language(monkeypatch):
+    _fake_chains(monkeypatch)
+
+    async def collect():
+        return [e async for e in astream_code_generator(_requirement(), languages=["java", "kotlin"])]
+
+    events = asyncio.run(collect())
+    ends = [e["step"] for e in events if e["event"] == "step_end"]
+
+    assert ends[0] == "Requirement Analysis"
+    assert sorted(ends[1:]) == ["java", "kotlin"]
+    assert events[-1]["event"] == "tool_end"
+    assert "### java\n\nlanguage:java" in events[-1]["output"]
+
+
+def test_generate_endpoint(monkeypatch):
+    _fake_chains(monkeypatch)
+    client = TestClient(app)
+
+    response = client.post("/generate", json={"requirement": _requirement(), "languages": ["python", "typescript"]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["requirement_hash"]) == 64
+    assert body["results"] == [
+        {"language": "python", "code": "language:python", "cached": False},
+        {"language": "typescript", "code": "language:typescript", "cached": False},
+    ]
+
+
+def test_generate_endpoint_rejects_unknown_and_too_many_languages():
+    client = TestClient(app)
+
+    unknown = client.post("/generate", json={"requirement": _requirement(), "languages": ["python", "cobol"]})
+    assert unknown.status_code == 400 and "cobol" in unknown.json()["detail"]
+
+    too_many = client.post("/generate", json={"requirement": _requirement(), "languages": ["python"] * 100})
+    assert too_many.status_code == 422
+
+
+def test_generation_cache_is_independent_of_the_llm_cache(monkeypatch):
+    from app.chains.generation_cache import get_generation_cache
+
+    calls = _fake_chains(monkeypatch)
+    requirement = _requirement()
+    monkeypatch.setattr(code_generation_chain, "CODE_GENERATION_CACHE_ENABLED", False)
+    run_multi_language_generation(requirement, ["python"])
+    run_multi_language_generation(requirement, ["python"])
+    assert calls.count(("language", "python")) == 2
+
+    monkeypatch.setattr(code_generation_chain, "CODE_GENERATION_CACHE_ENABLED", True)
+    run_multi_language_generation(requirement, ["python"])
+    again = run_multi_language_generation(requirement, ["python"])
+    assert again["results"][0]["cached"] and calls.count(("language", "python")) == 3
+
+    namespace, req_hash = code_generation_chain._cache_namespace(), code_generation_chain.requirement_hash(requirement)
+    assert get_generation_cache().get(namespace, req_hash, "python") == "language:python"
+
+
+def test_multi_language_chains_skip_the_prompt_cache():
+    chains = code_generation_chain._build_chains()
+
+    assert chains["language"].last.cache is False and chains["analysis"].last.cache is False
+    assert chains["single"].last.cache is not False
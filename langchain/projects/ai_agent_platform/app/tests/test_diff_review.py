@@ -0,0 +1,96 @@
+import asyncio
+import difflib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.app import app
+from app.chains.diff_review import apply_diff, find_touched_segments, parse_unified_diff
+from app.tools import code_reviewer_tool
+from app.tools.code_reviewer_tool import code_reviewer
+
+ORIGINAL = """import os
+
+LIMIT = 10
+
+
+class Store:
+    def __init__(self):
+        self.items = []
+
+    def add(self, item):
+        self.items.append(item)
+
+
+def helper(x):
+    return x * 2
+
+
+def untouched(y):
+    return y
+"""
+
+CHANGED = (
+    ORIGINAL
+    .replace("LIMIT = 10", "LIMIT = 20")
+    .replace("        self.items.append(item)", "        if item is None:\n            raise ValueError(item)\n        self.items.append(item)")
+    .replace("return x * 2", "return x * 3")
+)
+
+
+def _diff(context=3):
+    return "".join(difflib.unified_diff(
+        ORIGINAL.splitlines(True), CHANGED.splitlines(True), "a/store.py", "b/store.py", n=context
+    ))
+
+
+@pytest.mark.parametrize("context", [0, 3])
+def test_diff_applies_and_maps_to_touched_definitions(context):
+    new_code, changed = apply_diff(ORIGINAL, parse_unified_diff(_diff(context)))
+    assert new_code == CHANGED.rstrip("\n")
+
+    segments = find_touched_segments(new_code, changed)
+    assert [s.name for s in segments] == ["module level", "add", "helper"]
+    assert segments[1].context == "class Store:"
+    assert "untouched" not in "".join(s.code for s in segments)
+
+
+def test_diff_that_does_not_apply_is_rejected():
+    with pytest.raises(ValueError):
+        apply_diff(ORIGINAL.replace("LIMIT = 10", "LIMIT = 99"), parse_unified_diff(_diff()))
+
+
+def test_code_reviewer_reviews_only_changed_regions():
+    result = code_reviewer.invoke({"code": ORIGINAL, "diff": _diff()})
+
+    assert "add (lines 10-13)" in result
+    assert "helper (lines 16-17)" in result
+    assert "def untouched" not in result
+
+
+def test_async_code_reviewer_reviews_only_changed_regions():
+    result = asyncio.run(code_reviewer.ainvoke({"code": ORIGINAL, "diff": _diff()}))
+
+    assert "add (lines 10-13)" in result
+    assert "helper (lines 16-17)" in result
+    assert "def untouched" not in result
+
+
+def test_diff_review_logs_the_diff(monkeypatch):
+    logged = []
+    monkeypatch.setattr(code_reviewer_tool, "save_tool_output", lambda *args: logged.append(args))
+
+    code_reviewer.invoke({"code": ORIGINAL, "diff": _diff()})
+
+    assert logged[0][1] == f"{ORIGINAL}\n\n--- DIFF ---\n{_diff()}"
+
+
+def test_agent_endpoint_reviews_a_diff():
+    client = TestClient(app)
+
+    response = client.post("/agent", json={"input": ORIGINAL, "diff": _diff()})
+    assert response.status_code == 200
+    assert "helper (lines 16-17)" in response.json()["result"]
+    assert "def untouched" not in response.json()["result"]
+
+    assert client.post("/agent/stream", json={"input": ORIGINAL, "diff": _diff()}).status_code == 400
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from langchain_core.prompts import PromptTemplate
+
+from app.chains.checkpoint_store import get_checkpoint_store
+from app.chains.code_review_chain import (
+    run_code_review_pipeline,
+    arun_code_review_pipeline,
+    astream_code_review_pipeline,
+)
+from app.chains.fan_out import fan_in, run_fan_out, arun_fan_out
+from app.chains.handoff import Handoff
+from app.chains.performance_optimization_chain import arun_performance_optimization_pipeline
+from app.chains.pipeline_engine import Pipeline, PipelineStepError, StepPolicy
+from app.utils.lazy import Lazy
+
+STEPS = [("Check A", "A:\n{code}"), ("Check B", "B:\n{code}"), ("Merge", "Merge:\n{code}")]
+
+
+class FlakyChain:
+    """Stands in for an LLMChain; fails its first `failures` calls."""
+
+    def __init__(self, name, failures=0):
+        self.name = name
+        self.failures = failures
+        self.calls = 0
+        self.prompt = PromptTemplate(input_variables=["code"], template=f"{name}:\n{{code}}")
+
+    def invoke(self, inputs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"{self.name} unavailable")
+        return {"code": f"- {self.name} done"}
+
+    async def ainvoke(self, inputs):
+        return self.invoke(inputs)
+
+
+def _pipeline(chains):
+    policy = StepPolicy(timeout=5, retries=1, backoff=0)
+    pipeline = Pipeline("fan_out_test", STEPS, "output", "steps", "test", policies={name: policy for name, _ in STEPS})
+    pipeline._chains = Lazy(lambda: [(name, chain) for (name, _), chain in zip(STEPS, chains)])
+    return pipeline
+
+
+def test_parallel_checks_all_see_the_original_code():
+    code = "def foo():\n    pass"
+    result = run_code_review_pipeline(code, mode="parallel")
+
+    steps = result["review_steps"]
+    assert [s["step"] for s in steps][-1] == "Final Review and Polish"
+    # Every independent check reviews the original code, not the previous step's markdown
+    for step in steps[:-1]:
+        if not step.get("skipped"):
+            assert step["reviewed_code"].count("(DummyLLM)") == 1
+    # The final step gets the checks' findings, not their full reports
+    assert "FINDINGS SO FAR" in result["final_code"]
+    assert "[General Standards Check]" in result["final_code"]
+    assert "General Standards Check" in {f["step"] for f in result["findings"]}
+
+
+def test_parallel_checks_honour_skip_unless():
+    result = run_code_review_pipeline("def foo():\n    return 1", mode="parallel")
+    steps = {s["step"]: s for s in result["review_steps"]}
+
+    assert steps["Security Vulnerabilities Check"]["skipped"]
+    assert "Security Vulnerabilities Check" not in result["final_code"]
+    assert not steps["General Standards Check"].get("skipped")
+
+
+def test_fan_in_keeps_every_checks_code_blocks():
+    handoff = fan_in(Handoff("x = 1"), [
+        ("Check A", "- rename x\n```python\ny = 1\n```"),
+        ("Check B", "- no issues"),
+        ("Check C", "```python\nz = 2\n```"),
+    ])
+
+    assert handoff.code_blocks == ["y = 1", "z = 2"]
+    assert [f["finding"] for f in handoff.findings] == ["rename x", "no issues"]
+
+
+def test_async_parallel_matches_sync_parallel():
+    code = "def foo():\n    pass"
+
+    assert asyncio.run(arun_code_review_pipeline(code, mode="parallel")) == run_code_review_pipeline(code, mode="parallel")
+    result = asyncio.run(arun_performance_optimization_pipeline(code, mode="parallel"))
+    assert len(result["optimization_steps"]) == 6
+
+
+def test_parallel_streaming_ends_with_final_step():
+    async def collect():
+        return [e async for e in astream_code_review_pipeline("def foo(): pass", mode="parallel")]
+
+    events = asyncio.run(collect())
+    ends = [e for e in events if e["event"] == "step_end"]
+
+    assert len(ends) == 5
+    assert ends[-1]["step"] == "Final Review and Polish"
+    assert events[-1] == {"event": "pipeline_end", "final_code": ends[-1]["output"]}
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        run_code_review_pipeline("x", mode="fastest")
+
+
+@pytest.mark.parametrize("run", [run_fan_out, lambda pipeline, code: asyncio.run(arun_fan_out(pipeline, code))])
+def test_fan_out_steps_are_retried_and_resume_from_checkpoints(run):
+    code = f"def fan_out_{id(run)}(): pass"
+    check_a, check_b, merge = FlakyChain("Check A"), FlakyChain("Check B", failures=1), FlakyChain("Merge", failures=5)
+    pipeline = _pipeline([check_a, check_b, merge])
+
+    with pytest.raises(PipelineStepError) as error:
+        run(pipeline, code)
+    assert error.value.step == "Merge" and check_b.calls == 2
+    assert set(get_checkpoint_store().load(pipeline.run_key(code, mode="parallel"))) == {"Check A", "Check B"}
+
+    merge.failures = 0
+    result = run(pipeline, code)
+
+    assert check_a.calls == 1 and check_b.calls == 2
+    assert result["final_code"] == "- Merge done"
+    assert [f["step"] for f in result["findings"]][-3:] == ["Check A", "Check B", "Merge"]
+    assert get_checkpoint_store().load(pipeline.run_key(code, mode="parallel")) == {}
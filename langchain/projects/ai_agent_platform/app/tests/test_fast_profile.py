@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+import pytest
+
+from app.chains.code_review_chain import REVIEW_STEPS
+from app.chains.fast_profile import _field_name, _to_pipeline_result, astream_fast_profile, resolve_profile
+from app.tools.code_reviewer_tool import _code_reviewer, _acode_reviewer
+
+
+def test_fast_report_has_a_section_per_detailed_step():
+    report = _code_reviewer("def foo():\n    pass", profile="fast")
+
+    assert report.startswith("## === CODE REVIEW REPORT ===")
+    for name, _ in REVIEW_STEPS:
+        assert f"### {name}" in report
+    # One LLM call for the whole review; its answer is the last step and the final code
+    assert report.count("(DummyLLM)") == 2
+
+
+def test_structured_answer_maps_onto_step_sections():
+    answer = json.dumps({_field_name(name): f"notes for {name}" for name, _ in REVIEW_STEPS})
+    result = _to_pipeline_result("code_reviewer", answer)
+
+    assert [s["step"] for s in result["review_steps"]] == [name for name, _ in REVIEW_STEPS]
+    assert result["review_steps"][0]["reviewed_code"] == f"notes for {REVIEW_STEPS[0][0]}"
+    assert result["final_code"] == f"notes for {REVIEW_STEPS[-1][0]}"
+
+
+def test_unparseable_answer_becomes_final_section():
+    result = _to_pipeline_result("code_reviewer", "just some prose")
+
+    assert result["final_code"] == "just some prose"
+    assert all(s["reviewed_code"] == "" for s in result["review_steps"][:-1])
+
+
+def test_fast_stream_ends_like_a_pipeline():
+    async def collect():
+        return [e async for e in astream_fast_profile("unit_test_generator", "def foo(): pass")]
+
+    events = asyncio.run(collect())
+
+    assert [e["event"] for e in events].count("step_start") == 1
+    assert events[-1]["event"] == "pipeline_end"
+    assert asyncio.run(_acode_reviewer("x = 1", profile="fast")).count("(DummyLLM)") == 2
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_profile("turbo")
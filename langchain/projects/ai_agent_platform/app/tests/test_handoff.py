@@ -0,0 +1,52 @@
+import asyncio
+
+from app.chains.handoff import Handoff, extract_code_blocks, extract_findings
+from app.chains.code_review_chain import run_code_review_pipeline
+from app.chains.unit_test_generation_chain import astream_unit_test_generation_pipeline
+
+STEP_OUTPUT = """
+### Naming
+
+The function name is fine, but a few things stand out:
+
+- **Variable** `x` is not descriptive
+1. Missing docstring
+
+```python
+def add(a, b):
+    # - not a finding
+    return a + b
+```
+"""
+
+
+def test_handoff_keeps_code_blocks_and_findings_only():
+    handoff = Handoff("def add(x, y): return x + y")
+    handoff.update("Naming", STEP_OUTPUT)
+
+    assert extract_code_blocks(STEP_OUTPUT) == ["def add(a, b):\n    # - not a finding\n    return a + b"]
+    assert extract_findings(STEP_OUTPUT) == ["Variable `x` is not descriptive", "Missing docstring"]
+
+    rendered = handoff.render()
+    assert "a few things stand out" not in rendered
+    assert "- [Naming] Missing docstring" in rendered
+    assert "def add(a, b):" in rendered and "SOURCE CODE:\ndef add(x, y)" in rendered
+
+
+def test_steps_do_not_receive_previous_reports():
+    result = run_code_review_pipeline("def foo():\n    pass")
+
+    # DummyLLM echoes its prompt: the old handoff nested every earlier report
+    assert result["final_code"].count("(DummyLLM)") == 1
+    assert all(step["prompt_tokens"] > 0 for step in result["review_steps"] if not step.get("skipped"))
+    assert {"step": "General Standards Check", "finding": "Consistent naming"} in result["findings"]
+
+
+def test_stream_reports_prompt_tokens_per_step():
+    async def collect():
+        return [e async for e in astream_unit_test_generation_pipeline("def foo(): pass")]
+
+    starts = [e for e in asyncio.run(collect()) if e["event"] == "step_start"]
+
+    assert len(starts) == 5
+    assert all(e["prompt_tokens"] > 0 for e in starts)
@@ -0,0 +1,63 @@
+import uuid
+
+from app.agents import langgraph_code_assistant
+from app.agents.intent_router import IntentRouter, confidence, instruction_text
+from app.agents.langgraph_code_assistant import _resolve_tool_name, planner_node
+from app.tools import tool_names
+from app.utils.lazy import Lazy
+
+
+class FakePlanner:
+    def __init__(self, answer: str):
+        self.answer = answer
+        self.calls = 0
+
+    def invoke(self, inputs: dict) -> str:
+        self.calls += 1
+        return self.answer
+
+
+def _use_planner(monkeypatch, answer: str) -> FakePlanner:
+    planner = FakePlanner(answer)
+    monkeypatch.setattr(langgraph_code_assistant, "planner_chain", Lazy(lambda: planner))
+    return planner
+
+
+def test_clear_requests_are_routed_without_the_llm(monkeypatch):
+    planner = _use_planner(monkeypatch, "code_reviewer")
+
+    cases = {
+        "Write unit tests for this:\ndef add(a, b): return a + b": "unit_test_generator",
+        "This loop is too slow, please optimize it\nfor x in items: pass": "performance_optimizer",
+        "Please review this code\n```python\ndef test_x(): pass\n```": "code_reviewer",
+    }
+    for text, expected in cases.items():
+        plan = planner_node({"input": f"{text}\n# {uuid.uuid4()}"})
+        assert (plan["tool_to_use"], plan["routing"]["source"]) == (expected, "local")
+
+    assert planner.calls == 0
+
+
+def test_unsure_inputs_ask_the_llm_once_then_hit_the_cache(monkeypatch):
+    planner = _use_planner(monkeypatch, "Tool: `performance_optimizer`.")
+    text = f"def foo():\n    pass  # {uuid.uuid4()}"
+
+    first = planner_node({"input": text})
+    second = planner_node({"input": text})
+
+    assert first["routing"]["source"] == "llm" and second["routing"]["source"] == "cache"
+    assert first["tool_to_use"] == second["tool_to_use"] == "performance_optimizer"
+    assert planner.calls == 1
+
+
+def test_confidence_and_instruction_features():
+    assert instruction_text("Review this\ndef test_a():\n    pass") == "Review this"
+    assert confidence({"a": 2.0, "b": 2.0}) == 0.0  # a tie is no decision
+    assert confidence({"a": 1.0, "b": 0.0}) == 0.5  # one weak keyword
+    assert IntentRouter().route("Review and optimize this code", tool_names()) is None
+
+
+def test_llm_answers_are_parsed_leniently():
+    assert _resolve_tool_name("unit_test_generator") == "unit_test_generator"
+    assert _resolve_tool_name("I would use `code_reviewer`.") == "code_reviewer"
+    assert _resolve_tool_name("no idea") is None
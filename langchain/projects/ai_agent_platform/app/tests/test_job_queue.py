@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api.app import app
+from app.jobs.job_store import JobStore, QUEUED, RUNNING, SUCCEEDED, FAILED
+from app.jobs.job_worker import JobWorkerPool
+
+
+def _run_until_finished(store, job_ids, timeout=10):
+    async def run():
+        pool = JobWorkerPool(store, workers=2, poll_interval=0.01)
+        await pool.start()
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                statuses = [store.get(job_id)["status"] for job_id in job_ids]
+                if all(status in (SUCCEEDED, FAILED) for status in statuses):
+                    return
+                await asyncio.sleep(0.02)
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+
+
+def test_worker_runs_job_and_records_steps(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    ok_id = store.submit("def foo(): pass", tool="code_reviewer")
+    bad_id = store.submit("def foo(): pass", tool="missing_tool")
+
+    _run_until_finished(store, [ok_id, bad_id])
+
+    job = store.get(ok_id)
+    assert job["status"] == SUCCEEDED
+    assert len(job["steps"]) == 5
+    assert "FINAL REVIEWED CODE" in job["result"]
+
+    assert store.get(bad_id)["status"] == FAILED
+
+
+def test_jobs_survive_restart_and_stale_runs_are_requeued(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(db_path)
+    job_id = store.submit("def foo(): pass", tool="code_reviewer")
+    assert store.claim_next("crashed-worker")["status"] == RUNNING
+
+    reopened = JobStore(db_path)
+    assert reopened.requeue_stale(lease_seconds=-1) == 1
+    assert reopened.get(job_id)["status"] == QUEUED
+
+
+def test_pool_requeues_jobs_of_workers_that_die_later(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.submit("def foo(): pass", tool="code_reviewer")
+
+    async def run():
+        pool = JobWorkerPool(store, workers=0, lease_seconds=0.05, requeue_interval=0.02)
+        await pool.start()
+        try:
+            # Claimed by a worker of another process after this pool started, which then stops heartbeating
+            assert store.claim_next("crashed-worker")["status"] == RUNNING
+            deadline = time.monotonic() + 5
+            while store.get(job_id)["status"] != QUEUED and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+    assert store.get(job_id)["status"] == QUEUED
+
+
+def test_submit_rejects_unknown_tools():
+    response = TestClient(app).post("/jobs", json={"input": "def foo(): pass", "tool": "missing_tool"})
+
+    assert response.status_code == 400
+    assert "Unknown tool: missing_tool" in response.json()["detail"]
+
+
+def _slow_streams(seconds: float, events: list):
+    def streams():
+        async def stream(code, profile=None):
+            events.append("started")
+            try:
+                await asyncio.sleep(seconds)  # one long step, no step_end in between
+            except asyncio.CancelledError:
+                events.append("cancelled")
+                raise
+            yield {"event": "tool_end", "tool": "code_reviewer", "output": "slow report"}
+        return {"code_reviewer": stream}
+    return streams
+
+
+def _run_pool(pool, until, timeout=5):
+    async def run():
+        await pool.start()
+        deadline = time.monotonic() + timeout
+        try:
+            while not until() and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+
+
+def test_heartbeat_keeps_a_long_step_from_being_requeued(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr("app.tools.tool_streams", _slow_streams(0.6, events))
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.submit("def foo(): pass", tool="code_reviewer")
+
+    pool = JobWorkerPool(store, workers=2, poll_interval=0.01, lease_seconds=0.2, requeue_interval=0.05, heartbeat_interval=0.05)
+    _run_pool(pool, lambda: store.get(job_id)["status"] == SUCCEEDED)
+
+    assert store.get(job_id)["result"] == "slow report"
+    assert events == ["started"]  # run once, never by a second worker
+
+
+def test_requeued_job_is_abandoned_by_its_old_worker(tmp_path, monkeypatch):
+    events = []
+    monkeypatch.setattr("app.tools.tool_streams", _slow_streams(5, events))
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.submit("def foo(): pass", tool="code_reviewer")
+
+    pool = JobWorkerPool(store, workers=1, poll_interval=0.01, requeue_interval=60, heartbeat_interval=0.05)
+
+    def requeue_once_running():
+        if events == ["started"] and store.get(job_id)["worker"] != "other-worker":
+            store.requeue_stale(lease_seconds=-1)
+            store.claim_next("other-worker")
+        return "cancelled" in events
+
+    _run_pool(pool, requeue_once_running)
+
+    job = store.get(job_id)
+    assert events == ["started", "cancelled"]
+    assert job["status"] == RUNNING and job["worker"] == "other-worker"
+
+
+def test_writes_of_a_worker_that_lost_the_job_are_dropped(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.submit("def foo(): pass", tool="code_reviewer")
+    store.claim_next("first-worker")
+    store.requeue_stale(lease_seconds=-1)
+    store.claim_next("second-worker")
+
+    assert not store.append_step(job_id, "first-worker", {"step": "General Standards Check", "output": "old"})
+    assert not store.complete(job_id, "first-worker", "old report")
+    assert not store.heartbeat(job_id, "first-worker")
+
+    assert store.complete(job_id, "second-worker", "new report")
+    job = store.get(job_id)
+    assert job["status"] == SUCCEEDED and job["result"] == "new report" and job["steps"] == []
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+from app.tools import all_tools, tool_streams
+from app.tools.registry import tool_names
+from app.utils.lazy import Lazy
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+IMPORT_CHECK = """
+import sys
+import app.tools, app.agents.langgraph_code_assistant, app.api.app
+heavy = ["langchain_openai", "langchain_community", "langgraph.graph", "app.chains.code_review_chain"]
+print(",".join(name for name in heavy if name in sys.modules))
+"""
+
+
+def test_imports_build_no_chains_or_provider_clients():
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_CHECK],
+        cwd=PROJECT_ROOT,
+        env={**os.environ, "LLM_PROVIDER": "ollama"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    assert output.strip() == ""
+
+
+def test_registry_loads_tools_on_demand():
+    assert tool_names() == ["code_reviewer", "performance_optimizer", "unit_test_generator", "code_generator"]
+    assert [tool.name for tool in all_tools()] == tool_names()
+    assert list(tool_streams()) == tool_names()
+
+
+def test_lazy_builds_once():
+    calls = []
+    value = Lazy(lambda: calls.append(1) or object())
+
+    assert not value.built
+    assert value() is value()
+    assert value.built and calls == [1]
@@ -0,0 +1,74 @@
+from langchain_core.outputs import Generation
+
+from app.llm.llm_cache import TwoTierLLMCache
+from app.llm.llm_provider import DummyLLM
+
+
+def test_repeated_prompt_is_served_from_cache(tmp_path):
+    cache = TwoTierLLMCache(str(tmp_path / "cache.sqlite3"), memory_entries=8)
+    llm = DummyLLM(cache=cache)
+
+    first = llm.invoke("review: def foo(): pass")
+    second = llm.invoke("review: def foo(): pass")
+
+    assert first.content == second.content
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_survives_new_process_and_honours_ttl(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    DummyLLM(cache=TwoTierLLMCache(db_path)).invoke("hello")
+
+    reopened = TwoTierLLMCache(db_path)
+    DummyLLM(cache=reopened).invoke("hello")
+    assert reopened.stats()["disk_hits"] == 1
+
+    expired = TwoTierLLMCache(db_path, ttl_seconds=-1)
+    DummyLLM(cache=expired).invoke("hello")
+    assert expired.stats()["misses"] == 1
+
+
+def test_disk_tier_evicts_beyond_max_entries(tmp_path):
+    cache = TwoTierLLMCache(str(tmp_path / "cache.sqlite3"), memory_entries=1, max_entries=2)
+    llm = DummyLLM(cache=cache)
+
+    for prompt in ["a", "b", "c"]:
+        llm.invoke(prompt)
+
+    assert cache.stats()["evictions"] == 1
+    llm.invoke("a")
+    assert cache.stats()["misses"] == 4
+
+
+def _generations(text: str) -> list:
+    return [Generation(text=text)]
+
+
+def test_disk_tier_evicts_in_batches_only_past_max_entries(tmp_path):
+    cache = TwoTierLLMCache(str(tmp_path / "cache.sqlite3"), memory_entries=1, max_entries=1000)
+    passes = []
+    evict = cache._evict
+    cache._evict = lambda conn: passes.append(1) or evict(conn)
+
+    for n in range(1010):
+        cache.update(f"prompt {n}", "llm", _generations(str(n)))
+
+    # Past 1000 rows one pass trims to 99%, the next nine writes fit again
+    assert len(passes) == 1 and cache.stats()["evictions"] == 11
+    with cache._connect() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] == 999
+
+
+def test_memory_hits_keep_entries_on_disk(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite3")
+    cache = TwoTierLLMCache(db_path, memory_entries=8, max_entries=2, touch_seconds=0)
+
+    cache.update("a", "llm", _generations("a"))
+    cache.update("b", "llm", _generations("b"))
+    assert cache.lookup("a", "llm")[0].text == "a"  # memory hit
+    cache.update("c", "llm", _generations("c"))
+
+    reopened = TwoTierLLMCache(db_path, max_entries=2)
+    assert reopened.lookup("a", "llm") is not None
+    assert reopened.lookup("b", "llm") is None
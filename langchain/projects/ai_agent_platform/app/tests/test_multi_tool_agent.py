@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.agents import langgraph_code_assistant
+from app.agents.intent_router import split_requests
+from app.agents.langgraph_code_assistant import astream_agent_events, build_code_assistant_agent, planner_node
+
+MULTI_REQUEST = """
+Please review this code for best practices and security:
+
+def foo(password):
+    print('User password is', password)
+
+Also, optimize this code for performance:
+
+def fetch_data(urls):
+    results = []
+    for url in urls:
+        results.append(requests.get(url).text)
+    return results
+"""
+
+
+class SlowTool:
+    def __init__(self, name: str, delay: float = 0.3):
+        self.name = name
+        self.delay = delay
+
+    async def ainvoke(self, inputs: dict) -> str:
+        await asyncio.sleep(self.delay)
+        return f"{self.name} report for {inputs['code'].splitlines()[0]}"
+
+
+def test_planner_returns_one_task_per_request():
+    plan = planner_node({"input": MULTI_REQUEST})
+
+    assert [task["tool"] for task in plan["tasks"]] == ["code_reviewer", "performance_optimizer"]
+    assert plan["tasks"][1]["code"].startswith("Also, optimize this code")
+    assert len(split_requests("Optimize this:\ndata = []\nfor i in range(10):\n    data.append(i)")) == 1
+
+
+def test_trailing_request_without_code_reuses_the_previous_code():
+    segments = split_requests("Review this code for security:\ndef foo(password):\n    print(password)\n\nAlso, write unit tests for it.")
+
+    assert segments == [
+        "Review this code for security:\ndef foo(password):\n    print(password)",
+        "Also, write unit tests for it.\n\ndef foo(password):\n    print(password)",
+    ]
+
+
+def test_unroutable_requests_are_reported_in_the_merged_output(monkeypatch):
+    monkeypatch.setattr(langgraph_code_assistant, "get_tool", SlowTool)
+    monkeypatch.setattr(langgraph_code_assistant, "save_tool_output", lambda *args: None)
+    monkeypatch.setattr(langgraph_code_assistant, "_resolve_tool_name", lambda response: None)
+    text = MULTI_REQUEST.replace("Please review this code for best practices and security:", "Please have a look at this for me:")
+
+    result = asyncio.run(build_code_assistant_agent().ainvoke({"input": text}))
+
+    assert result["tool_to_use"] == "none, performance_optimizer"
+    assert "# === Task 1: none ===\n\nNo valid tool found for input." in result["output"]
+    assert "performance_optimizer report for Also, optimize this code" in result["output"]
+
+
+def test_tasks_run_as_parallel_branches_and_merge(monkeypatch):
+    monkeypatch.setattr(langgraph_code_assistant, "get_tool", SlowTool)
+    monkeypatch.setattr(langgraph_code_assistant, "save_tool_output", lambda *args: None)
+    agent = build_code_assistant_agent()
+
+    started = time.perf_counter()
+    result = asyncio.run(agent.ainvoke({"input": MULTI_REQUEST}))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.55  # the slowest tool, not the sum of both
+    assert result["tool_to_use"] == "code_reviewer, performance_optimizer"
+    assert result["output"].index("# === Task 1: code_reviewer ===") < result["output"].index("# === Task 2")
+    assert "code_reviewer report for Please review this code" in result["output"]
+
+
+def test_stream_interleaves_tasks_and_merges_output(monkeypatch):
+    def fake_stream(tool_name):
+        async def stream(code, profile=None):
+            yield {"event": "step_end", "step": "Only", "index": 0, "output": tool_name}
+            yield {"event": "tool_end", "tool": tool_name, "output": f"{tool_name} report"}
+        return stream
+
+    monkeypatch.setattr(langgraph_code_assistant, "get_tool_stream", fake_stream)
+
+    async def collect():
+        return [e async for e in astream_agent_events(MULTI_REQUEST)]
+
+    events = asyncio.run(collect())
+
+    assert events[0]["tasks"] == ["code_reviewer", "performance_optimizer"]
+    assert sorted(e["task"] for e in events if e["event"] == "step_end") == [0, 1]
+    assert events[-1]["output"] == (
+        "# === Task 1: code_reviewer ===\n\ncode_reviewer report\n\n"
+        "# === Task 2: performance_optimizer ===\n\nperformance_optimizer report"
+    )
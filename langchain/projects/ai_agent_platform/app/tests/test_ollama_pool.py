@@ -0,0 +1,87 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.llm.ollama_pool import OllamaEndpointPool
+
+
+class FakeOllama:
+    """Stand-in Ollama host serving /api/generate and /api/tags."""
+
+    def __init__(self, name: str, delay: float = 0.0):
+        self.name = name
+        self.delay = delay
+        self.fail = False
+        self.calls = 0
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.send_response(500 if fake.fail else 200)
+                self.end_headers()
+                self.wfile.write(b'{"models": []}')
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                fake.calls += 1
+                if fake.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                time.sleep(fake.delay)
+                self.send_response(200)
+                self.end_headers()
+                for chunk in ({"response": fake.name, "done": False}, {"response": "", "done": True}):
+                    self.wfile.write((json.dumps(chunk) + "\n").encode())
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def hosts():
+    servers = [FakeOllama("fast"), FakeOllama("slow", delay=0.15)]
+    yield servers
+    for server in servers:
+        server.server.shutdown()
+
+
+def test_pool_routes_to_lowest_latency_endpoint(hosts):
+    pool = OllamaEndpointPool([h.url for h in hosts], model="test")
+
+    answers = [pool.call("hi") for _ in range(6)]
+
+    assert answers.count("fast") >= 5
+    assert hosts[1].calls == 1  # sampled once, then avoided
+
+
+def test_failing_endpoint_leaves_rotation_until_health_check_passes(hosts):
+    fast, slow = hosts
+    pool = OllamaEndpointPool([fast.url, slow.url], model="test", health_check_interval=0)
+    fast.fail = True
+
+    assert pool.call("hi") == "slow"
+    assert pool.stats()["endpoints"][fast.url]["healthy"] is False
+
+    fast.fail = False
+    pool.call("hi")
+    assert pool.stats()["endpoints"][fast.url]["healthy"] is True
+
+
+def test_hedged_request_returns_first_answer(hosts):
+    fast, slow = hosts
+    pool = OllamaEndpointPool([slow.url, fast.url], model="test", hedge=True, hedge_min_samples=1)
+    pool._latencies.append(0.01)
+    pool.endpoints[1].ewma_latency = 1.0  # make the slow host look best
+
+    assert asyncio.run(pool.acall("hi")) == "fast"
+    assert pool.call("hi") == "fast"
+    assert pool.stats()["hedge_wins"] == 2
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain.prompts import PromptTemplate
+
+from app.chains.checkpoint_store import get_checkpoint_store
+from app.chains import pipeline_engine
+from app.chains.pipeline_engine import Pipeline, PipelineStepError, StepPolicy, step_thread_stats
+from app.utils.lazy import Lazy
+
+STEPS = [("First", "First step:\n{code}"), ("Second", "Second step:\n{code}"), ("Third", "Third step:\n{code}")]
+
+
+class FakeChain:
+    """Stands in for an LLMChain; fails its first `failures` calls."""
+
+    def __init__(self, name, failures=0, delay=0.0):
+        self.name = name
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.prompt = PromptTemplate(input_variables=["code"], template=f"{name}:\n{{code}}")
+
+    def invoke(self, inputs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"{self.name} unavailable")
+        return {"code": f"- {self.name} done"}
+
+    async def ainvoke(self, inputs):
+        await asyncio.sleep(self.delay)
+        return self.invoke(inputs)
+
+
+def _pipeline(chains, policy=StepPolicy(timeout=5, retries=1, backoff=0)):
+    pipeline = Pipeline("test", STEPS, "output", "steps", "test", policies={name: policy for name, _ in STEPS})
+    pipeline._chains = Lazy(lambda: [(name, chain) for (name, _), chain in zip(STEPS, chains)])
+    return pipeline
+
+
+def test_failed_step_is_retried():
+    chains = [FakeChain("First"), FakeChain("Second", failures=1), FakeChain("Third")]
+    result = _pipeline(chains).run("x = 1")
+
+    assert chains[1].calls == 2
+    assert result["final_code"] == "- Third done"
+    assert [s["step"] for s in result["steps"]] == ["First", "Second", "Third"]
+
+
+def test_failed_run_resumes_from_last_completed_step():
+    code = "def resume_me(): pass"
+    first, third = FakeChain("First"), FakeChain("Third", failures=5)
+    pipeline = _pipeline([first, FakeChain("Second"), third])
+
+    with pytest.raises(PipelineStepError) as error:
+        pipeline.run(code)
+    assert error.value.step == "Third" and error.value.attempts == 2
+    assert set(get_checkpoint_store().load(pipeline.run_key(code))) == {"First", "Second"}
+
+    third.failures = 0
+    result = pipeline.run(code)
+
+    assert first.calls == 1  # not paid for again
+    assert result["final_code"] == "- Third done"
+    assert {"step": "Second", "finding": "Second done"} in result["findings"]
+    assert get_checkpoint_store().load(pipeline.run_key(code)) == {}
+
+
+def test_async_step_timeout():
+    chains = [FakeChain("First", delay=1.0), FakeChain("Second"), FakeChain("Third")]
+    pipeline = _pipeline(chains, StepPolicy(timeout=0.05, retries=0, backoff=0))
+
+    with pytest.raises(PipelineStepError) as error:
+        asyncio.run(pipeline.arun("slow"))
+    assert isinstance(error.value.__cause__, asyncio.TimeoutError)
+
+
+def test_stream_replays_checkpointed_steps():
+    code = "def stream_me(): pass"
+    pipeline = Pipeline("test_stream", STEPS, "output", "steps", "test")
+    store = get_checkpoint_store()
+    store.save(pipeline.run_key(code), "First", 0, "- cached first", 7)
+
+    async def collect():
+        return [e async for e in pipeline.astream(code)]
+
+    events = asyncio.run(collect())
+
+    assert events[:2] == [
+        {"event": "step_start", "step": "First", "index": 0, "prompt_tokens": 7},
+        {"event": "step_end", "step": "First", "index": 0, "output": "- cached first"},
+    ]
+    assert [e["step"] for e in events if e["event"] == "step_end"] == ["First", "Second", "Third"]
+    assert store.load(pipeline.run_key(code)) == {}
+
+
+class HangingChain:
+    """A sync LLM call that ignores the step timeout until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = 0
+
+    def invoke(self, inputs):
+        self.started += 1
+        self.release.wait(5)
+        return {"code": "late"}
+
+
+def test_timed_out_sync_calls_are_capped_and_counted(monkeypatch):
+    monkeypatch.setattr(pipeline_engine, "_step_executor", Lazy(lambda: ThreadPoolExecutor(max_workers=2)))
+    chain = HangingChain()
+    before = step_thread_stats()["abandoned_running"]
+
+    for _ in range(4):
+        with pytest.raises(TimeoutError):
+            pipeline_engine._invoke_with_timeout(chain, {"code": "x"}, timeout=0.05)
+
+    # Two calls hold the threads; the calls queued behind them never started
+    assert chain.started == 2
+    assert step_thread_stats()["abandoned_running"] == before + 2
+
+    chain.release.set()
+    pipeline_engine._step_executor().shutdown(wait=True)
+    assert step_thread_stats()["abandoned_running"] == before
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from typing import ClassVar
+
+from app.llm import llm_provider, rate_limiter
+from app.llm.llm_provider import DummyLLM, RateLimitedMixin, RateLimitedStreamMixin, get_llm
+from app.llm.rate_limiter import ProviderLimiter, TokenBucket, _Slots
+
+
+def test_concurrency_cap_queues_async_callers():
+    limiter = ProviderLimiter("test", max_concurrency=2)
+    active = []
+    peak = []
+
+    async def call():
+        async with limiter.alimit(tokens=10):
+            active.append(1)
+            peak.append(len(active))
+            await asyncio.sleep(0.02)
+            active.pop()
+
+    async def run():
+        await asyncio.gather(*[call() for _ in range(6)])
+
+    asyncio.run(run())
+
+    stats = limiter.stats()
+    assert max(peak) == 2
+    assert stats["requests"] == 6
+    assert stats["queued_requests"] >= 4
+    assert stats["in_flight"] == 0
+
+
+def test_concurrency_cap_is_shared_between_threads():
+    limiter = ProviderLimiter("test", max_concurrency=1)
+    overlaps = []
+    busy = threading.Lock()
+
+    def call():
+        with limiter.limit(tokens=10):
+            overlaps.append(not busy.acquire(blocking=False))
+            time.sleep(0.01)
+            busy.release()
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert overlaps == [False] * 4
+
+
+def test_token_bucket_makes_callers_wait_instead_of_failing():
+    bucket = TokenBucket(per_minute=600, capacity=2)  # 10 per second
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert 0.05 < bucket.reserve(1) <= 0.1
+
+
+def test_mixin_routes_provider_calls_through_limiter(monkeypatch):
+    class LimitedDummy(RateLimitedMixin, DummyLLM):
+        limiter_name: ClassVar[str] = "limited-dummy"
+
+    monkeypatch.setitem(rate_limiter._limiters, "limited-dummy", ProviderLimiter("limited-dummy", 1))
+
+    LimitedDummy(cache=False).invoke("hello")
+    asyncio.run(LimitedDummy(cache=False).ainvoke("hello"))
+
+    assert rate_limiter.limiter_stats()["limited-dummy"]["requests"] == 2
+
+
+def test_get_llm_returns_shared_instance():
+    assert get_llm() is get_llm()
+
+
+def test_cancelled_waiter_does_not_release_its_slot_twice():
+    slots = _Slots(1)
+
+    async def run():
+        await slots.aacquire()
+        waiter = asyncio.create_task(slots.aacquire())
+        await asyncio.sleep(0)  # the waiter is queued
+
+        # The slot is handed to the waiter, which is cancelled before the hand-over runs
+        slots.release()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert slots.in_use == 0 and len(slots) == 0
+
+
+def test_limiter_flag_does_not_leak_into_stream_consumers(monkeypatch):
+    class ChunkSource:
+        def _stream(self, inputs):
+            yield from ["a", "b"]
+
+        async def _astream(self, inputs):
+            for chunk in ["a", "b"]:
+                yield chunk
+
+    class LimitedSource(RateLimitedStreamMixin, ChunkSource):
+        limiter_name: ClassVar[str] = "stream-test"
+
+    monkeypatch.setitem(rate_limiter._limiters, "stream-test", ProviderLimiter("stream-test", 1))
+
+    seen = [llm_provider._inside_limiter.get() for _ in LimitedSource()._stream("x")]
+
+    async def consume():
+        return [llm_provider._inside_limiter.get() async for _ in LimitedSource()._astream("x")]
+
+    seen += asyncio.run(consume())
+    assert seen == [False] * 4 and not llm_provider._inside_limiter.get()
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from app.agents import langgraph_code_assistant
+from app.agents.langgraph_code_assistant import astream_agent_events, build_code_assistant_agent
+from app.agents.session_memory import compact_summary, load_context, revised_code, split_input
+from app.agents.session_store import SessionStore, get_session_store
+from app.configs.settings import SESSION_RECENT_TURNS, SESSION_SUMMARY_MAX_TOKENS, SESSION_TURN_MAX_TOKENS
+from app.utils.token_counter import count_tokens
+
+SLOW_CODE = "def total(items):\n    result = 0\n    for item in items:\n        result = result + item\n    return result"
+
+
+class RecordingTool:
+    inputs = []
+
+    def __init__(self, name: str):
+        self.name = name
+
+    async def ainvoke(self, inputs: dict) -> str:
+        RecordingTool.inputs.append(inputs["code"])
+        findings = "\n".join(f"- {self.name} finding {n}: " + "detail " * 30 for n in range(5))
+        return (
+            f"## === PERFORMANCE OPTIMIZATION REPORT ===\n{findings}\n\n"
+            f"## === FINAL OPTIMIZED CODE ===\n```python\ndef total(items):\n    return sum(items)\n```"
+        )
+
+
+def _agent(monkeypatch):
+    RecordingTool.inputs = []
+    monkeypatch.setattr(langgraph_code_assistant, "get_tool", RecordingTool)
+    monkeypatch.setattr(langgraph_code_assistant, "save_tool_output", lambda *args: None)
+    return build_code_assistant_agent()
+
+
+def test_split_input_and_revised_code():
+    assert split_input("Optimize this:\n" + SLOW_CODE) == ("Optimize this:", SLOW_CODE)
+    assert split_input("Now write unit tests for the optimised version") == ("Now write unit tests for the optimised version", None)
+
+    report = "## === CODE REVIEW REPORT ===\n```\nold()\n```\n## === FINAL REVIEWED CODE ===\n```python\nnew()\n```"
+    assert revised_code(report) == "new()"
+    assert revised_code("## === FINAL UNIT TEST CODE ===\n```python\ndef test_x(): pass\n```") is None
+
+
+def test_follow_up_works_on_the_latest_code_artifact(monkeypatch):
+    agent = _agent(monkeypatch)
+    session_id = get_session_store().create()
+
+    first = asyncio.run(agent.ainvoke({"input": "Optimize this code for performance:\n" + SLOW_CODE, "session_id": session_id}))
+    assert RecordingTool.inputs[0] == "Optimize this code for performance:\n" + SLOW_CODE  # nothing to recall yet
+
+    asyncio.run(agent.ainvoke({"input": "Now write unit tests for the optimised version", "session_id": session_id}))
+    follow_up = RecordingTool.inputs[1]
+
+    assert follow_up.startswith("Now write unit tests for the optimised version\n\nCODE (session artifact ")
+    assert "return sum(items)" in follow_up and "SESSION CONTEXT" in follow_up
+    # Earlier code is referenced by hash, not copied into the context
+    assert "```python" not in follow_up.split("SESSION CONTEXT")[1]
+    assert first["output"] not in follow_up
+
+    session = get_session_store().load(session_id)
+    assert session["turns"] == 2
+    assert get_session_store().get_artifact(session["latest_code"]) == "def total(items):\n    return sum(items)"
+
+
+def test_context_stays_bounded_in_long_sessions(monkeypatch):
+    agent = _agent(monkeypatch)
+    session_id = get_session_store().create()
+
+    for turn in range(12):
+        asyncio.run(agent.ainvoke({"input": f"Optimize step {turn} of this:\n{SLOW_CODE}", "session_id": session_id}))
+
+    session = get_session_store().load(session_id)
+    context = load_context(session_id)
+
+    assert session["turns"] == 12 and len(session["recent"]) == SESSION_RECENT_TURNS
+    assert session["summary"]["entries"][-1]["turn"] == 12 - SESSION_RECENT_TURNS
+    bound = SESSION_SUMMARY_MAX_TOKENS + SESSION_RECENT_TURNS * (SESSION_TURN_MAX_TOKENS + 100)
+    assert count_tokens(context["text"]) < bound
+
+
+def test_stream_records_turns(monkeypatch):
+    def fake_stream(tool_name):
+        async def stream(code, profile=None):
+            yield {"event": "tool_end", "tool": tool_name, "output": f"{tool_name} report\n- looked at {code.splitlines()[0]}"}
+        return stream
+
+    monkeypatch.setattr(langgraph_code_assistant, "get_tool_stream", fake_stream)
+    session_id = get_session_store().create()
+
+    async def collect(text):
+        return [event async for event in astream_agent_events(text, session_id=session_id)]
+
+    asyncio.run(collect("Please review this code for security:\n" + SLOW_CODE))
+    asyncio.run(collect("Optimize it for performance"))
+
+    recent = get_session_store().load(session_id)["recent"]
+    assert [turn["tool"] for turn in recent] == ["code_reviewer", "performance_optimizer"]
+    assert recent[0]["request"].startswith("Please review this code for security: [code ")
+
+
+def test_idle_sessions_expire_while_the_store_is_running(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite3"), ttl_seconds=0.2, expire_interval=0)
+    turn = {"request": "review it", "tool": "code_reviewer", "output": "Looks fine.", "code": store.put_artifact("x = 1")}
+    idle, active = store.create(), store.create()
+    store.append_turn(active, turn, 3, compact_summary)
+
+    time.sleep(0.3)
+    assert store.load(idle) is None
+
+    # A write purges expired sessions; an expired one written to starts over
+    assert store.append_turn(active, turn, 3, compact_summary) == 1
+    with store._connect() as conn:
+        assert [row["id"] for row in conn.execute("SELECT id FROM sessions")] == [active]
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from app.llm.simulated_llm import SimulatedLLM, SimulatedLLMError
+
+
+def _llm(**overrides):
+    params = dict(seed=7, ttft_seconds=0.05, token_seconds=0.001, max_output_tokens=40, cache=False)
+    params.update(overrides)
+    return SimulatedLLM(**params)
+
+
+def test_same_seed_and_prompt_give_same_output():
+    prompt = "Review this code:\ndef compute_total(values): return sum(values)"
+
+    assert _llm().invoke(prompt).content == _llm().invoke(prompt).content
+    assert _llm().invoke(prompt).content != _llm(seed=8).invoke(prompt).content
+
+
+def test_output_length_grows_with_prompt():
+    short = _llm(max_output_tokens=2000, time_scale=0).invoke("def f(): pass").content
+    long = _llm(max_output_tokens=2000, time_scale=0).invoke("def f(): pass\n" * 200).content
+
+    assert len(long.split()) > 3 * len(short.split())
+
+
+def test_streams_token_by_token_after_first_token_latency():
+    started = time.perf_counter()
+    chunks = list(_llm().stream("def f(): pass"))
+
+    assert len(chunks) > 10
+    assert time.perf_counter() - started >= 0.02
+
+
+def test_async_calls_overlap():
+    async def run():
+        return await asyncio.gather(*[_llm().ainvoke(f"prompt {i}") for i in range(10)])
+
+    started = time.perf_counter()
+    asyncio.run(run())
+
+    # ten calls of ~0.1s each finish in far less than their sum
+    assert time.perf_counter() - started < 0.6
+
+
+def test_failures_are_injected_deterministically():
+    failing = _llm(error_rate=1.0, time_scale=0)
+    with pytest.raises(SimulatedLLMError):
+        failing.invoke("x")
+
+    with pytest.raises(TimeoutError):
+        _llm(timeout_rate=1.0, time_scale=0).invoke("x")
+
+    partial = _llm(error_rate=0.5, time_scale=0)
+    outcomes = []
+    for i in range(40):
+        try:
+            partial.invoke(f"prompt {i}")
+            outcomes.append(True)
+        except SimulatedLLMError:
+            outcomes.append(False)
+
+    assert 5 < outcomes.count(False) < 35
+    replay = _llm(error_rate=0.5, time_scale=0)
+    assert outcomes == [not isinstance(_try(replay, f"prompt {i}"), Exception) for i in range(40)]
+
+
+def test_retries_of_a_failed_prompt_get_a_fresh_draw():
+    llm = _llm(error_rate=0.5, timeout_rate=0.2, time_scale=0)
+    failed = next(f"prompt {i}" for i in range(40) if isinstance(_try(llm, f"prompt {i}"), Exception))
+
+    attempts = [_try(llm, failed) for _ in range(20)]
+    successes = [result for result in attempts if not isinstance(result, Exception)]
+
+    assert successes and all(result.content == successes[0].content for result in successes)
+
+
+
+def test_call_counts_are_kept_for_recent_prompts_only():
+    llm = _llm(time_scale=0, max_tracked_prompts=8)
+    for i in range(50):
+        llm.invoke(f"prompt {i}")
+    llm.invoke("prompt 49")
+
+    assert len(llm._attempts) == 8
+    assert next(reversed(llm._attempts.values())) == 2
+
+
+def _try(llm, prompt):
+    try:
+        return llm.invoke(prompt)
+    except Exception as e:
+        return e
@@ -0,0 +1,81 @@
+import asyncio
+import uuid
+
+from app.agents import langgraph_code_assistant
+from app.agents.langgraph_code_assistant import aplanner_node
+from app.agents.session_memory import with_session_context
+from app.agents.speculation import Speculator
+from app.chains.checkpoint_store import get_checkpoint_store
+from app.chains.code_review_chain import review_pipeline
+from app.utils.lazy import Lazy
+
+
+class FakePlanner:
+    def __init__(self, answer: str):
+        self.answer = answer
+
+    async def ainvoke(self, inputs: dict) -> str:
+        return self.answer
+
+
+def _setup(monkeypatch, answer: str, **speculator_options) -> Speculator:
+    speculator = Speculator(**{"enabled": True, "max_per_minute": 0, **speculator_options})
+    monkeypatch.setattr(langgraph_code_assistant, "speculator", speculator)
+    monkeypatch.setattr(langgraph_code_assistant, "planner_chain", Lazy(lambda: FakePlanner(answer)))
+    return speculator
+
+
+def _unsure_input() -> str:
+    # One weak code_reviewer keyword: guessed, but not routed locally
+    return f"Is anything wrong here?\ndef foo(password):\n    return password  # {uuid.uuid4()}"
+
+
+def test_agreeing_planner_keeps_the_speculative_first_step(monkeypatch):
+    speculator = _setup(monkeypatch, "code_reviewer")
+    text = _unsure_input()
+
+    plan = asyncio.run(aplanner_node({"input": text}))
+
+    assert plan["tool_to_use"] == "code_reviewer" and plan["routing"]["source"] == "llm"
+    assert list(get_checkpoint_store().load(review_pipeline.run_key(text))) == ["General Standards Check"]
+    assert speculator.stats()["kept"] == 1 and speculator.stats()["hit_rate"] == 1.0
+
+    # The tool run resumes after the speculative step and then clears the checkpoint
+    result = asyncio.run(review_pipeline.arun(text))
+    assert len(result["review_steps"]) == 5
+    assert get_checkpoint_store().load(review_pipeline.run_key(text)) == {}
+
+
+def test_speculation_in_a_session_runs_on_the_tool_input(monkeypatch):
+    _setup(monkeypatch, "code_reviewer")
+    text = _unsure_input()
+    session = {"text": "SESSION CONTEXT:\n\nTURN 1 [code_reviewer]\nRequest: review it\nOutput:\nLooks fine.", "code": None}
+
+    asyncio.run(aplanner_node({"input": text, "session": session}))
+
+    # dispatch_tasks runs the tool on the input with the session context
+    assert list(get_checkpoint_store().load(review_pipeline.run_key(with_session_context(text, session)))) == ["General Standards Check"]
+    assert get_checkpoint_store().load(review_pipeline.run_key(text)) == {}
+
+
+def test_disagreeing_planner_cancels_the_speculation(monkeypatch):
+    speculator = _setup(monkeypatch, "performance_optimizer")
+    text = _unsure_input()
+
+    plan = asyncio.run(aplanner_node({"input": text}))
+
+    assert plan["tool_to_use"] == "performance_optimizer"
+    assert speculator.stats()["cancelled"] == 1 and speculator.stats()["hit_rate"] == 0.0
+    assert get_checkpoint_store().load(review_pipeline.run_key(text)) == {}
+
+
+def test_budget_limits_speculative_runs(monkeypatch):
+    speculator = _setup(monkeypatch, "code_reviewer", max_per_minute=1)
+
+    async def plan_twice():
+        await aplanner_node({"input": _unsure_input()})
+        await aplanner_node({"input": _unsure_input()})
+
+    asyncio.run(plan_twice())
+
+    assert speculator.stats()["started"] == 1 and speculator.stats()["over_budget"] == 1
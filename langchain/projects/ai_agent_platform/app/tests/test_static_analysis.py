@@ -0,0 +1,64 @@
+from app.chains.code_review_chain import run_code_review_pipeline
+from app.chains.performance_optimization_chain import run_performance_optimization_pipeline
+from app.chains.static_analysis import IO, LOOPS, SECURITY, analyze
+
+FETCH_CODE = """
+Please optimize this:
+
+def fetch_data(urls):
+    results = []
+    for url in urls:
+        for attempt in range(3):
+            data = requests.get(url).text
+        results.append(data)
+    return results
+"""
+
+
+def _rules(code: str) -> set:
+    return {finding.rule for finding in analyze(code).findings}
+
+
+def test_rules_find_secrets_loops_and_network_calls():
+    assert _rules('def login():\n    password = "123456"\n    print(password)') == {"hardcoded-secret", "secret-logged"}
+    assert _rules(FETCH_CODE) == {"nested-loop", "network-in-loop", "append-in-loop"}
+    assert _rules("def fib(n):\n    return n if n < 2 else fib(n - 1) + fib(n - 2)") == {"recursion"}
+
+    analysis = analyze(FETCH_CODE)
+    assert analysis.parsed  # the leading prose is dropped
+    assert {IO, LOOPS} <= analysis.concerns and SECURITY not in analysis.concerns
+
+
+def test_file_paths_and_formatted_sql_are_a_security_surface():
+    assert _rules("def show(user_path):\n    return open(user_path).read()") == {"path-from-input"}
+    assert _rules("def find(db, name):\n    return db.execute(\"SELECT * FROM users WHERE name = '%s'\" % name)") == {"sql-format"}
+    assert _rules("def find(db, name):\n    return db.execute(\"DELETE FROM users WHERE name = '{}'\".format(name))") == {"sql-format"}
+
+    # A constant path is not, and keeps the security step skippable
+    assert SECURITY in analyze("def load(name):\n    with open(name) as f:\n        return f.read()").concerns
+    assert SECURITY not in analyze("def load():\n    with open('config.json') as f:\n        return f.read()").concerns
+
+
+def test_non_python_input_is_never_trusted_to_skip():
+    analysis = analyze("const apiKey = 'abcdef123';\nfunction run() {}")
+
+    assert not analysis.confident
+    assert [f.rule for f in analysis.findings] == ["hardcoded-secret"]
+
+
+def test_trivial_input_skips_steps_without_concerns():
+    review = run_code_review_pipeline("def foo():\n    pass")
+    skipped = [s["step"] for s in review["review_steps"] if s.get("skipped")]
+    assert skipped == ["Security Vulnerabilities Check", "Performance Smells Check"]
+
+    optimization = run_performance_optimization_pipeline("def foo():\n    pass")
+    ran = [s["step"] for s in optimization["optimization_steps"] if not s.get("skipped")]
+    assert ran == ["General Code Optimization", "Final Review and Polish"]
+
+
+def test_findings_are_injected_and_relevant_steps_run():
+    result = run_code_review_pipeline('def connect():\n    password = "123456"\n    return password')
+
+    assert not any(s.get("skipped") for s in result["review_steps"][:3])
+    # DummyLLM echoes its prompt, so the first step saw the static findings
+    assert "[Static Analysis] line 2: hardcoded secret in `password`" in result["review_steps"][0]["reviewed_code"]
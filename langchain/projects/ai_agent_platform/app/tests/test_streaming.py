@@ -0,0 +1,35 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.app import app
+from app.tools.code_reviewer_tool import code_reviewer, astream_code_reviewer
+
+
+def _collect(stream):
+    async def run():
+        return [event async for event in stream]
+    return asyncio.run(run())
+
+
+def test_streamed_report_matches_tool_output():
+    code = "def foo():\n    pass"
+    events = _collect(astream_code_reviewer(code))
+
+    kinds = [event["event"] for event in events]
+    assert kinds.count("step_start") == kinds.count("step_end") == 5
+    assert "token" in kinds
+
+    streamed = "".join(event["text"] for event in events if event["event"] == "report")
+    assert events[-1]["event"] == "tool_end"
+    assert streamed == events[-1]["output"] == code_reviewer.invoke(code)
+
+
+def test_agent_stream_endpoint_emits_sse():
+    client = TestClient(app)
+    response = client.post("/agent/stream", json={"input": "def foo(): pass"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: planner\n")
+    assert "event: done" in response.text
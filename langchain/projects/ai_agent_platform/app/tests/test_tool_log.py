@@ -0,0 +1,73 @@
+import gzip
+import threading
+
+from app.utils.markdown_logger import ToolLogWriter, format_entry
+
+
+def _writer(tmp_path, **options) -> ToolLogWriter:
+    return ToolLogWriter(**{"log_dir": str(tmp_path), "enabled": True, "flush_seconds": 0.05, **options})
+
+
+def _segments(tmp_path, tool_name: str) -> list:
+    return sorted(tmp_path.glob(f"{tool_name}_result.*.md.gz"))
+
+
+def test_entries_are_batched_and_every_run_is_written(tmp_path):
+    writer = _writer(tmp_path)
+
+    assert writer.submit("code_reviewer", "def foo(): pass", "Looks fine.")
+    assert writer.submit("code_reviewer", "def foo(): pass", "Looks fine.")  # a second request with the same code
+    assert writer.submit("code_reviewer", "def bar(): pass", "Looks fine.")
+    writer.flush()
+
+    log = (tmp_path / "code_reviewer_result.md").read_text(encoding="utf-8")
+    assert log.count("# Tool Run - code_reviewer") == 3
+    assert "```\ndef foo(): pass\n```" in log
+    assert writer.stats()["written"] == 3
+    writer.close()
+
+
+def test_full_files_are_rotated_compressed_and_pruned(tmp_path):
+    writer = _writer(tmp_path, max_bytes=400, backups=2)
+
+    for n in range(6):
+        writer.submit("performance_optimizer", f"run {n}", "x" * 200)
+        writer.flush()  # one batch per run
+
+    segments = _segments(tmp_path, "performance_optimizer")
+    assert len(segments) == 2 and writer.stats()["rotations"] == 5
+    assert "run 4" in gzip.open(segments[-1], "rt", encoding="utf-8").read()
+    assert "run 5" in (tmp_path / "performance_optimizer_result.md").read_text(encoding="utf-8")
+    writer.close()
+
+
+def test_old_files_are_rotated(tmp_path):
+    (tmp_path / "code_generator_result.md").write_text(format_entry("code_generator", "old", "old", "2020-01-01 00:00:00"))
+    writer = _writer(tmp_path, rotate_seconds=3600)
+
+    writer.submit("code_generator", "new", "new")
+    writer.close()
+
+    assert len(_segments(tmp_path, "code_generator")) == 1
+    assert "new" in (tmp_path / "code_generator_result.md").read_text(encoding="utf-8")
+
+
+def test_concurrent_writers_share_a_directory(tmp_path):
+    # Separate writers stand in for worker processes: each has its own thread and file handles
+    writers = [_writer(tmp_path, max_bytes=2000, backups=0) for _ in range(3)]
+
+    def log_runs(index, writer):
+        for n in range(40):
+            writer.submit("unit_test_generator", f"writer {index} run {n}", "ok")
+        writer.close()
+
+    threads = [threading.Thread(target=log_runs, args=item) for item in enumerate(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = (tmp_path / "unit_test_generator_result.md").read_text(encoding="utf-8")
+    text += "".join(gzip.open(path, "rt", encoding="utf-8").read() for path in _segments(tmp_path, "unit_test_generator"))
+    assert text.count("# Tool Run - unit_test_generator") == 120
+    assert text.count("---\n\n") == 120  # no interleaved entries
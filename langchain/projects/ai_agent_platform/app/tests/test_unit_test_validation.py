@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+import pytest
+
+from app.sandbox import unit_test_validator
+from app.sandbox.unit_test_validator import avalidate_generated_tests, extract_test_code, validate_generated_tests
+from app.tools.unit_test_generator_tool import astream_unit_test_generator, unit_test_generator
+
+SOURCE = "def add(a, b):\n    return a + b\n"
+
+GENERATED = """
+### Final Unit Test Code
+
+```python
+import unittest
+from calculator import add
+
+
+class TestAdd(unittest.TestCase):
+    def test_positive(self):
+        self.assertEqual(add(1, 2), 3)
+
+    def test_wrong_expectation(self):
+        self.assertEqual(add(1, 1), 3)
+
+    def test_missing_argument(self):
+        add(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
+```
+"""
+
+
+def test_counts_passes_failures_and_errors():
+    result = validate_generated_tests(SOURCE, GENERATED)
+
+    # `from calculator import add` resolves to the input code
+    assert (result.status, result.tests_run, result.passed, result.failures, result.errors) == ("failed", 3, 1, 1, 1)
+    assert "AssertionError: 2 != 3" in result.detail
+
+
+def test_unimportable_tests_and_missing_tests_are_reported():
+    broken = GENERATED.replace("import unittest", "import unittest\nfrom calculator import subtract")
+
+    assert validate_generated_tests(SOURCE, broken).status == "error"
+    assert validate_generated_tests(SOURCE, "No code here.").status == "no_tests"
+    assert extract_test_code(GENERATED).startswith("import unittest")
+
+
+def test_hanging_code_is_killed(monkeypatch):
+    monkeypatch.setattr(unit_test_validator, "TEST_VALIDATION_TIMEOUT_SECONDS", 1)
+
+    result = validate_generated_tests("import time\ntime.sleep(30)\n" + SOURCE, GENERATED)
+
+    assert result.status == "timeout" and result.duration < 10
+
+
+def test_many_snippets_validate_concurrently():
+    async def run():
+        return await asyncio.gather(*(avalidate_generated_tests(SOURCE, GENERATED) for _ in range(6)))
+
+    assert {result.tests_run for result in asyncio.run(run())} == {3}
+
+
+def test_tool_attaches_validation_to_report():
+    report = unit_test_generator.invoke({"code": "def foo():\n    pass", "run_tests": True})
+    assert "--- Test Validation ---" in report and "- Status: **" in report
+
+    async def collect():
+        return [e async for e in astream_unit_test_generator("def foo():\n    pass", run_tests=True)]
+
+    events = asyncio.run(collect())
+    ends = [e for e in events if e["event"] == "step_end"]
+    assert ends[-1]["step"] == "Test Validation" and "status" in ends[-1]["validation"]
+
+
+def _isolation_test(body: str) -> str:
+    return "```python\nimport os\nimport socket\nimport unittest\n\n\nclass TestIsolation(unittest.TestCase):\n" + body + "\n```"
+
+
+def test_sandbox_cannot_see_the_api_process_or_the_network():
+    if unit_test_validator.sandbox_python() is None:
+        pytest.skip("no isolated sandbox on this host")
+
+    generated = _isolation_test(
+        f"    def test_api_environment_is_hidden(self):\n"
+        f"        with self.assertRaises(OSError):\n"
+        f"            open('/proc/{os.getpid()}/environ').read()\n\n"
+        f"    def test_no_network(self):\n"
+        f"        with self.assertRaises(OSError):\n"
+        f"            socket.create_connection(('1.1.1.1', 80), timeout=2)\n"
+    )
+
+    result = validate_generated_tests(SOURCE, generated)
+    assert (result.status, result.passed) == ("passed", 2), result.detail
+
+
+def test_sandbox_limits_processes():
+    if unit_test_validator.sandbox_python() is None or unit_test_validator._process_limit(unit_test_validator.sandbox_uid()) == 0:
+        pytest.skip("process limit is not enforced for this uid")
+
+    generated = _isolation_test(
+        "    def test_fork_bomb_is_stopped(self):\n"
+        "        with self.assertRaises(OSError):\n"
+        "            for _ in range(500):\n"
+        "                if os.fork() == 0:\n"
+        "                    import time\n"
+        "                    time.sleep(5)\n"
+        "                    os._exit(0)\n"
+    )
+
+    result = validate_generated_tests(SOURCE, generated)
+    assert result.status == "passed", result.detail
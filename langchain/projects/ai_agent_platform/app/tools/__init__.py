@@ -1,16 +1,31 @@
-from app.tools.code_reviewer_tool import code_reviewer
-from app.tools.performance_optimizer_tool import performance_optimizer
-from app.tools.unit_test_generator_tool import unit_test_generator
+from app.tools.registry import TOOL_SPECS, tool_names, get_tool, get_tool_stream
+from app.tools.batch import arun_tool_batch, run_tool_batch
 
 
 def all_tools():
     """
     Returns all tools available in the system.
-    Add new tools here and they will be automatically available in the agent.
+    Register new tools in `app.tools.registry.TOOL_SPECS` and they will be
+    automatically available in the agent. Tools are loaded on first call.
     """
-    return [
-        code_reviewer,
-        performance_optimizer,
-        unit_test_generator
-        # Add more tools here in future
-    ]
\ No newline at end of file
+    return [get_tool(name) for name in tool_names()]
+
+
+def tool_streams():
+    """
+    Returns the streaming entry point of each tool, keyed by tool name.
+    Used by the /agent/stream endpoint to emit step and token events.
+    """
+    return {name: get_tool_stream(name) for name in tool_names()}
+
+
+def __getattr__(name):
+    # Keeps `from app.tools import code_reviewer, astream_code_reviewer` working
+    # while the tool modules load lazily.
+    for tool_name, (_, tool_attr, stream_attr) in TOOL_SPECS.items():
+        if name == tool_attr:
+            return get_tool(tool_name)
+        if name == stream_attr:
+            return get_tool_stream(tool_name)
+
+    raise AttributeError(f"module 'app.tools' has no attribute '{name}'")
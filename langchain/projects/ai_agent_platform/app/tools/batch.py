@@ -0,0 +1,69 @@
+import asyncio
+
+from app.configs.settings import BATCH_MAX_CONCURRENCY
+from app.utils.logger import logger
+
+
+async def _route(code: str) -> str | None:
+    # Imported lazily: the agent module imports app.tools itself
+    from app.agents.langgraph_code_assistant import aplanner_node
+
+    plan = await aplanner_node({"input": code})
+    return plan["tool_to_use"]
+
+
+async def arun_tool_batch(inputs: list[str], tool_name: str = None, max_concurrency: int = None) -> list[dict]:
+    """
+    Runs many inputs through the tool pipelines concurrently.
+
+    Identical inputs are executed once and share a result. Without an explicit
+    tool_name the planner picks a tool for every distinct input. At most
+    max_concurrency pipelines (default BATCH_MAX_CONCURRENCY) run at a time.
+
+    Returns one result per input, in input order:
+    {"index", "tool", "status": "ok" | "error", "output", "error"}
+    A failing item is reported in its own result and does not fail the batch.
+    """
+    from app.tools import all_tools
+
+    tool_map = {tool.name: tool for tool in all_tools()}
+    if tool_name is not None and tool_name not in tool_map:
+        raise ValueError(f"Unknown tool: {tool_name}. Available tools: {', '.join(tool_map)}")
+
+    limit = max_concurrency or BATCH_MAX_CONCURRENCY
+    if limit < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    # dict keeps first-seen order, so unique inputs stay aligned with the batch
+    unique_inputs = list(dict.fromkeys(inputs))
+    semaphore = asyncio.Semaphore(limit)
+
+    logger.info(f"Running batch of {len(inputs)} inputs ({len(unique_inputs)} unique) with concurrency {limit}.")
+
+    async def run_one(code: str) -> dict:
+        async with semaphore:
+            selected = tool_name
+            try:
+                if selected is None:
+                    selected = await _route(code)
+                    if selected is None:
+                        raise ValueError("No valid tool found for input.")
+
+                output = await tool_map[selected].ainvoke({"code": code})
+                return {"tool": selected, "status": "ok", "output": output, "error": None}
+
+            except Exception as e:
+                logger.exception("Batch item failed.")
+                return {"tool": selected, "status": "error", "output": None, "error": str(e)}
+
+    unique_results = await asyncio.gather(*[run_one(code) for code in unique_inputs])
+    result_by_input = dict(zip(unique_inputs, unique_results))
+
+    return [{"index": index, **result_by_input[code]} for index, code in enumerate(inputs)]
+
+
+def run_tool_batch(inputs: list[str], tool_name: str = None, max_concurrency: int = None) -> list[dict]:
+    """
+    Synchronous wrapper around `arun_tool_batch` for scripts and notebooks.
+    """
+    return asyncio.run(arun_tool_batch(inputs, tool_name=tool_name, max_concurrency=max_concurrency))
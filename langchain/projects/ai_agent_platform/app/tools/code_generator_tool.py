@@ -0,0 +1,76 @@
+from typing import List, Optional
+
+from langchain_core.tools import StructuredTool
+from app.chains.code_generation_chain import (
+    ANALYSIS_STEP,
+    combine_results,
+    run_multi_language_generation,
+    arun_multi_language_generation,
+    astream_multi_language_generation,
+)
+from app.utils.logger import logger
+from app.utils.markdown_logger import save_tool_output
+from app.tools.report_builder import ReportBuilder, astream_tool_report
+
+
+def _new_report() -> ReportBuilder:
+    return ReportBuilder("## === CODE GENERATION REPORT ===\n", "## === GENERATED CODE ===\n")
+
+
+def _build_report(result: dict) -> str:
+    report = _new_report()
+    report.start()
+
+    report.add_step(ANALYSIS_STEP, result["analysis"])
+    for item in result["results"]:
+        report.add_step(item["language"], item["code"])
+
+    report.finish(combine_results(result))
+    return report.render()
+
+
+def _code_generator(code: str, languages: Optional[List[str]] = None) -> str:
+    """
+    Generates code for a technical requirement in one or more programming languages.
+    The requirement is analysed once and every language is implemented from that analysis.
+    Optional `languages`: e.g. ["python", "go"]; defaults to the languages named in the requirement.
+    """
+
+    logger.info("Code Generator Tool invoked.")
+
+    result = run_multi_language_generation(code, languages)
+    final_output = _build_report(result)
+
+    # --- SAVE TO MARKDOWN ---
+    save_tool_output("code_generator", code, final_output)
+
+    return final_output
+
+
+async def _acode_generator(code: str, languages: Optional[List[str]] = None) -> str:
+    logger.info("Code Generator Tool invoked (async).")
+
+    result = await arun_multi_language_generation(code, languages)
+    final_output = _build_report(result)
+
+    # --- SAVE TO MARKDOWN ---
+    save_tool_output("code_generator", code, final_output)
+
+    return final_output
+
+
+code_generator = StructuredTool.from_function(
+    func=_code_generator,
+    coroutine=_acode_generator,
+    name="code_generator",
+)
+
+
+def astream_code_generator(code: str, profile: Optional[str] = None, languages: Optional[List[str]] = None):
+    """
+    Streams the code_generator run: the analysis step, one step per language as
+    each finishes, plus the report fragment produced after each step.
+    """
+    # There is no single-call variant; `profile` is accepted like every tool stream
+    logger.info("code_generator streaming run started.")
+    return astream_tool_report("code_generator", code, astream_multi_language_generation(code, languages), _new_report())
@@ -1,11 +1,77 @@
-from langchain.tools import tool
-from app.chains.code_review_chain import run_code_review_pipeline
+from functools import partial
+from typing import Optional
+
+from langchain_core.tools import StructuredTool
+from app.chains.code_review_chain import (
+    run_code_review_pipeline,
+    arun_code_review_pipeline,
+    astream_code_review_pipeline,
+)
+from app.chains.diff_review import run_diff_review_pipeline, arun_diff_review_pipeline
+from app.chains.chunking import run_with_chunking, arun_with_chunking, astream_with_chunking
+from app.chains.fast_profile import resolve_profile, run_fast_profile, arun_fast_profile, astream_fast_profile
 from app.utils.logger import logger
 from app.utils.markdown_logger import save_tool_output
+from app.tools.report_builder import ReportBuilder, astream_tool_report
+
+
+def _pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(run_fast_profile, "code_reviewer")
+    return run_code_review_pipeline
+
+
+def _apipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(arun_fast_profile, "code_reviewer")
+    return arun_code_review_pipeline
+
+
+def _astream_pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(astream_fast_profile, "code_reviewer")
+    return astream_code_review_pipeline
+
+
+def _new_report() -> ReportBuilder:
+    return ReportBuilder("## === CODE REVIEW REPORT ===\n", "## === FINAL REVIEWED CODE ===\n")
+
+
+def _build_report(result: dict) -> str:
+    report = _new_report()
+    report.start()
+
+    for step in result["review_steps"]:
+        report.add_step(step["step"], step["reviewed_code"])
+
+    report.finish(result["final_code"])
+    return report.render()
+
 
+def _build_diff_report(result: dict) -> str:
+    report = ReportBuilder("## === CODE REVIEW REPORT (CHANGED CODE) ===\n", "## === REVIEWED REGIONS ===\n")
+    report.start()
 
-@tool
-def code_reviewer(code: str) -> str:
+    for segment in result["segments"]:
+        report.add_step(
+            f"{segment['name']} (lines {segment['start_line']}-{segment['end_line']})",
+            segment["final_code"],
+        )
+
+    regions = [
+        f"- `{segment['name']}`: lines {segment['start_line']}-{segment['end_line']}"
+        for segment in result["segments"]
+    ]
+    report.finish("\n".join(regions))
+    return report.render()
+
+
+def _log_input(code: str, diff: Optional[str]) -> str:
+    # A diff review is only reproducible from the file and the diff together
+    return f"{code}\n\n--- DIFF ---\n{diff}" if diff else code
+
+
+def _code_reviewer(code: str, diff: Optional[str] = None, profile: Optional[str] = None) -> str:
     """
     Reviews source code for:
     - Coding standards
@@ -15,23 +81,50 @@ def code_reviewer(code: str) -> str:
     - Final polishing
 
     Provide the source code as input. Returns the reviewed and improved code with summary.
+    To review a change, pass the original file as `code` and a unified diff as `diff`:
+    only the functions and classes touched by the diff are reviewed.
+    Optional `profile`: "detailed" (multi-step, default) or "fast" (one LLM call).
     """
 
     logger.info("Code Reviewer Tool invoked.")
 
-    result = run_code_review_pipeline(code)
+    if diff:
+        final_output = _build_diff_report(run_diff_review_pipeline(code, diff, pipeline=_pipeline(profile)))
+    else:
+        result = run_with_chunking(_pipeline(profile), code, "review_steps", "code review")
+        final_output = _build_report(result)
+    # --- SAVE TO MARKDOWN ---
+    save_tool_output("code_reviewer", _log_input(code, diff), final_output)
 
-    output = ["## === CODE REVIEW REPORT ===\n"]
+    return final_output
 
-    for step in result["review_steps"]:
-        output.append(f"--- {step['step']} ---\n")
-        output.append(step['reviewed_code'])
-        output.append("\n")
 
-    output.append("## === FINAL REVIEWED CODE ===\n")
-    output.append(result["final_code"])
-    final_output = "\n".join(output)
+async def _acode_reviewer(code: str, diff: Optional[str] = None, profile: Optional[str] = None) -> str:
+    logger.info("Code Reviewer Tool invoked (async).")
+
+    if diff:
+        final_output = _build_diff_report(await arun_diff_review_pipeline(code, diff, pipeline=_apipeline(profile)))
+    else:
+        result = await arun_with_chunking(_apipeline(profile), code, "review_steps", "code review")
+        final_output = _build_report(result)
     # --- SAVE TO MARKDOWN ---
-    save_tool_output("code_reviewer", code,final_output)
+    save_tool_output("code_reviewer", _log_input(code, diff), final_output)
 
     return final_output
+
+
+code_reviewer = StructuredTool.from_function(
+    func=_code_reviewer,
+    coroutine=_acode_reviewer,
+    name="code_reviewer",
+)
+
+
+def astream_code_reviewer(code: str, profile: Optional[str] = None):
+    """
+    Streams the code_reviewer run: pipeline step/token events plus the report
+    fragment produced after each step.
+    """
+    logger.info("code_reviewer streaming run started.")
+    events = astream_with_chunking(_astream_pipeline(profile), code, "code review")
+    return astream_tool_report("code_reviewer", code, events, _new_report())
@@ -1,11 +1,53 @@
-from langchain.tools import tool
-from app.chains.performance_optimization_chain import run_performance_optimization_pipeline
+from functools import partial
+from typing import Optional
+
+from langchain_core.tools import StructuredTool
+from app.chains.performance_optimization_chain import (
+    run_performance_optimization_pipeline,
+    arun_performance_optimization_pipeline,
+    astream_performance_optimization_pipeline,
+)
+from app.chains.chunking import run_with_chunking, arun_with_chunking, astream_with_chunking
+from app.chains.fast_profile import resolve_profile, run_fast_profile, arun_fast_profile, astream_fast_profile
 from app.utils.logger import logger
 from app.utils.markdown_logger import save_tool_output
+from app.tools.report_builder import ReportBuilder, astream_tool_report
+
+
+def _pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(run_fast_profile, "performance_optimizer")
+    return run_performance_optimization_pipeline
+
+
+def _apipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(arun_fast_profile, "performance_optimizer")
+    return arun_performance_optimization_pipeline
+
+
+def _astream_pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(astream_fast_profile, "performance_optimizer")
+    return astream_performance_optimization_pipeline
+
+
+def _new_report() -> ReportBuilder:
+    return ReportBuilder("## === PERFORMANCE OPTIMIZATION REPORT ===\n", "## === FINAL OPTIMIZED CODE ===\n")
+
+
+def _build_report(result: dict) -> str:
+    report = _new_report()
+    report.start()
+
+    for step in result["optimization_steps"]:
+        report.add_step(step["step"], step["optimized_code"])
 
+    report.finish(result["final_code"])
+    return report.render()
 
-@tool
-def performance_optimizer(code: str) -> str:
+
+def _performance_optimizer(code: str, profile: Optional[str] = None) -> str:
     """
     Optimizes source code for performance.
 
@@ -18,23 +60,42 @@ def performance_optimizer(code: str) -> str:
     - Final polishing and summary
 
     Provide the source code as input. Returns optimized code and optimization report.
+    Optional `profile`: "detailed" (multi-step, default) or "fast" (one LLM call).
     """
 
     logger.info("Performance Optimizer Tool invoked.")
 
-    result = run_performance_optimization_pipeline(code)
+    result = run_with_chunking(_pipeline(profile), code, "optimization_steps", "performance optimization")
+    final_output = _build_report(result)
+    # --- SAVE TO MARKDOWN ---
+    save_tool_output("performance_optimizer", code, final_output)
+
+    return final_output
 
-    output = ["## === PERFORMANCE OPTIMIZATION REPORT ===\n"]
 
-    for step in result["optimization_steps"]:
-        output.append(f"--- {step['step']} ---\n")
-        output.append(step['optimized_code'])
-        output.append("\n")
+async def _aperformance_optimizer(code: str, profile: Optional[str] = None) -> str:
+    logger.info("Performance Optimizer Tool invoked (async).")
 
-    output.append("## === FINAL OPTIMIZED CODE ===\n")
-    output.append(result["final_code"])
-    final_output = "\n".join(output)
+    result = await arun_with_chunking(_apipeline(profile), code, "optimization_steps", "performance optimization")
+    final_output = _build_report(result)
     # --- SAVE TO MARKDOWN ---
     save_tool_output("performance_optimizer", code, final_output)
 
     return final_output
+
+
+performance_optimizer = StructuredTool.from_function(
+    func=_performance_optimizer,
+    coroutine=_aperformance_optimizer,
+    name="performance_optimizer",
+)
+
+
+def astream_performance_optimizer(code: str, profile: Optional[str] = None):
+    """
+    Streams the performance_optimizer run: pipeline step/token events plus the report
+    fragment produced after each step.
+    """
+    logger.info("performance_optimizer streaming run started.")
+    events = astream_with_chunking(_astream_pipeline(profile), code, "performance optimization")
+    return astream_tool_report("performance_optimizer", code, events, _new_report())
@@ -0,0 +1,31 @@
+from importlib import import_module
+
+# Tool name -> (module, tool attribute, streaming entry point). Modules are
+# imported on first use, so importing `app.tools` builds no chains or LLM clients.
+TOOL_SPECS = {
+    "code_reviewer": ("app.tools.code_reviewer_tool", "code_reviewer", "astream_code_reviewer"),
+    "performance_optimizer": ("app.tools.performance_optimizer_tool", "performance_optimizer", "astream_performance_optimizer"),
+    "unit_test_generator": ("app.tools.unit_test_generator_tool", "unit_test_generator", "astream_unit_test_generator"),
+    "code_generator": ("app.tools.code_generator_tool", "code_generator", "astream_code_generator"),
+}
+
+
+def tool_names() -> list:
+    """Names of the registered tools, without loading any of them."""
+    return list(TOOL_SPECS)
+
+
+def _load(name: str, index: int):
+    if name not in TOOL_SPECS:
+        raise KeyError(f"Unknown tool: {name}")
+
+    module_name = TOOL_SPECS[name][0]
+    return getattr(import_module(module_name), TOOL_SPECS[name][index])
+
+
+def get_tool(name: str):
+    return _load(name, 1)
+
+
+def get_tool_stream(name: str):
+    return _load(name, 2)
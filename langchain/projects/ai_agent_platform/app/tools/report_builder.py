@@ -0,0 +1,66 @@
+from typing import AsyncIterator
+
+from app.utils.markdown_logger import save_tool_output
+
+
+class ReportBuilder:
+    """
+    Builds a tool's markdown report one step at a time.
+
+    Every method returns the fragment it appended, so a streaming caller can
+    forward fragments as they are produced; `render()` returns the full report,
+    identical to concatenating all fragments.
+    """
+
+    def __init__(self, title: str, final_title: str):
+        self.title = title
+        self.final_title = final_title
+        self._parts = []
+
+    def _extend(self, parts: list) -> str:
+        fragment = "\n".join(parts)
+        if self._parts:
+            fragment = "\n" + fragment
+        self._parts.extend(parts)
+        return fragment
+
+    def start(self) -> str:
+        return self._extend([self.title])
+
+    def add_step(self, step_name: str, step_output: str) -> str:
+        return self._extend([f"--- {step_name} ---\n", step_output, "\n"])
+
+    def finish(self, final_code: str) -> str:
+        return self._extend([self.final_title, final_code])
+
+    def render(self) -> str:
+        return "\n".join(self._parts)
+
+
+async def astream_tool_report(
+    tool_name: str,
+    code: str,
+    pipeline_events: AsyncIterator[dict],
+    report: ReportBuilder,
+) -> AsyncIterator[dict]:
+    """
+    Forwards pipeline events and interleaves "report" events carrying the
+    markdown fragment added after each finished step. Ends with a "tool_end"
+    event holding the complete report, which is also saved to the tool log.
+    """
+    yield {"event": "report", "text": report.start()}
+
+    async for event in pipeline_events:
+        if event["event"] == "pipeline_end":
+            yield {"event": "report", "text": report.finish(event["final_code"])}
+            continue
+
+        yield event
+
+        if event["event"] == "step_end":
+            yield {"event": "report", "text": report.add_step(event["step"], event["output"])}
+
+    final_output = report.render()
+    save_tool_output(tool_name, code, final_output)
+
+    yield {"event": "tool_end", "tool": tool_name, "output": final_output}
@@ -1,33 +1,123 @@
-from langchain.tools import tool
-from app.chains.unit_test_generation_chain import run_unit_test_generation_pipeline
+from functools import partial
+from typing import Optional
+
+from langchain_core.tools import StructuredTool
+from app.chains.unit_test_generation_chain import (
+    run_unit_test_generation_pipeline,
+    arun_unit_test_generation_pipeline,
+    astream_unit_test_generation_pipeline,
+)
+from app.chains.chunking import run_with_chunking, arun_with_chunking, astream_with_chunking
+from app.chains.fast_profile import resolve_profile, run_fast_profile, arun_fast_profile, astream_fast_profile
+from app.configs.settings import TEST_VALIDATION_ENABLED
+from app.sandbox.unit_test_validator import VALIDATION_STEP, validate_generated_tests, avalidate_generated_tests
 from app.utils.logger import logger
 from app.utils.markdown_logger import save_tool_output
+from app.tools.report_builder import ReportBuilder, astream_tool_report
+
+
+def _pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(run_fast_profile, "unit_test_generator")
+    return run_unit_test_generation_pipeline
+
+
+def _apipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(arun_fast_profile, "unit_test_generator")
+    return arun_unit_test_generation_pipeline
+
+
+def _astream_pipeline(profile: Optional[str]):
+    if resolve_profile(profile) == "fast":
+        return partial(astream_fast_profile, "unit_test_generator")
+    return astream_unit_test_generation_pipeline
+
+
+def _should_validate(run_tests: Optional[bool]) -> bool:
+    return TEST_VALIDATION_ENABLED if run_tests is None else run_tests
+
+
+def _new_report() -> ReportBuilder:
+    return ReportBuilder("## === UNIT TEST GENERATION REPORT ===\n", "## === FINAL UNIT TEST CODE ===\n")
+
+
+def _build_report(result: dict) -> str:
+    report = _new_report()
+    report.start()
+
+    for step in result["test_generation_steps"]:
+        report.add_step(step["step"], step["generated_code"])
+    if "test_validation" in result:
+        report.add_step(VALIDATION_STEP, result["test_validation"].to_markdown())
 
+    report.finish(result["final_code"])
+    return report.render()
 
-@tool
-def unit_test_generator(code: str) -> str:
+
+def _unit_test_generator(code: str, profile: Optional[str] = None, run_tests: Optional[bool] = None) -> str:
     """
     Generates unit test cases for the provided source code.
     Covers positive, negative and edge cases and returns a complete unittest class code.
+    Optional `profile`: "detailed" (multi-step, default) or "fast" (one LLM call).
+    Optional `run_tests`: run the generated tests in a sandbox and report pass/fail counts.
     """
 
     logger.info("Unit Test Generator Tool invoked.")
 
-    result = run_unit_test_generation_pipeline(code)
+    result = run_with_chunking(_pipeline(profile), code, "test_generation_steps", "unit test generation")
+    if _should_validate(run_tests):
+        result["test_validation"] = validate_generated_tests(code, result["final_code"])
+    final_output = _build_report(result)
 
-    output = ["## === UNIT TEST GENERATION REPORT ===\n"]
+    # --- SAVE TO MARKDOWN ---
+    save_tool_output("unit_test_generator", code, final_output)
+
+    return final_output
 
-    for step in result["test_generation_steps"]:
-        output.append(f"--- {step['step']} ---\n")
-        output.append(step['generated_code'])
-        output.append("\n")
 
-    output.append("## === FINAL UNIT TEST CODE ===\n")
-    output.append(result["final_code"])
+async def _aunit_test_generator(code: str, profile: Optional[str] = None, run_tests: Optional[bool] = None) -> str:
+    logger.info("Unit Test Generator Tool invoked (async).")
 
-    final_output = "\n".join(output)
+    result = await arun_with_chunking(_apipeline(profile), code, "test_generation_steps", "unit test generation")
+    if _should_validate(run_tests):
+        result["test_validation"] = await avalidate_generated_tests(code, result["final_code"])
+    final_output = _build_report(result)
 
     # --- SAVE TO MARKDOWN ---
     save_tool_output("unit_test_generator", code, final_output)
 
     return final_output
+
+
+unit_test_generator = StructuredTool.from_function(
+    func=_unit_test_generator,
+    coroutine=_aunit_test_generator,
+    name="unit_test_generator",
+)
+
+
+async def _astream_with_validation(code: str, events):
+    # Runs the sandbox once the final tests are known, as one more step before "pipeline_end"
+    index = 0
+    async for event in events:
+        if event["event"] == "step_end":
+            index = event["index"] + 1
+        if event["event"] == "pipeline_end":
+            yield {"event": "step_start", "step": VALIDATION_STEP, "index": index}
+            validation = await avalidate_generated_tests(code, event["final_code"])
+            yield {"event": "step_end", "step": VALIDATION_STEP, "index": index, "output": validation.to_markdown(),
+                   "validation": validation.to_dict()}
+        yield event
+
+
+def astream_unit_test_generator(code: str, profile: Optional[str] = None, run_tests: Optional[bool] = None):
+    """
+    Streams the unit_test_generator run: pipeline step/token events plus the report
+    fragment produced after each step.
+    """
+    logger.info("unit_test_generator streaming run started.")
+    events = astream_with_chunking(_astream_pipeline(profile), code, "unit test generation")
+    if _should_validate(run_tests):
+        events = _astream_with_validation(code, events)
+    return astream_tool_report("unit_test_generator", code, events, _new_report())
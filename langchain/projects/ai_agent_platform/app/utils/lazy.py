@@ -0,0 +1,29 @@
+import threading
+
+
+class Lazy:
+    """
+    Builds a value on first call and returns the same instance afterwards.
+
+    Used for chains, tools and agents, so importing a module never creates
+    provider clients; the first request pays for them once, thread-safely.
+    """
+
+    def __init__(self, builder):
+        self._builder = builder
+        self._value = None
+        self._built = False
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __call__(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._value = self._builder()
+                    self._built = True
+
+        return self._value
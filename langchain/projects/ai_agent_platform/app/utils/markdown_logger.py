@@ -1,47 +1,278 @@
+import atexit
+import gzip
+import glob
 import os
+import queue
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
-LOG_DIR = "logs"
+from app.configs.settings import (
+    TOOL_LOG_BACKUPS,
+    TOOL_LOG_BATCH_SIZE,
+    TOOL_LOG_DIR,
+    TOOL_LOG_ENABLED,
+    TOOL_LOG_FLUSH_SECONDS,
+    TOOL_LOG_MAX_BYTES,
+    TOOL_LOG_QUEUE_SIZE,
+    TOOL_LOG_ROTATE_SECONDS,
+)
+from app.utils.logger import logger
 
-def save_tool_output(tool_name: str, input_text: str, output_text: str):
-    """
-    Saves the tool input and output to a markdown file in a readable, well-formatted style.
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, writes are still batched
+    fcntl = None
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIMESTAMP_RE = re.compile(r"\*\*Timestamp:\*\* (\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})")
+
+_STOP = object()
 
-    The output markdown includes:
+
+def format_entry(tool_name: str, input_text: str, output_text: str, timestamp: str = None) -> str:
+    """
+    One tool run in the log's markdown layout:
     - Tool name and timestamp
     - Input wrapped in a generic code block (no language tag)
     - Output pasted as-is (respects markdown format directly)
     - Separator between runs
+    """
+    timestamp = timestamp or datetime.now().strftime(TIMESTAMP_FORMAT)
 
-    Args:
-        tool_name (str): The name of the tool that ran
-        input_text (str): The input given to the tool
-        output_text (str): The output generated by the tool
+    return (
+        f"# Tool Run - {tool_name}\n"
+        f"**Timestamp:** {timestamp}\n\n"
+        "## Input\n"
+        f"```\n{input_text.strip()}\n```\n\n"
+        "## Output\n"
+        f"{output_text.strip()}\n\n"
+        "---\n\n"
+    )
+
+
+@contextmanager
+def _file_lock(path: str):
+    # Serialises appends and rotation of one log file across processes
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class ToolLogWriter:
     """
-    # Ensure log directory exists
-    os.makedirs(LOG_DIR, exist_ok=True)
+    Appends tool runs to `<log_dir>/<tool>_result.md` from a background thread.
+
+    `submit()` only formats the entry and queues it, so logging stays off the
+    request path. The thread writes whatever arrived within `flush_seconds`
+    (at most `batch_size` entries) with one append per file, holding a file
+    lock so several worker processes can share the directory. A file is
+    rotated when the next batch would take it past `max_bytes` or its first
+    entry is older than `rotate_seconds`; rotated segments are gzipped and
+    only the newest `backups` are kept per tool.
+    """
+
+    def __init__(
+        self,
+        log_dir: str = TOOL_LOG_DIR,
+        enabled: bool = TOOL_LOG_ENABLED,
+        max_bytes: int = TOOL_LOG_MAX_BYTES,
+        rotate_seconds: float = TOOL_LOG_ROTATE_SECONDS,
+        backups: int = TOOL_LOG_BACKUPS,
+        batch_size: int = TOOL_LOG_BATCH_SIZE,
+        flush_seconds: float = TOOL_LOG_FLUSH_SECONDS,
+        queue_size: int = TOOL_LOG_QUEUE_SIZE,
+    ):
+        self.log_dir = log_dir
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.queue_size = queue_size
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._segment_starts = {}  # path -> (inode, time of the file's first entry)
+        self._stats = {"written": 0, "dropped": 0, "errors": 0, "rotations": 0}
+
+    def _count(self, stat: str, amount: int = 1):
+        with self._lock:
+            self._stats[stat] += amount
+
+    def _ensure_started(self):
+        # A forked worker process inherits the writer but not its thread
+        if self._thread is not None and self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="tool-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, tool_name: str, input_text: str, output_text: str) -> bool:
+        """Queues one tool run; False when logging is disabled or the entry was dropped."""
+        if not self.enabled:
+            return False
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((tool_name, format_entry(tool_name, input_text, output_text)))
+        except queue.Full:
+            logger.warning(f"Tool log queue is full, dropping a {tool_name} entry.")
+            self._count("dropped")
+            return False
+
+        return True
 
-    # Define file path
-    filename = f"{tool_name}_result.md"
-    filepath = os.path.join(LOG_DIR, filename)
+    def flush(self):
+        """Blocks until every queued entry is on disk."""
+        if self._queue is not None and self._pid == os.getpid():
+            self._queue.join()
 
-    # Get current timestamp
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    def close(self, timeout: float = 5.0):
+        """Writes the remaining entries and stops the thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
 
-    # Write to file in append mode
-    with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"# Tool Run - {tool_name}\n")
-        f.write(f"**Timestamp:** {timestamp}\n\n")
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        with self._lock:
+            self._thread = None
 
-        f.write("## Input\n")
-        f.write("```\n")
-        f.write(input_text.strip())
-        f.write("\n```\n\n")
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        return stats
 
-        f.write("## Output\n")
-        f.write(output_text.strip())
-        f.write("\n\n")
+    # --- background thread -------------------------------------------------
 
-        f.write("---\n\n")  # Separator for multiple runs
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
 
-    print(f"[MarkdownLogger] Saved output to {filepath}")
\ No newline at end of file
+            while batch[-1] is not _STOP and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write_batch([item for item in batch if item is not _STOP])
+            for _ in batch:
+                self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def _write_batch(self, batch: list):
+        by_tool = {}
+        for tool_name, entry in batch:
+            by_tool.setdefault(tool_name, []).append(entry)
+
+        for tool_name, entries in by_tool.items():
+            try:
+                self._append(tool_name, "".join(entries))
+                self._count("written", len(entries))
+            except OSError:
+                logger.exception(f"Could not write the {tool_name} tool log.")
+                self._count("errors", len(entries))
+
+    def _append(self, tool_name: str, text: str):
+        os.makedirs(self.log_dir, exist_ok=True)
+        path = os.path.join(self.log_dir, f"{tool_name}_result.md")
+        data = text.encode("utf-8")
+
+        with _file_lock(path):
+            segment = self._rotate_if_needed(path, len(data))
+            with open(path, "ab") as f:
+                f.write(data)
+
+        if segment:
+            self._compress(segment, tool_name)
+
+    def _segment_start(self, path: str, inode: int) -> float | None:
+        # Time of the active file's first entry, read again only once the file was rotated
+        cached = self._segment_starts.get(path)
+        if cached is None or cached[0] != inode:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                match = TIMESTAMP_RE.search(f.read(512))
+            cached = (inode, time.mktime(time.strptime(match.group(1), TIMESTAMP_FORMAT)) if match else None)
+            self._segment_starts[path] = cached
+        return cached[1]
+
+    def _rotate_if_needed(self, path: str, incoming: int) -> str | None:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if st.st_size == 0:
+            return None
+
+        too_big = self.max_bytes > 0 and st.st_size + incoming > self.max_bytes
+        started = self._segment_start(path, st.st_ino) if self.rotate_seconds > 0 else None
+        too_old = started is not None and time.time() - started >= self.rotate_seconds
+        if not (too_big or too_old):
+            return None
+
+        segment = f"{path[:-len('.md')]}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{os.getpid()}.md"
+        os.replace(path, segment)
+        self._count("rotations")
+        return segment
+
+    def _compress(self, segment: str, tool_name: str):
+        try:
+            with open(segment, "rb") as source, gzip.open(f"{segment}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.remove(segment)
+        except OSError:
+            logger.exception(f"Could not compress tool log segment {segment}.")
+            return
+
+        if self.backups <= 0:
+            return  # keep every segment
+
+        # Segment names sort by rotation time
+        pattern = os.path.join(glob.escape(self.log_dir), f"{glob.escape(tool_name)}_result.*.md.gz")
+        for old in sorted(glob.glob(pattern))[:-self.backups]:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass  # pruned by another process
+
+
+tool_log_writer = ToolLogWriter()
+
+
+def save_tool_output(tool_name: str, input_text: str, output_text: str):
+    """
+    Queues the tool input and output for the markdown log of the tool
+    (`<TOOL_LOG_DIR>/<tool_name>_result.md`); the background writer appends it.
+    Returns immediately, so it is safe to call from the event loop.
+
+    Args:
+        tool_name (str): The name of the tool that ran
+        input_text (str): The input given to the tool
+        output_text (str): The output generated by the tool
+    """
+    tool_log_writer.submit(tool_name, input_text, output_text)
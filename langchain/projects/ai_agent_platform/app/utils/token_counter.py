@@ -0,0 +1,38 @@
+import threading
+
+_encoding = None
+_encoding_failed = False
+_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    Loads tiktoken's cl100k_base encoding if tiktoken is installed and its
+    encoding file is available; otherwise counting falls back to a heuristic.
+    """
+    global _encoding, _encoding_failed
+
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+
+    with _lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # Not installed, or offline and the encoding is not cached
+                _encoding_failed = True
+
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Returns the number of tokens in text (approximate without tiktoken: ~4 chars per token).
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return (len(text) + 3) // 4